@@ -17,6 +17,34 @@ try:
 except Exception:
     HAS_YAML = False
 
+# 선택 의존성: 표준화/파생 피처 캐시(risk_scoring.feature_store, pyarrow 필요)
+try:
+    try:
+        from .risk_scoring.feature_store import FeatureStore  # type: ignore
+    except ImportError:
+        from risk_scoring.feature_store import FeatureStore  # type: ignore
+    HAS_FEATURE_STORE = True
+except Exception:
+    HAS_FEATURE_STORE = False
+
+# 선택 의존성: 타입 지정 로더(risk_scoring.telecom_schema — 카테고리/float32, pyarrow 엔진)
+try:
+    try:
+        from .risk_scoring.telecom_schema import read_telecom_csv  # type: ignore
+    except ImportError:
+        from risk_scoring.telecom_schema import read_telecom_csv  # type: ignore
+except Exception:
+    read_telecom_csv = None
+
+# 선택 의존성: 컬럼 카탈로그(risk_scoring.column_catalog — 프레임당 1회 색인, 이름별 메모)
+try:
+    try:
+        from .risk_scoring.column_catalog import catalog_for  # type: ignore
+    except ImportError:
+        from risk_scoring.column_catalog import catalog_for  # type: ignore
+except Exception:
+    catalog_for = None
+
 def ensure_year_month(df: pd.DataFrame) -> pd.DataFrame:
     """year_month(datetime64) 보장."""
     out = df.copy()
@@ -112,7 +140,7 @@ def infer_types(df: pd.DataFrame):
         dt = str(df[c].dtype)
         if pd.api.types.is_numeric_dtype(df[c]):
             kind = "numeric"
-        elif np.issubdtype(df[c].dtype, np.datetime64):
+        elif pd.api.types.is_datetime64_any_dtype(df[c]):
             kind = "datetime"
         else:
             kind = "categorical/text"
@@ -166,6 +194,8 @@ def make_feature_stats(df: pd.DataFrame, month_col="year_month"):
 
 def fuzzy_resolve(colname, df_cols):
     """규칙 신호명을 실제 컬럼과 느슨 매칭."""
+    if catalog_for is not None:
+        return catalog_for(df_cols).fuzzy(colname)
     if colname in df_cols:
         return colname
     base = colname
@@ -265,24 +295,49 @@ def build_kb_chunks(df, dtype_df, feature_stats, month_counts, created_map, deri
             })
     return chunks
 
-def build_rag_augmentation(csv_path: str, out_dir: str, rules_path: str=None, month_col: str="year_month", encoding: str="utf-8"):
+def _load_from_feature_store(csv_path: str, store_dir: str, encoding: str="utf-8"):
+    """피처 캐시에서 표준화/파생까지 끝난 매트릭스 로드 → (원천 df, 증강 df, 매핑들)."""
+    store = FeatureStore(store_dir)
+    df_aug = store.materialize(csv_path, encoding=encoding)
+    manifest = store.manifest()
+    created_map = [
+        {"original": m["original"], "std_col": m["std_col"], "created": True, "reason": "robust_month_std"}
+        for m in manifest.get("std_map", []) if m["original"] in df_aug.columns
+    ]
+    derived_cols = manifest.get("derived_cols", [])
+    derived_map = [
+        {"base_std": c.rsplit("_", 1)[0], "derived": c, "created": True, "grouping": "month_mean"}
+        for c in derived_cols
+    ]
+    new_cols = {m["std_col"] for m in created_map} | set(derived_cols)
+    df = df_aug[[c for c in df_aug.columns if c not in new_cols]]
+    return df, df_aug, created_map, derived_map
+
+def build_rag_augmentation(csv_path: str, out_dir: str, rules_path: str=None, month_col: str="year_month",
+                           encoding: str="utf-8", feature_store: str=None):
     os.makedirs(out_dir, exist_ok=True)
 
-    # 1) Load & ensure year_month
-    df = pd.read_csv(csv_path, encoding=encoding, low_memory=False)
-    df = ensure_year_month(df)
-    if month_col != "year_month":
-        df = df.rename(columns={month_col: "year_month"})
+    if feature_store and HAS_FEATURE_STORE and month_col == "year_month":
+        # 1~4) 캐시 재사용(바뀐 월만 재계산)
+        df, df_aug, created_map, derived_map = _load_from_feature_store(csv_path, feature_store, encoding)
+        dtype_df = infer_types(df)
+    else:
+        # 1) Load & ensure year_month
+        df = (read_telecom_csv(csv_path, encoding=encoding) if read_telecom_csv
+              else pd.read_csv(csv_path, encoding=encoding, low_memory=False))
+        df = ensure_year_month(df)
+        if month_col != "year_month":
+            df = df.rename(columns={month_col: "year_month"})
 
-    # 2) 타입/기초 메타
-    dtype_df = infer_types(df)
+        # 2) 타입/기초 메타
+        dtype_df = infer_types(df)
 
-    # 3) *_std 생성
-    df_std, created_map = robust_month_standardize(df, month_col="year_month")
+        # 3) *_std 생성
+        df_std, created_map = robust_month_standardize(df, month_col="year_month")
 
-    # 4) Δ/Trend 파생
-    base_std_cols = [c for c in df_std.columns if c.endswith("_std")]
-    df_aug, derived_map = month_agg_deltas_trends(df_std, base_std_cols, month_col="year_month")
+        # 4) Δ/Trend 파생
+        base_std_cols = [c for c in df_std.columns if c.endswith("_std")]
+        df_aug, derived_map = month_agg_deltas_trends(df_std, base_std_cols, month_col="year_month")
 
     # 5) 통계/커버리지
     feature_stats_df, month_counts_df, per_month_std_df = make_feature_stats(df_aug, month_col="year_month")
@@ -366,6 +421,7 @@ def main():
     ap.add_argument("--rules_path", default=None, help="선택: rules.yml 경로 (있으면 규칙-신호 매핑 미리보기 추가)")
     ap.add_argument("--month_col", default="year_month", help="월 컬럼명(없으면 자동 생성)")
     ap.add_argument("--encoding", default="utf-8", help="입력 CSV 인코딩 (예: utf-8, cp949, euc-kr)")
+    ap.add_argument("--feature_store", default=None, help="선택: 표준화/파생 피처 캐시 폴더 (pyarrow 필요)")
     args = ap.parse_args()
 
     os.makedirs(args.out_dir, exist_ok=True)
@@ -374,7 +430,8 @@ def main():
         out_dir=args.out_dir,
         rules_path=args.rules_path,
         month_col=args.month_col,
-        encoding=args.encoding
+        encoding=args.encoding,
+        feature_store=args.feature_store
     )
     print(json.dumps(res, ensure_ascii=False, indent=2))
 
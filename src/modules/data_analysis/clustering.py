@@ -4,6 +4,7 @@
 Clustering: 페르소나 군집화 모듈
 - (선택) per-capita + 월내 표준화 후 월평균으로 축약
 - K sweep (silhouette/CH/DB/최소비율) → 최적 K 선택
+  (K 후보 프로세스 병렬, silhouette 층화 표본, 대용량은 MiniBatchKMeans, 입력 해시별 결과 캐시)
 - KMeans 학습 → 하드 라벨 + 소프트 확률(거리 기반 softmax)
 - 라벨 메타(중심/특징)와 함께 CSV로 저장
 """
@@ -14,35 +15,107 @@ from sklearn.cluster import KMeans
 from sklearn.metrics import silhouette_score, calinski_harabasz_score, davies_bouldin_score
 warnings.filterwarnings("ignore")
 
-from .eda import ensure_year_month, make_per_capita, monthwise_robust_z_log1p
+from .eda import ensure_year_month, make_per_capita, monthwise_robust_z_log1p, read_telecom_csv
 
 # ---------------- 전처리 ----------------
 def aggregate_by_unit_month(df: pd.DataFrame, unit_cols: list[str], month_col: str, use_cols: list[str]) -> pd.DataFrame:
     """unit x month 수준에서 평균(또는 합계)로 축약. 여기선 평균 사용."""
     keep = [c for c in use_cols if c in df.columns]
-    g = df.groupby(unit_cols + [month_col], dropna=False)[keep].mean().reset_index()
+    g = df.groupby(unit_cols + [month_col], dropna=False, observed=True)[keep].mean().reset_index()
     return g
 
 def month_to_overall(dfm: pd.DataFrame, unit_cols: list[str], month_col: str, use_cols: list[str]) -> pd.DataFrame:
     """월 차원 제거(평균) → 최종 군집 입력 테이블"""
-    return dfm.groupby(unit_cols, dropna=False)[use_cols].mean().reset_index()
-
-def k_sweep_score(X: np.ndarray, K_list: list[int]) -> pd.DataFrame:
-    rows=[]
-    for k in K_list:
-        if k <= 1 or k >= len(X):
-            continue
-        km = KMeans(n_clusters=k, n_init="auto", random_state=42)
-        lab = km.fit_predict(X)
-        # 빈 클러스터 방지 체크
-        counts = np.bincount(lab, minlength=k)
-        min_ratio = counts.min() / counts.sum()
-        # 지표
+    return dfm.groupby(unit_cols, dropna=False, observed=True)[use_cols].mean().reset_index()
+
+# ---------------- K sweep ----------------
+SIL_SAMPLE = 10_000          # silhouette(O(n²)) 계산 표본 상한 (이하면 전체)
+MINIBATCH_ROWS = 50_000      # 이 행 수 이상이면 MiniBatchKMeans
+PARALLEL_MIN_ROWS = 5_000    # 이보다 작으면 프로세스 기동 비용이 더 커서 순차
+SWEEP_SEED = 42
+SWEEP_COLS = ["K","silhouette","calinski_harabasz","davies_bouldin","min_ratio"]
+_SWEEP_CACHE: dict[str, pd.DataFrame] = {}
+_SWEEP_CACHE_SIZE = 16
+
+def stratified_sample_idx(labels: np.ndarray, size: int, seed: int = SWEEP_SEED) -> np.ndarray:
+    """클러스터 비율대로 고정 시드 표본 인덱스(클러스터당 최소 2개, 작은 클러스터는 전부)."""
+    n = len(labels)
+    if n <= size:
+        return np.arange(n)
+    rng = np.random.default_rng(seed)
+    idx = []
+    for c in np.unique(labels):
+        members = np.flatnonzero(labels == c)
+        m = min(len(members), max(2, int(round(size * len(members) / n))))
+        idx.append(rng.choice(members, m, replace=False))
+    return np.sort(np.concatenate(idx))
+
+def _score_k(X: np.ndarray, k: int, sample_size: int, minibatch_above: int, seed: int) -> list:
+    """K 하나: 적합 + 지표 (병렬 작업 단위). silhouette만 층화 표본, CH/DB는 전체."""
+    if len(X) >= minibatch_above:
+        from sklearn.cluster import MiniBatchKMeans
+        km = MiniBatchKMeans(n_clusters=k, n_init="auto", batch_size=4096, random_state=seed)
+    else:
+        km = KMeans(n_clusters=k, n_init="auto", random_state=seed)
+    lab = km.fit_predict(X)
+    # 빈 클러스터 방지 체크
+    counts = np.bincount(lab, minlength=k)
+    min_ratio = counts.min() / counts.sum()
+    # 지표
+    if len(X) <= sample_size:
         sil = silhouette_score(X, lab)
-        ch  = calinski_harabasz_score(X, lab)
-        db  = davies_bouldin_score(X, lab)
-        rows.append([k, sil, ch, db, float(min_ratio)])
-    return pd.DataFrame(rows, columns=["K","silhouette","calinski_harabasz","davies_bouldin","min_ratio"]).sort_values("silhouette", ascending=False)
+    else:
+        idx = stratified_sample_idx(lab, sample_size, seed)
+        sil = silhouette_score(X[idx], lab[idx]) if len(np.unique(lab[idx])) > 1 else np.nan
+    ch  = calinski_harabasz_score(X, lab)
+    db  = davies_bouldin_score(X, lab)
+    return [k, sil, ch, db, float(min_ratio)]
+
+def sweep_hash(X: np.ndarray, K_list: list[int], **params) -> str:
+    """입력 행렬 + K 목록 + 설정 → 캐시 키."""
+    import hashlib, json
+    h = hashlib.sha1(np.ascontiguousarray(X, dtype=np.float64).tobytes())
+    h.update(json.dumps({"shape": list(X.shape), "K": list(K_list), **params}, sort_keys=True).encode())
+    return h.hexdigest()
+
+def k_sweep_score(X: np.ndarray, K_list: list[int], n_jobs: int = -1,
+                  sample_size: int = SIL_SAMPLE, minibatch_above: int = MINIBATCH_ROWS,
+                  seed: int = SWEEP_SEED, cache_dir: str | None = None) -> pd.DataFrame:
+    """
+    K 후보별 KMeans 적합 + silhouette/CH/DB/최소비율 (silhouette 내림차순).
+    - K 후보는 프로세스 병렬(joblib, n_jobs), 후보 1개/n_jobs=1/행 수 < PARALLEL_MIN_ROWS면 순차
+    - silhouette는 클러스터 층화 고정 시드 표본(sample_size), 행 수 ≥ minibatch_above면 MiniBatchKMeans
+    - 결과 표는 입력 해시별 캐시(프로세스 메모리 + cache_dir가 있으면 k_sweep_<해시>.csv)
+    """
+    X = np.asarray(X, dtype=float)
+    ks = [k for k in K_list if 1 < k < len(X)]
+    key = sweep_hash(X, ks, sample_size=sample_size, minibatch_above=minibatch_above, seed=seed)
+    if key in _SWEEP_CACHE:
+        return _SWEEP_CACHE[key].copy()
+    path = None
+    if cache_dir:
+        import os
+        os.makedirs(cache_dir, exist_ok=True)
+        path = os.path.join(cache_dir, f"k_sweep_{key[:16]}.csv")
+        if os.path.exists(path):
+            out = pd.read_csv(path, float_precision="round_trip")
+            _SWEEP_CACHE[key] = out
+            return out.copy()
+
+    if n_jobs == 1 or len(ks) <= 1 or len(X) < PARALLEL_MIN_ROWS:
+        rows = [_score_k(X, k, sample_size, minibatch_above, seed) for k in ks]
+    else:
+        from joblib import Parallel, delayed
+        rows = Parallel(n_jobs=min(len(ks), n_jobs) if n_jobs > 0 else n_jobs)(
+            delayed(_score_k)(X, k, sample_size, minibatch_above, seed) for k in ks)
+    out = pd.DataFrame(rows, columns=SWEEP_COLS).sort_values("silhouette", ascending=False)
+
+    if len(_SWEEP_CACHE) >= _SWEEP_CACHE_SIZE:
+        _SWEEP_CACHE.pop(next(iter(_SWEEP_CACHE)))
+    _SWEEP_CACHE[key] = out
+    if path:
+        out.to_csv(path, index=False, float_format="%.17g")
+    return out.copy()
 
 def soft_membership_from_dist(dists: np.ndarray, temperature: float=1.0) -> np.ndarray:
     """
@@ -65,6 +138,8 @@ def persona_clustering(
     K_list: list[int]|None=None,
     pick_rule: str="best_silhouette",   # or "balance" (=silhouette 우선 + min_ratio 페널티)
     temperature: float=1.0,
+    n_jobs: int=-1,
+    sweep_cache_dir: str|None=None,
 ):
     """
     반환:
@@ -109,7 +184,7 @@ def persona_clustering(
     X = scaler.fit_transform(base[feature_cols].fillna(0.0).values)
 
     # K sweep
-    sweep = k_sweep_score(X, K_list)
+    sweep = k_sweep_score(X, K_list, n_jobs=n_jobs, cache_dir=sweep_cache_dir)
     if sweep.empty:
         raise ValueError("K sweep 결과가 비었습니다. feature/표본 수를 확인하세요.")
 
@@ -156,6 +231,8 @@ def _build_argparser():
     ap.add_argument("--K_list", default="3,4,5,6,7,8,9")
     ap.add_argument("--pick_rule", default="best_silhouette", choices=["best_silhouette","balance"])
     ap.add_argument("--temperature", type=float, default=1.0)
+    ap.add_argument("--n_jobs", type=int, default=-1, help="K sweep 병렬 프로세스 수(1이면 순차)")
+    ap.add_argument("--sweep_cache_dir", default=None, help="K sweep 결과 캐시 폴더(입력 해시별 CSV)")
     ap.add_argument("--out_csv", default="persona_labels.csv")
     ap.add_argument("--out_info_json", default=None)
     return ap
@@ -163,7 +240,7 @@ def _build_argparser():
 def main():
     import json
     args = _build_argparser().parse_args()
-    df = pd.read_csv(args.csv_path)
+    df = read_telecom_csv(args.csv_path) if read_telecom_csv else pd.read_csv(args.csv_path)
     unit_cols = [c for c in args.unit_cols.split(",") if c]
     feature_cols = [c for c in args.features.split(",") if c] if args.features else None
     K_list = [int(k) for k in args.K_list.split(",") if k]
@@ -179,6 +256,8 @@ def main():
         K_list=K_list,
         pick_rule=args.pick_rule,
         temperature=args.temperature,
+        n_jobs=args.n_jobs,
+        sweep_cache_dir=args.sweep_cache_dir,
     )
     labels_df.to_csv(args.out_csv, index=False, encoding="utf-8-sig")
     print(f"✅ 라벨 저장: {args.out_csv} (rows={len(labels_df)})")
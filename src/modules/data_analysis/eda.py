@@ -10,6 +10,15 @@ import numpy as np, pandas as pd, warnings, argparse, sys
 warnings.filterwarnings("ignore")
 pd.set_option("display.width", 180); pd.set_option("display.max_columns", 200)
 
+# 선택 의존성: 타입 지정 로더(risk_scoring.telecom_schema — 카테고리/float32, pyarrow 엔진)
+try:
+    try:
+        from .risk_scoring.telecom_schema import read_telecom_csv  # type: ignore
+    except ImportError:
+        from risk_scoring.telecom_schema import read_telecom_csv  # type: ignore
+except Exception:
+    read_telecom_csv = None
+
 # ===================== 기본 유틸 =====================
 def ensure_year_month(df: pd.DataFrame, month_col: str="year_month") -> pd.DataFrame:
     if month_col in df and np.issubdtype(df[month_col].dtype, np.datetime64):
@@ -46,8 +55,8 @@ def monthwise_robust_z_log1p(df: pd.DataFrame, cols: list[str], month_col: str)
 def compute_delta3m(df: pd.DataFrame, unit_cols: list[str], month_col: str, std_cols: list[str]) -> pd.DataFrame:
     out = df.sort_values(unit_cols + [month_col]).copy()
     for c in std_cols:
-        cur3  = out.groupby(unit_cols)[c].transform(lambda x: x.rolling(3, min_periods=3).mean())
-        prev3 = out.groupby(unit_cols)[c].transform(lambda x: x.shift(3).rolling(3, min_periods=3).mean())
+        cur3  = out.groupby(unit_cols, observed=True)[c].transform(lambda x: x.rolling(3, min_periods=3).mean())
+        prev3 = out.groupby(unit_cols, observed=True)[c].transform(lambda x: x.shift(3).rolling(3, min_periods=3).mean())
         out[c+"_delta3m"] = cur3 - prev3
     return out
 
@@ -55,7 +64,7 @@ def add_z_and_flags(df: pd.DataFrame, month_col: str, unit_cols: list[str], std_
                     z_thr: float=1.96, delta_abs_q: float=0.85) -> pd.DataFrame:
     out = df.copy()
     for c in std_cols:
-        rol_std = (out.groupby(unit_cols)[c]
+        rol_std = (out.groupby(unit_cols, observed=True)[c]
                      .transform(lambda x: x.rolling(12, min_periods=6).std()))
         se = np.sqrt(2*(rol_std**2)/3.0)
         dz = out[c+"_delta3m"]
@@ -87,7 +96,7 @@ def sustained_hits(df: pd.DataFrame, unit_cols: list[str], month_col: str, std_c
         if rec.empty:
             out_rows.append([c, 0, np.nan, np.nan]); continue
 
-        prev3 = tmp.groupby(unit_cols)[c].transform(lambda x: x.shift(1).rolling(3, min_periods=3).mean())
+        prev3 = tmp.groupby(unit_cols, observed=True)[c].transform(lambda x: x.shift(1).rolling(3, min_periods=3).mean())
         tmp["__prev3"] = prev3
         merged = rec.merge(tmp[[*unit_cols, month_col, "__prev3"]], on=[*unit_cols, month_col], how="left").dropna(subset=["__prev3"])
 
@@ -122,10 +131,10 @@ def placebo_flag_rate(base: pd.DataFrame, unit_cols: list[str], month_col: str,
                       n_perm: int=30, seed: int=42, max_cohorts: int|None=None) -> pd.Series:
     rng = np.random.RandomState(seed)
     if max_cohorts:
-        idx = base.groupby(unit_cols).ngroup()
+        idx = base.groupby(unit_cols, observed=True).ngroup()
         keep_ids = np.unique(idx)[:max_cohorts]
         base = base[idx.isin(keep_ids)]
-    unit_groups = list(base.groupby(unit_cols))
+    unit_groups = list(base.groupby(unit_cols, observed=True))
 
     rates=[]
     for _ in range(n_perm):
@@ -235,7 +244,7 @@ def _build_argparser():
 
 def main():
     args = _build_argparser().parse_args()
-    df = pd.read_csv(args.csv_path)
+    df = read_telecom_csv(args.csv_path) if read_telecom_csv else pd.read_csv(args.csv_path)
     unit_cols = [c for c in args.unit_cols.split(",") if c]
     exclude = []
     if args.exclude_months:
@@ -8,7 +8,6 @@ from typing import List, Tuple, Dict
 import re
 import numpy as np
 import pandas as pd
-from scipy.stats import ks_2samp
 
 # ---------------------------
 # year_month & 대표수치 & per-capita
@@ -74,21 +73,83 @@ def _psi(a: pd.Series, b: pd.Series, bins: int = 20, eps: float = 1e-12) -> floa
     brt = bh / (bh.sum() + eps)
     return np.sum((ar - brt) * np.log((ar + eps) / (brt + eps)))
 
-def drift_table(df: pd.DataFrame, cols: List[str], by: str = "year_month", topn: int = 10) -> Tuple[pd.DataFrame, pd.DataFrame]:
-    rows = []
-    months = sorted(df[by].unique())
-    for i in range(1, len(months)):
-        m_prev, m_cur = months[i - 1], months[i]
-        dfp = df[df[by] == m_prev]
-        dfc = df[df[by] == m_cur]
-        for col in cols:
-            try:
-                psi_v = _psi(dfp[col], dfc[col], bins=20)
-                ks_v = ks_2samp(dfp[col].dropna(), dfc[col].dropna(), alternative="two-sided", mode="auto").statistic
-                rows.append([m_prev, m_cur, col, psi_v, ks_v])
-            except Exception:
-                continue
-    out = pd.DataFrame(rows, columns=["month_prev", "month_cur", "metric", "PSI", "KS"])
+def _sorted_hist(s: np.ndarray, edges: np.ndarray) -> np.ndarray:
+    """정렬된 표본의 구간 건수 (np.histogram과 같음: [e_i, e_i+1), 마지막 구간만 닫힘)."""
+    c = np.searchsorted(s, edges, side="left")
+    c[-1] = np.searchsorted(s, edges[-1], side="right")
+    return np.diff(c)
+
+
+def _pair_psi_ks(sa: np.ndarray, sb: np.ndarray, bins: int = 20, eps: float = 1e-12):
+    """
+    정렬된(NaN 제외) 두 월 표본 → (PSI, KS). _psi / ks_2samp(...).statistic과 같은 값.
+    한쪽이 비면 None (ks_2samp가 실패해 기존 루프에서도 행이 빠지던 경우).
+    """
+    if len(sa) == 0 or len(sb) == 0:
+        return None
+    na, nb = len(sa), len(sb)
+    both = np.concatenate([sa, sb])
+    idx = np.argsort(both, kind="stable")         # 정렬된 두 run 병합
+    merged = both[idx]
+    br = np.unique(np.quantile(merged, np.linspace(0, 1, bins + 1)))
+    ah, bh = _sorted_hist(sa, br), _sorted_hist(sb, br)
+    ar = ah / (ah.sum() + eps)
+    brt = bh / (bh.sum() + eps)
+    psi = np.sum((ar - brt) * np.log((ar + eps) / (brt + eps)))
+    # KS: 병합 순서의 누적 건수 = 두 경험 CDF. 같은 값 묶음의 마지막 위치에서만 비교
+    ca = np.cumsum(idx < na)
+    cb = np.arange(1, na + nb + 1) - ca
+    last = np.r_[merged[1:] != merged[:-1], True]
+    return psi, float(np.max(np.abs(ca[last] / (1.0 * na) - cb[last] / (1.0 * nb))))
+
+
+def _column_drift(x: np.ndarray, bounds: np.ndarray, bins: int = 20) -> List:
+    """월 순으로 모인 한 컬럼 값 → 인접 월 쌍별 (i, PSI, KS). 월마다 한 번만 정렬."""
+    sorted_m = []
+    for m in range(len(bounds) - 1):
+        v = np.sort(x[bounds[m]:bounds[m + 1]])   # NaN은 끝으로
+        sorted_m.append(v[:len(v) - int(np.isnan(v).sum())])
+    out = []
+    for i in range(1, len(sorted_m)):
+        r = _pair_psi_ks(sorted_m[i - 1], sorted_m[i], bins=bins)
+        if r is not None:
+            out.append((i, *r))
+    return out
+
+
+def drift_table(df: pd.DataFrame, cols: List[str], by: str = "year_month", topn: int = 10,
+                n_jobs: int = -1) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    인접 월(month_prev → month_cur) × 컬럼별 PSI(20분위, 두 월 합친 분위 경계) / KS.
+    행을 월 순으로 한 번 모은 뒤 컬럼마다 월별 정렬 1회 → 쌍별 구간 건수는 searchsorted,
+    KS는 두 정렬 표본 병합의 누적 건수.
+    컬럼은 스레드 병렬(n_jobs, -1이면 CPU 수; numpy 정렬/탐색은 GIL 해제).
+    숫자로 바꿀 수 없는 컬럼, 한쪽 월이 전부 결측인 쌍은 건너뜀.
+    """
+    codes, months = pd.factorize(df[by], sort=True)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    bounds = np.r_[0, np.cumsum(np.bincount(codes[order], minlength=len(months)))]
+
+    def one(col):
+        try:
+            x = df[col].to_numpy(dtype=np.float64, na_value=np.nan)[order]
+        except (TypeError, ValueError):
+            return col, []
+        return col, _column_drift(x, bounds)
+
+    if n_jobs == 1 or len(cols) < 2:
+        results = [one(c) for c in cols]
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=None if n_jobs < 0 else n_jobs) as ex:
+            results = list(ex.map(one, cols))
+
+    # 기존 순서(월 쌍 → 컬럼)로 정렬
+    rows = sorted(((i, j, months[i - 1], months[i], col, psi_v, ks_v)
+                   for j, (col, res) in enumerate(results) for i, psi_v, ks_v in res),
+                  key=lambda r: (r[0], r[1]))
+    out = pd.DataFrame([r[2:] for r in rows], columns=["month_prev", "month_cur", "metric", "PSI", "KS"])
     rank = (
         out.sort_values(["month_cur", "PSI"], ascending=[True, False])
         .groupby("month_cur")
@@ -0,0 +1,221 @@
+# benchmark.py
+# -*- coding: utf-8 -*-
+"""
+학습/추론 스케일 벤치마크 (합성 데이터 100k / 1M / 10M 행)
+- 데이터: synthetic.write_telecom_csv로 생성(크기·시드별 캐시), 페르소나 센터는 make_persona_centers로 1회
+- 실행: train_pipeline / predict_persona를 크기별 별도 프로세스로 실행 → 실행별 최대 RSS가 섞이지 않음
+  각 실행의 profile.json(단계별 시간/최대 RSS)을 읽어 기록
+- 규칙 해석 점검: 학습 meta.json column_resolution.rules로 rules.yml 하이브리드 신호/게이트가 모두 컬럼에
+  연결됐는지 확인. 못 찾은 신호가 있으면 라벨이 규칙이 아닌 auto-split에서 나와 라벨링 경로를 재지 못하므로
+  [FAIL] 출력 후 종료 코드 1
+- 기록: throughput(rows/s), wall 시간, 최대 RSS, 단계별 시간 → <work_dir>/bench_<시각>.json
+- 회귀 판정: --baseline JSON과 비교해 시간 > 기준×(1+time_tol) 또는 RSS > 기준×(1+mem_tol)이면 [REGRESS]
+  하나라도 있으면 종료 코드 1 (CI용). --update-baseline이면 이번 결과를 기준으로 저장
+  기준과 실행 환경(CPU 수/라이브러리 버전)이 다르면 경고만 출력(비교는 수행)
+
+사용 예 (src/modules 에서):
+    python -m data_analysis.risk_scoring.benchmark --sizes 100k,1M --baseline bench_baseline.json
+    python -m data_analysis.risk_scoring.benchmark --sizes 100k --baseline bench_baseline.json --update-baseline
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os, sys, json, time, platform, argparse, subprocess
+from datetime import datetime
+
+from .synthetic import parse_rows, write_telecom_csv
+
+DEFAULT_RULES = Path(__file__).resolve().parent / "rules.yml"
+
+DEFAULT_SIZES = ("100k", "1M", "10M")
+PHASES = ("train", "predict")
+MODULE_ROOT = Path(__file__).resolve().parents[2]   # src/modules (python -m 실행 위치)
+PKG = __package__ or "data_analysis.risk_scoring"
+
+
+def environment() -> Dict:
+    """비교 가능성 판단용 실행 환경 요약."""
+    env = {"python": platform.python_version(), "platform": platform.platform(),
+           "cpu_count": os.cpu_count()}
+    for mod in ("numpy", "pandas", "sklearn", "lightgbm", "pyarrow"):
+        try:
+            env[mod] = __import__(mod).__version__
+        except Exception:
+            env[mod] = None
+    return env
+
+
+def _run(args: List[str], log_path: Path, timeout: Optional[float]) -> Dict:
+    t0 = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        try:
+            rc = subprocess.run([sys.executable, "-m", *args], cwd=str(MODULE_ROOT),
+                                stdout=log, stderr=subprocess.STDOUT, timeout=timeout).returncode
+        except subprocess.TimeoutExpired:
+            rc = "timeout"
+    return {"returncode": rc, "wall_sec": round(time.perf_counter() - t0, 2), "log": str(log_path)}
+
+
+def _read_profile(out_dir: Path) -> Dict:
+    try:
+        with open(out_dir / "profile.json", "r", encoding="utf-8") as f:
+            prof = json.load(f)
+    except Exception:
+        return {}
+    return {"total_sec": prof.get("total_sec"), "peak_rss_mb": prof.get("peak_rss_mb"),
+            "stages": {s["name"]: s["wall_sec"] for s in prof.get("stages", [])}}
+
+
+def unresolved_rule_signals(art_dir: Path, rules_path: Path = DEFAULT_RULES) -> Optional[List[str]]:
+    """
+    하이브리드 신호/게이트 중 학습에서 컬럼을 못 찾은 것("라벨:이름"). meta에 기록이 없으면 None.
+    리스트 신호(폴백 이름)는 하나라도 해석되면 통과.
+    """
+    from .rules_loader import load_hybrid_rules
+    try:
+        with open(art_dir / "meta.json", "r", encoding="utf-8") as f:
+            resolved = json.load(f)["column_resolution"]["rules"]
+    except Exception:
+        return None
+    missing = []
+    for lbl, cfg in load_hybrid_rules(rules_path)["labels"].items():
+        gate = cfg.get("gate")
+        gates = gate if isinstance(gate, list) else ([gate] if gate else [])
+        for s in list(cfg.get("signals") or []) + gates:
+            names = s.get("col")
+            names = list(names) if isinstance(names, (list, tuple)) else [names]
+            if not any(resolved.get(n) for n in names if n):
+                missing.append(f"{lbl}:{names[0]}")
+    return missing
+
+
+def prepare_data(size: str, work_dir: Path, seed: int = 0, n_months: int = 30) -> Dict:
+    """크기별 합성 CSV + 페르소나 센터(있으면 재사용)."""
+    data_dir = work_dir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    csv = data_dir / f"telecom_{size}_s{seed}.csv"
+    centers = data_dir / f"centers_{size}_s{seed}.csv"
+    if not csv.exists():
+        write_telecom_csv(str(csv), parse_rows(size), n_months=n_months, seed=seed)
+    if not centers.exists():
+        r = _run([f"{PKG}.make_persona_centers", "--csv", str(csv), "--out", str(centers)],
+                 work_dir / "logs" / f"centers_{size}.log", None)
+        if r["returncode"] != 0:
+            print(f"[BENCH] centers 생성 실패({size}) → 페르소나 0 폴백으로 진행: {r['log']}")
+    return {"csv": csv, "centers": centers}
+
+
+def run_case(size: str, work_dir: Path, seed: int = 0, phases=PHASES,
+             timeout: Optional[float] = None, n_months: int = 30) -> Dict:
+    """한 크기에 대해 train → predict 실행, 단계별 기록."""
+    (work_dir / "logs").mkdir(parents=True, exist_ok=True)
+    data = prepare_data(size, work_dir, seed, n_months)
+    rows = parse_rows(size)
+    art, pred = work_dir / f"art_{size}", work_dir / f"pred_{size}"
+    cmds = {
+        "train": [f"{PKG}.train_pipeline", "--csv_path", str(data["csv"]),
+                  "--centers_path", str(data["centers"]), "--out_dir", str(art)],
+        "predict": [f"{PKG}.predict_persona", "--csv", str(data["csv"]), "--artifacts", str(art),
+                    "--centers", str(data["centers"]), "--out_dir", str(pred)],
+    }
+    out_dirs = {"train": art, "predict": pred}
+    rec = {"rows": rows}
+    for ph in phases:
+        print(f"[BENCH] {size} {ph} ...")
+        r = _run(cmds[ph], work_dir / "logs" / f"{ph}_{size}.log", timeout)
+        r.update(_read_profile(out_dirs[ph]))
+        r["ok"] = r["returncode"] == 0
+        r["rows_per_sec"] = round(rows / r["wall_sec"], 1) if r["ok"] and r["wall_sec"] > 0 else None
+        rec[ph] = r
+        print(f"[BENCH] {size} {ph}: ok={r['ok']} wall={r['wall_sec']:.1f}s "
+              f"peak={r.get('peak_rss_mb')}MB rows/s={r['rows_per_sec']}")
+        if ph == "train" and r["ok"]:
+            r["rules_unresolved"] = unresolved_rule_signals(art)
+            if r["rules_unresolved"]:
+                print(f"[BENCH][FAIL] {size}: 해석 안 된 규칙 신호 {len(r['rules_unresolved'])}개 "
+                      f"→ {r['rules_unresolved']}")
+        if not r["ok"]:
+            break   # 학습 실패면 추론 불가
+    return rec
+
+
+def compare(results: Dict, baseline: Dict, time_tol: float = 0.25, mem_tol: float = 0.15) -> List[Dict]:
+    """기준 대비 회귀 목록 (크기 × 단계 × 지표). 기준에 없는 크기/단계는 건너뜀."""
+    regress = []
+    for size, rec in results.get("cases", {}).items():
+        base = baseline.get("cases", {}).get(size)
+        if not base:
+            continue
+        for ph in PHASES:
+            cur, ref = rec.get(ph), base.get(ph)
+            if not (cur and ref and ref.get("ok")):
+                continue
+            if not cur.get("ok"):
+                regress.append({"size": size, "phase": ph, "metric": "ok", "base": True, "cur": False})
+                continue
+            for metric, tol in (("wall_sec", time_tol), ("peak_rss_mb", mem_tol)):
+                b, c = ref.get(metric), cur.get(metric)
+                if b and c and c > b * (1.0 + tol):
+                    regress.append({"size": size, "phase": ph, "metric": metric,
+                                    "base": b, "cur": c, "ratio": round(c / b, 3)})
+    return regress
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help="콤마리스트 (예: 100k,1M,10M)")
+    ap.add_argument("--phases", default=",".join(PHASES), help="train,predict")
+    ap.add_argument("--work_dir", default="bench", help="합성 데이터/산출물/결과 폴더")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--months", type=int, default=30, help="합성 데이터 월 수")
+    ap.add_argument("--timeout", type=float, default=None, help="실행별 제한 시간(초)")
+    ap.add_argument("--baseline", default=None, help="비교할 기준 JSON")
+    ap.add_argument("--update-baseline", dest="update_baseline", action="store_true",
+                    help="이번 결과를 --baseline 경로에 기준으로 저장")
+    ap.add_argument("--time_tol", type=float, default=0.25, help="시간 회귀 허용 비율")
+    ap.add_argument("--mem_tol", type=float, default=0.15, help="최대 RSS 회귀 허용 비율")
+    args = ap.parse_args()
+
+    work_dir = Path(args.work_dir).resolve()
+    work_dir.mkdir(parents=True, exist_ok=True)
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    phases = [p.strip() for p in args.phases.split(",") if p.strip() in PHASES]
+
+    results = {"created_at": datetime.now().isoformat(), "seed": args.seed, "months": args.months,
+               "env": environment(), "cases": {}}
+    for size in sizes:
+        results["cases"][size] = run_case(size, work_dir, args.seed, phases, args.timeout, args.months)
+
+    regress = []
+    if args.baseline and os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        diff_env = {k: (baseline.get("env", {}).get(k), v) for k, v in results["env"].items()
+                    if k != "platform" and baseline.get("env", {}).get(k) != v}
+        if diff_env:
+            print(f"[BENCH][WARN] 기준과 실행 환경이 다름: {diff_env}")
+        regress = compare(results, baseline, args.time_tol, args.mem_tol)
+        results["baseline"] = args.baseline
+        results["regressions"] = regress
+        for r in regress:
+            print(f"[REGRESS] {r['size']} {r['phase']} {r['metric']}: {r['base']} → {r['cur']}")
+        if not regress:
+            print("[BENCH] no regressions")
+
+    unresolved = {size: rec["train"]["rules_unresolved"] for size, rec in results["cases"].items()
+                  if rec.get("train", {}).get("rules_unresolved")}
+    if unresolved:
+        results["rules_unresolved"] = unresolved
+
+    out_path = work_dir / f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    print(f"[BENCH] saved: {out_path}")
+    if args.baseline and args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"[BENCH] baseline updated: {args.baseline}")
+    sys.exit(1 if (regress or unresolved) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+# column_catalog.py
+# -*- coding: utf-8 -*-
+"""
+컬럼 이름 해석 카탈로그 (프레임 컬럼 목록당 1회 구성)
+- 정확 일치: set, 접미 정규화(_pc_std/_pc → _std) 이름 → 첫 컬럼: dict
+- 느슨(부분 문자열) 일치: 컬럼명을 '\\n'으로 이은 문자열에서 str.find → 시작 오프셋 이분 탐색으로
+  컬럼 번호 (컬럼마다 `in` 비교하는 파이썬 루프 없음), 결과는 질의별 메모
+- 해석 규칙은 기존 함수와 같음
+    resolve(name)  = train_pipeline._resolve_col (정확 → base_std → base → *_std·'평균'·짧은 이름 우선 부분 일치)
+    fuzzy(name)    = build_rag_aug.fuzzy_resolve (정확 → 부분 일치, 같은 우선순위)
+    first(name)    = label_rules._col (정확 → 이름을 포함하는 첫 컬럼), with_suffix = _col_sfx
+    normalized     = persona_soft._normalize_columns의 이름 매핑(같은 정규화명이면 첫 컬럼)
+- known: 이름 → 컬럼 매핑(dict). 있으면 그 값을 먼저 쓰고(이 프레임에 없으면 None, 다시 찾지 않음),
+  없으면 해석해서 기록 → 학습이 meta.json "column_resolution"에 남기고 추론은 그대로 재사용
+
+사용 예:
+    cat = catalog_for(df.columns)
+    cat.resolve("평균 통화량_pc_std")            # → "평균 통화량_std"
+    cat.first("연체", known=meta["column_resolution"]["rules"])
+"""
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence
+
+SUFFIXES = ("_pc_std", "_pc", "_std")
+_CACHE_SIZE = 8
+_cache: Dict[int, tuple] = {}
+
+
+def strip_suffix(name: str) -> str:
+    """첫 번째로 맞는 접미(_pc_std/_pc/_std) 제거."""
+    for suf in SUFFIXES:
+        if name.endswith(suf):
+            return name[: -len(suf)]
+    return name
+
+
+def normalize_name(name):
+    """_pc_std / _pc → _std (그 외 그대로)."""
+    if not isinstance(name, str):
+        return name
+    if name.endswith("_pc_std"):
+        return name[:-7] + "_std"
+    if name.endswith("_pc"):
+        return name[:-3] + "_std"
+    return name
+
+
+class ColumnCatalog:
+    def __init__(self, columns: Sequence):
+        self.columns: List[str] = [c for c in columns if isinstance(c, str)]
+        self.exact = set(self.columns)
+        self.normalized: Dict[str, str] = {}
+        for c in columns:
+            self.normalized.setdefault(normalize_name(c), c)
+        self._blob = "\n".join(self.columns)
+        self._starts, pos = [], 0
+        for c in self.columns:
+            self._starts.append(pos)
+            pos += len(c) + 1
+        self._memo: Dict[tuple, Optional[str]] = {}
+
+    def containing(self, sub: str) -> List[str]:
+        """sub를 포함하는 컬럼(원래 순서)."""
+        if not sub or "\n" in sub:
+            return [c for c in self.columns if sub in c]
+        out, pos, blob = [], 0, self._blob
+        while True:
+            hit = blob.find(sub, pos)
+            if hit < 0:
+                return out
+            i = bisect_right(self._starts, hit) - 1
+            out.append(self.columns[i])
+            pos = self._starts[i] + len(self.columns[i]) + 1   # 같은 컬럼 중복 방지: 다음 컬럼부터
+
+    def _pick(self, base: str) -> Optional[str]:
+        pool = self.containing(base)
+        if not pool:
+            return None
+        pool = [c for c in pool if c.endswith("_std")] or pool
+        return min(pool, key=lambda x: (0 if "평균" in x else 1, len(x)))   # min = 안정 정렬의 첫 원소
+
+    def _lookup(self, kind: str, name, known: Optional[Dict], fn) -> Optional[str]:
+        if known is not None and name in known:
+            c = known[name]
+            return c if c in self.exact else None
+        key = (kind, name)
+        if key not in self._memo:
+            self._memo[key] = fn(name)
+        if known is not None:
+            known[name] = self._memo[key]
+        return self._memo[key]
+
+    def resolve(self, name, known: Optional[Dict] = None) -> Optional[str]:
+        if not isinstance(name, str) or not name:
+            return None
+
+        def run(n):
+            base = strip_suffix(n)
+            for c in (n, f"{base}_std", base):
+                if c in self.exact:
+                    return c
+            return self._pick(base)
+        return self._lookup("resolve", name, known, run)
+
+    def fuzzy(self, name, known: Optional[Dict] = None) -> Optional[str]:
+        if not isinstance(name, str) or not name:
+            return None
+        return self._lookup("fuzzy", name, known,
+                            lambda n: n if n in self.exact else self._pick(strip_suffix(n)))
+
+    def first(self, name, known: Optional[Dict] = None) -> Optional[str]:
+        if isinstance(name, (list, tuple)):
+            # 리스트: 앞에서부터 폴백 (기존 `_col(a) or _col(b)`)
+            for n in name:
+                c = self.first(n, known)
+                if c:
+                    return c
+            return None
+        if not name:
+            return None
+
+        def run(n):
+            if n in self.exact:
+                return n
+            pool = self.containing(n)
+            return pool[0] if pool else None
+        return self._lookup("first", name, known, run)
+
+    def with_suffix(self, name, sfx: str, known: Optional[Dict] = None) -> Optional[str]:
+        base = self.first(name, known)
+        if not base:
+            return None
+        cand = base + sfx
+        return cand if cand in self.exact else None
+
+
+def catalog_for(columns: Sequence) -> ColumnCatalog:
+    """
+    컬럼 목록 → 카탈로그. pandas Index는 불변이라 같은 객체면 재사용(컬럼을 추가하면 새 Index → 새 카탈로그).
+    리스트 등 가변 목록은 매번 새로 구성.
+    """
+    if not hasattr(columns, "is_unique") or not hasattr(columns, "get_loc"):
+        return ColumnCatalog(columns)
+    hit = _cache.get(id(columns))
+    if hit is not None and hit[0] is columns:
+        return hit[1]
+    if len(_cache) >= _CACHE_SIZE:
+        _cache.pop(next(iter(_cache)))
+    cat = ColumnCatalog(columns)
+    _cache[id(columns)] = (columns, cat)
+    return cat
@@ -0,0 +1,321 @@
+# drift_monitor.py
+# -*- coding: utf-8 -*-
+"""
+피처 드리프트 모니터 (학습 분포 대비 새 월의 PSI / KS)
+- 베이스라인: 모델 피처 전체의 분위수 구간 경계 + 학습 구간 구간별 건수 → monitor_baseline.npz
+  (train_pipeline이 저장. JSON 분위수(monitor_baseline.json)보다 작고 로드가 빠름)
+- 구간(피처당 N_BINS+3): [학습 최솟값 미만] + 분위수 N_BINS개 + [학습 최댓값 초과] + [NaN]
+  (0/1 피처처럼 경계가 겹쳐도 같은 값은 항상 같은 구간 → 학습/추론 집계가 일치)
+- 집계: 피처 열마다 searchsorted 한 번(경계 끝에 [최댓값 직후, NaN]을 붙여 범위 밖/NaN까지 한 번에)
+  → (월, 구간) 평탄 인덱스 bincount. pd.to_numeric/열별 비교 없음, 청크(CHUNK_ROWS) 단위
+  → 배치/스트리밍(월별 update) 모두 같은 누적기, 월별 결과는 입력을 나눠 넣어도 같다
+- 지표(월 × 피처): PSI, KS(구간 CDF 최대 차), 범위 밖 비율(학습 최소/최대 밖), NaN 비율
+- 월 상수 피처(집계 Δ3m/Trend12m: 월마다 값 하나): 한 달이 한 구간에 몰려 PSI가 항상 크므로 PSI/KS 제외.
+  대신 학습 월별 값 분포(평균/표준편차/최소/최대)를 저장하고 새 달의 값을 범위/z로 판정
+  (학습 범위 안: ok, 밖이면 |z| < MONTH_Z_ALERT: watch, 그 외 alert) → 학습 월을 채점하면 항상 ok
+- 출력: drift_features.parquet(월 × 피처), drift_labels.parquet(월 × 라벨: 라벨이 쓰는 피처 요약),
+  feature_drift_warn.csv(전체 기간 PSI ≥ PSI_ALERT 또는 범위 밖 ≥ OOB_WARN)
+
+사용 예:
+    base = DriftBaseline.build(X_train, features); base.save(out_dir)
+    acc = DriftBaseline.load(artifacts_dir).accumulator()
+    acc.update(X, months=row_months(df_raw))     # 스트리밍이면 월마다 acc.update(X, months=month)
+    acc.write(out_dir, meta["per_label_features"])
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+BASELINE_FILE = "monitor_baseline.npz"
+N_BINS = 20
+CHUNK_ROWS = 64 * 1024
+PSI_WATCH, PSI_ALERT = 0.1, 0.2
+OOB_WARN = 0.2
+MONTH_Z_ALERT = 3.0
+_EPS = 1e-6
+EDGE_TOL = 1e-9
+_ALL = "all"
+
+
+def row_months(df: pd.DataFrame) -> Optional[pd.Series]:
+    """행별 월(year_month, df와 같은 인덱스). 만들 수 없으면 None(전체를 한 묶음으로 집계)."""
+    from .train_pipeline import ensure_year_month
+    src = [c for c in ("year_month", "month", "year", "month_num") if c in df.columns]
+    try:
+        return ensure_year_month(df[src].copy())["year_month"]
+    except Exception:
+        return None
+
+
+class DriftBaseline:
+    """
+    피처별 분위수 경계(F × (N_BINS+1)) + 학습 구간 구간별 건수(F × (N_BINS+3))
+    + 월 상수 여부(F) + 월 상수 피처의 학습 월별 값 통계(F × 4: 평균, 표준편차, 최소, 최대; 그 외 NaN).
+    """
+
+    def __init__(self, features: List[str], edges: np.ndarray, counts: np.ndarray,
+                 month_const: Optional[np.ndarray] = None, month_stats: Optional[np.ndarray] = None):
+        self.features = list(features)
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.n_bins = self.edges.shape[1] - 1
+        F = len(self.features)
+        self.month_const = (np.zeros(F, dtype=bool) if month_const is None
+                            else np.asarray(month_const, dtype=bool))
+        self.month_stats = (np.full((F, 4), np.nan) if month_stats is None
+                            else np.asarray(month_stats, dtype=np.float64))
+        # searchsorted용 확장 경계: [e0..e(B-1), 최댓값 직후, NaN] (NaN은 정렬상 맨 뒤).
+        # 월 상수 피처(집계 Δ/Trend)는 값이 경계와 정확히 같으므로, 계산 경로에 따른 1e-15 차이로
+        # 월 전체가 옆 구간으로 넘어가지 않게 경계를 상대 EDGE_TOL만큼 낮춤(학습/추론 같은 규칙)
+        tol = EDGE_TOL * np.maximum(1.0, np.abs(self.edges))
+        self._ext = np.column_stack([self.edges[:, :-1] - tol[:, :-1], self.edges[:, -1] + tol[:, -1],
+                                     np.full(len(self.edges), np.nan)])
+
+    @property
+    def n_slots(self) -> int:
+        return self.n_bins + 3
+
+    def codes(self, x: np.ndarray, j: int) -> np.ndarray:
+        """피처 j 값 → 구간 코드. 0: 최솟값 미만, 1..N_BINS: 분위 구간, N_BINS+1: 최댓값 초과, +2: NaN."""
+        return np.searchsorted(self._ext[j], x, side="right")
+
+    @classmethod
+    def build(cls, X: pd.DataFrame, features: Optional[List[str]] = None, months=None,
+              n_bins: int = N_BINS, chunk_rows: int = CHUNK_ROWS) -> "DriftBaseline":
+        """
+        학습 X로 경계(피처별 분위수) + 구간 건수. 값이 전부 NaN인 피처는 경계 0.
+        months(행별 월, X와 같은 순서)가 있으면 월 상수 피처를 찾아 학습 월별 값 통계 저장.
+        """
+        features = list(features if features is not None else X.columns)
+        qs = np.linspace(0.0, 1.0, n_bins + 1)
+        edges = np.zeros((len(features), n_bins + 1))
+        for j, c in enumerate(features):
+            x = X[c].to_numpy(dtype=np.float64, na_value=np.nan) if c in X.columns else np.empty(0)
+            x = x[~np.isnan(x)]
+            if len(x):
+                edges[j] = np.quantile(x, qs)
+        month_const, month_stats = _month_constant_stats(X, features, months)
+        base = cls(features, edges, np.zeros((len(features), n_bins + 3), dtype=np.int64),
+                   month_const, month_stats)
+        acc = base.accumulator(chunk_rows)
+        acc.update(X)
+        base.counts = acc.counts[_ALL]
+        return base
+
+    def self_check(self, X: pd.DataFrame, months) -> pd.Series:
+        """학습 X를 월별로 채점한 (kind, status) 건수. 월 상수 피처가 ok가 아니면 경고."""
+        acc = self.accumulator()
+        acc.update(X, months=months)
+        feat = acc.feature_table()
+        bad = feat[(feat["kind"] == "month_const") & (feat["status"] != "ok")]
+        if len(bad):
+            print(f"[WARN] drift self-check: {len(bad)} month-constant feature-months not ok "
+                  f"(e.g. {bad['feature'].iloc[0]} {bad['year_month'].iloc[0]})")
+        return feat.groupby(["kind", "status"]).size()
+
+    def save(self, out_dir: str) -> str:
+        path = str(Path(out_dir) / BASELINE_FILE)
+        np.savez_compressed(path, features=np.asarray(self.features, dtype=str), edges=self.edges,
+                            counts=self.counts, month_const=self.month_const, month_stats=self.month_stats,
+                            created_at=np.asarray(datetime.now().isoformat()))
+        return path
+
+    @classmethod
+    def load(cls, artifacts_dir: str) -> Optional["DriftBaseline"]:
+        path = Path(artifacts_dir) / BASELINE_FILE
+        if not path.exists():
+            return None
+        with np.load(path) as z:
+            # 월 상수 정보가 없는 이전 베이스라인은 전부 분포 피처로 취급
+            extra = {k: z[k] for k in ("month_const", "month_stats") if k in z.files}
+            return cls(z["features"].tolist(), z["edges"], z["counts"], **extra)
+
+    def accumulator(self, chunk_rows: int = CHUNK_ROWS) -> "DriftAccumulator":
+        return DriftAccumulator(self, chunk_rows)
+
+
+def _month_constant_stats(X: pd.DataFrame, features: List[str], months):
+    """
+    월 안에서 값이 하나뿐인 피처(월 2개 이상에서 값이 다르고, 행이 2개 이상인 월이 있을 때만) 판정
+    + 그 피처들의 학습 월별 값 통계. returns (month_const(F), month_stats(F × 4))
+    """
+    F = len(features)
+    const, stats = np.zeros(F, dtype=bool), np.full((F, 4), np.nan)
+    if months is None or np.ndim(months) == 0 or len(X) == 0:
+        return const, stats
+    mcode, _ = pd.factorize(pd.DatetimeIndex(np.asarray(months)), sort=True)
+    ok = mcode >= 0
+    if not ok.any() or np.bincount(mcode[ok]).max() < 2:
+        return const, stats
+    cols = [c for c in features if c in X.columns]
+    g = X.loc[ok, cols].apply(pd.to_numeric, errors="coerce").groupby(mcode[ok])
+    gmin, gmax, gmean = g.min(), g.max(), g.mean()
+    pos = {c: j for j, c in enumerate(features)}
+    for c in cols:
+        v = gmean[c].dropna().to_numpy()
+        if len(v) < 2 or np.ptp(v) == 0:
+            continue
+        spread = (gmax[c] - gmin[c]).dropna().to_numpy()
+        if (spread <= EDGE_TOL * np.maximum(1.0, np.abs(v))).all():
+            j = pos[c]
+            const[j] = True
+            stats[j] = [v.mean(), v.std(ddof=1), v.min(), v.max()]
+    return const, stats
+
+
+class DriftAccumulator:
+    """월별 구간 건수 누적기. update()를 청크/월 단위로 여러 번 불러도 결과는 한 번에 넣은 것과 같다."""
+
+    def __init__(self, base: DriftBaseline, chunk_rows: int = CHUNK_ROWS):
+        self.base = base
+        self.chunk_rows = chunk_rows
+        self.counts: Dict[str, np.ndarray] = {}
+        # 월 상수 피처: 월별 (값 합, 값 개수) → 월 값 = 평균
+        self._const_idx = np.flatnonzero(base.month_const)
+        self.const_sums: Dict[str, np.ndarray] = {}
+        self.const_n: Dict[str, np.ndarray] = {}
+
+    def update(self, X: pd.DataFrame, months=None) -> None:
+        """months: 행별 월(배열/Series, X와 같은 순서) 또는 단일 월(스칼라) 또는 None(전체 한 묶음)."""
+        F, S = len(self.base.features), self.base.n_slots
+        if months is None or np.ndim(months) == 0:
+            keys = [_ALL if months is None else f"{pd.Timestamp(months):%Y-%m}"]
+            mcode = np.zeros(len(X), dtype=np.int64)
+        else:
+            if isinstance(months, pd.Series) and not months.index.equals(X.index):
+                months = months.reindex(X.index)
+            # 고유 월에만 strftime (행 수만큼 포맷하지 않음), 월 결측은 "unknown"
+            mcode, uniq = pd.factorize(pd.DatetimeIndex(np.asarray(months)), sort=True)
+            keys = list(uniq.strftime("%Y-%m"))
+            if (mcode < 0).any():
+                mcode = np.where(mcode < 0, len(keys), mcode)
+                keys.append("unknown")
+        K = len(keys)
+        total = np.zeros((K, F, S), dtype=np.int64)
+        moff = mcode.astype(np.int64) * S
+        for j, f in enumerate(self.base.features):
+            if f not in X.columns:   # 없는 피처 = 전부 NaN
+                total[:, j, S - 1] += np.bincount(mcode, minlength=K)
+                continue
+            x = X[f].to_numpy(dtype=np.float64, na_value=np.nan)
+            for start in range(0, len(x), self.chunk_rows):
+                stop = start + self.chunk_rows
+                flat = moff[start:stop] + self.base.codes(x[start:stop], j)
+                total[:, j] += np.bincount(flat, minlength=K * S).reshape(K, S)
+        sums = np.zeros((K, len(self._const_idx)))
+        nvals = np.zeros((K, len(self._const_idx)), dtype=np.int64)
+        for i, j in enumerate(self._const_idx):
+            f = self.base.features[j]
+            if f not in X.columns:
+                continue
+            x = X[f].to_numpy(dtype=np.float64, na_value=np.nan)
+            has = ~np.isnan(x)
+            sums[:, i] = np.bincount(mcode[has], weights=x[has], minlength=K)
+            nvals[:, i] = np.bincount(mcode[has], minlength=K)
+        for i, k in enumerate(keys):
+            self.counts[k] = self.counts.get(k, 0) + total[i]
+            self.const_sums[k] = self.const_sums.get(k, 0) + sums[i]
+            self.const_n[k] = self.const_n.get(k, 0) + nvals[i]
+
+    def _metrics(self, cur: np.ndarray) -> Dict[str, np.ndarray]:
+        """구간 건수(F × S) → PSI / KS / 범위 밖 비율 / NaN 비율 (피처별)."""
+        ref = self.base.counts
+        n = cur.sum(axis=1)
+        p = np.clip(ref / np.maximum(ref.sum(axis=1, keepdims=True), 1), _EPS, None)
+        q = np.clip(cur / np.maximum(n[:, None], 1), _EPS, None)
+        psi = ((q - p) * np.log(q / p)).sum(axis=1)
+        # KS: NaN 구간을 뺀 누적 분포
+        rv, cv = ref[:, :-1], cur[:, :-1]
+        cdf_r = np.cumsum(rv, axis=1) / np.maximum(rv.sum(axis=1, keepdims=True), 1)
+        cdf_c = np.cumsum(cv, axis=1) / np.maximum(cv.sum(axis=1, keepdims=True), 1)
+        ks = np.abs(cdf_r - cdf_c).max(axis=1)
+        oob = (cur[:, 0] + cur[:, self.base.n_bins + 1]) / np.maximum(n, 1)
+        nan = cur[:, -1] / np.maximum(n, 1)
+        # 월 상수 피처는 분포 비교가 의미 없음 → PSI/KS 제외(범위/z 판정은 feature_table)
+        psi = np.where(self.base.month_const, np.nan, psi)
+        ks = np.where(self.base.month_const, np.nan, ks)
+        return {"n": n, "psi": psi, "ks": ks, "oob_rate": oob, "nan_rate": nan}
+
+    def _month_check(self, k: str) -> Dict[str, np.ndarray]:
+        """월 k의 월 상수 피처 값 vs 학습 월별 값 분포 → month_value, month_z, status(0 ok/1 watch/2 alert)."""
+        F = len(self.base.features)
+        value, z, level = np.full(F, np.nan), np.full(F, np.nan), np.zeros(F, dtype=int)
+        idx = self._const_idx
+        if len(idx) and k in self.const_sums:
+            n = self.const_n[k]
+            v = np.where(n > 0, self.const_sums[k] / np.maximum(n, 1), np.nan)
+            mean, std, lo, hi = self.base.month_stats[idx].T
+            tol = EDGE_TOL * np.maximum(1.0, np.maximum(np.abs(lo), np.abs(hi)))
+            zz = (v - mean) / np.where(std > 0, std, np.nan)
+            outside = (v < lo - tol) | (v > hi + tol)
+            lvl = np.where(~outside, 0, np.where(np.abs(zz) < MONTH_Z_ALERT, 1, 2))
+            value[idx], z[idx], level[idx] = v, zz, lvl
+        return {"month_value": value, "month_z": z, "level": level}
+
+    def feature_table(self) -> pd.DataFrame:
+        """월 × 피처 드리프트 지표 (status: ok / watch / alert)."""
+        kind = np.where(self.base.month_const, "month_const", "dist")
+        parts = []
+        for k in sorted(self.counts):
+            m = self._metrics(self.counts[k])
+            parts.append(pd.DataFrame({"year_month": k, "feature": self.base.features, "kind": kind,
+                                       **m, **self._month_check(k)}))
+        if not parts:
+            return pd.DataFrame(columns=["year_month", "feature", "kind", "n", "psi", "ks", "oob_rate", "nan_rate",
+                                         "month_value", "month_z", "status"])
+        df = pd.concat(parts, ignore_index=True)
+        level = np.where(df["kind"] == "month_const", df.pop("level"),
+                         np.select([df["psi"] >= PSI_ALERT, df["psi"] >= PSI_WATCH], [2, 1], 0))
+        df["status"] = np.array(["ok", "watch", "alert"])[level]
+        return df
+
+    def label_table(self, feat: pd.DataFrame, per_label_features: Dict[str, List[str]]) -> pd.DataFrame:
+        """월 × 라벨: 라벨 모델이 쓰는 피처들의 status 건수 + (분포 피처) PSI/KS 요약."""
+        rows = []
+        for k, g in feat.groupby("year_month", sort=True):
+            g = g.set_index("feature")
+            for lbl, feats in per_label_features.items():
+                s = g.loc[[f for f in feats if f in g.index]]
+                if s.empty:
+                    continue
+                psi = s["psi"].dropna()   # 월 상수 피처(PSI 없음)는 PSI 요약에서 제외
+                top = psi.idxmax() if len(psi) else None
+                rows.append({
+                    "year_month": k, "label": lbl, "n_features": len(s),
+                    "n_alert": int((s["status"] == "alert").sum()),
+                    "n_watch": int((s["status"] == "watch").sum()),
+                    "mean_psi": float(psi.mean()) if len(psi) else np.nan,
+                    "max_psi": float(psi.max()) if len(psi) else np.nan,
+                    "top_feature": top, "max_ks": float(s["ks"].max()),
+                    "status": s["status"].map({"ok": 0, "watch": 1, "alert": 2}).max(),
+                })
+        out = pd.DataFrame(rows)
+        if len(out):
+            out["status"] = out["status"].map({0: "ok", 1: "watch", 2: "alert"})
+        return out
+
+    def write(self, out_dir: str, per_label_features: Optional[Dict[str, List[str]]] = None) -> Dict:
+        """drift_features.parquet / drift_labels.parquet / feature_drift_warn.csv 기록."""
+        out = Path(out_dir)
+        feat = self.feature_table()
+        feat.to_parquet(out / "drift_features.parquet", index=False)
+        labels = self.label_table(feat, per_label_features or {})
+        labels.to_parquet(out / "drift_labels.parquet", index=False)
+
+        # 전체 기간 합산 기준 경고 (기존 feature_drift_warn.csv 위치/이름 유지)
+        total = sum(self.counts.values()) if self.counts else None
+        warn = pd.DataFrame()
+        if total is not None:
+            m = self._metrics(total)
+            warn = pd.DataFrame({k: m[k] for k in ("psi", "ks", "oob_rate")}, index=self.base.features)
+            warn = warn[(warn["psi"] >= PSI_ALERT) | (warn["oob_rate"] >= OOB_WARN)].sort_values("psi", ascending=False)
+        if len(warn):
+            warn.to_csv(out / "feature_drift_warn.csv", encoding="utf-8-sig")
+            print(f"[DRIFT] {len(warn)} features show potential drift → {out / 'feature_drift_warn.csv'}")
+        n_alert = int((feat["status"] == "alert").sum())
+        print(f"[DRIFT] {len(self.base.features)} features × {len(self.counts)} month(s): "
+              f"alert={n_alert}, watch={int((feat['status'] == 'watch').sum())}")
+        return {"features": feat, "labels": labels, "warn": warn}
@@ -0,0 +1,99 @@
+# feature_plan.py
+# -*- coding: utf-8 -*-
+"""
+피처 의존성 플랜 (학습 시 meta.json['feature_plan']에 저장)
+- 모델이 실제로 쓰는 피처(per_label_features 합집합) + 소프트 페르소나 입력에서 출발해
+  _delta3m/_trend12m → _std → 원천 컬럼으로 거슬러 올라간 closure만 기록
+- 추론은 이 closure만 표준화/파생 → 넓은 입력에서 CPU/메모리 절감
+
+플랜 구조:
+    {
+      "version": 1,
+      "model_features": [...],                  # 모델 입력(합집합)
+      "std":      {"<col>_std": "<col>", ...},  # 표준화 피처 → 원천 컬럼 (원천에 이미 *_std면 자기 자신)
+      "delta3m":  {"<col>_std_delta3m": "<col>_std", ...},
+      "trend12m": {"<col>_std_trend12m": "<col>_std", ...},
+      "persona_inputs": {"<center col>": [입력 df 컬럼, ...]},
+      "passthrough": ["자치구", "성별", "연령대"],   # OHE 원천
+      "raw_columns": [...]                      # 추론 시 읽어야 할 원천 컬럼 closure
+    }
+"""
+from typing import Dict, Iterable, List, Optional
+
+from .persona_soft import _normalize_name
+
+PLAN_VERSION = 1
+DERIVED_SUFFIXES = {"delta3m": "_delta3m", "trend12m": "_trend12m"}
+OHE_SOURCES = ["자치구", "성별", "연령대"]
+# year_month 생성에 쓰일 수 있는 원천 컬럼(ensure_year_month 참조)
+MONTH_SOURCES = ["year_month", "month", "year", "month_num"]
+
+
+def _std_source(std_col: str, columns: Iterable[str]) -> str:
+    """*_std 피처의 원천: '<col>'이 있으면 그것, 없으면 원천에 이미 있던 *_std 자신."""
+    base = std_col[: -len("_std")]
+    return base if base in set(columns) else std_col
+
+
+def build_feature_plan(
+    model_features: Iterable[str],
+    columns: Iterable[str],
+    persona_inputs: Optional[Iterable[str]] = None,
+) -> Dict:
+    """
+    model_features: per_label_features 합집합
+    columns: 학습에 쓴 표준화/파생 완료 df의 컬럼(원천 포함)
+    persona_inputs: 센터 컬럼(정규화명, *_std)
+    """
+    columns = list(columns)
+    plan = {
+        "version": PLAN_VERSION,
+        "model_features": sorted(set(model_features)),
+        "std": {}, "delta3m": {}, "trend12m": {},
+        "persona_inputs": {},
+        "passthrough": [c for c in OHE_SOURCES if c in columns],
+    }
+
+    def add_std(c: str):
+        if c.endswith("_std") and c not in plan["std"]:
+            plan["std"][c] = _std_source(c, columns)
+
+    for f in plan["model_features"]:
+        for key, suf in DERIVED_SUFFIXES.items():
+            if f.endswith(suf):
+                base = f[: -len(suf)]
+                plan[key][f] = base
+                add_std(base)
+                break
+        else:
+            add_std(f)
+
+    # 소프트 페르소나: soft_membership이 이름을 정규화(_pc/_pc_std → _std)하므로
+    # 정규화 결과가 센터 컬럼이 되는 df 컬럼을 모두 입력으로 기록
+    for cc in persona_inputs or []:
+        srcs = [c for c in columns if isinstance(c, str) and _normalize_name(c) == cc]
+        plan["persona_inputs"][cc] = srcs
+        for c in srcs:
+            add_std(c)
+
+    raw = set(plan["passthrough"]) | set(plan["std"].values())
+    for srcs in plan["persona_inputs"].values():
+        raw.update(c for c in srcs if not c.endswith("_std"))
+    plan["raw_columns"] = sorted(raw)
+    return plan
+
+
+def plan_input_columns(plan: Dict) -> List[str]:
+    """추론 입력에서 남길 컬럼: 원천 closure + 이미 계산된 *_std/파생(캐시 입력용) + 월 컬럼."""
+    cols = list(plan.get("raw_columns", []))
+    cols += list(plan.get("std", {}).keys())
+    cols += list(plan.get("delta3m", {}).keys()) + list(plan.get("trend12m", {}).keys())
+    return list(dict.fromkeys(MONTH_SOURCES + cols))
+
+
+def plan_std_kwargs(plan: Dict) -> Dict[str, List[str]]:
+    """ensure_all_standardized_features(std_cols=..., derived_cols=...) 인자."""
+    return {
+        "std_cols": list(plan.get("std", {}).keys()),
+        "derived_cols": list(plan.get("delta3m", {}).keys()) + list(plan.get("trend12m", {}).keys()),
+    }
@@ -0,0 +1,273 @@
+# feature_store.py
+# -*- coding: utf-8 -*-
+"""
+표준화/파생 피처 매트릭스 캐시 (year_month 파티션 Parquet)
+- 저장 키: 피처 코드 버전 + 파라미터 → <store_dir>/<key>/
+- manifest.json: 원천 해시 + 월별 원천 해시(행 내용 + 원천 행 번호) → 바뀐 월만 재계산(월 단위 무효화)
+- _std는 월 내부 통계만 쓰므로 월 파티션 단위로 독립 계산 가능
+- Δ3m/Trend12m은 월평균 기반 월 상수 → month_derived.parquet 하나로 관리, 로드 시 월로 붙임
+- 로드: 필요한 컬럼/월만 읽기 (컬럼 + predicate pushdown)
+
+사용 예:
+    store = FeatureStore("feature_store")
+    df = store.materialize("telecom_group_monthly_all.csv")           # 전체(원천 행 순서 유지)
+    X  = store.load(columns=["평균 문자량_std", "평균 문자량_std_delta3m"],
+                    months=["2025-01-01"])
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import os, json, shutil, hashlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .telecom_schema import read_telecom_csv
+from .train_pipeline import (
+    ensure_year_month,
+    ensure_all_standardized_features,
+    standardized_columns,
+    month_rolling_diff,
+    STD_EXCLUDE_COLS,
+    DERIVED_WINDOWS,
+)
+
+# 표준화/파생 로직이 바뀌면 올려서 기존 캐시를 무효화
+FEATURE_CODE_VERSION = "monthwise-log1p-robust-z/1"
+MONTH_COL = "year_month"
+ROW_ID_COL = "__row_id"
+
+
+def _file_sha256(path: str, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _month_key(m) -> str:
+    return str(pd.Timestamp(m).date())
+
+
+def _month_hashes(df: pd.DataFrame, month_col: str = MONTH_COL) -> Dict[str, Dict]:
+    """
+    월별 원천 해시 + 행 수. df 인덱스 = 원천 행 번호(__row_id).
+    행 번호도 해시에 포함 → 앞쪽 월의 행 추가/삭제로 뒤쪽 행이 밀리면 그 월도 다시 기록
+    (월 행이 CSV에 섞여 있어도 맞음)
+    """
+    row_h = pd.util.hash_pandas_object(df.drop(columns=[month_col]), index=True)
+    out = {}
+    for m, h in row_h.groupby(df[month_col].values):
+        # uint64 합(오버플로 래핑): (행 번호, 내용) 다중집합 해시
+        s = int(np.add.reduce(h.to_numpy(dtype=np.uint64), dtype=np.uint64))
+        out[_month_key(m)] = {"hash": f"{s:016x}", "rows": int(len(h))}
+    return out
+
+
+class FeatureStore:
+    """월 파티션 피처 캐시. 파라미터가 다르면 다른 키 디렉터리를 씀."""
+
+    def __init__(self, store_dir: str, params: Optional[Dict] = None):
+        self.params = {
+            "month_col": MONTH_COL,
+            "exclude_cols": list(STD_EXCLUDE_COLS),
+            "derived_windows": [list(w) for w in DERIVED_WINDOWS],
+            **(params or {}),
+        }
+        blob = json.dumps({"code": FEATURE_CODE_VERSION, "params": self.params},
+                          ensure_ascii=False, sort_keys=True)
+        self.key = hashlib.sha256(blob.encode("utf-8")).hexdigest()[:12]
+        self.root = Path(store_dir) / self.key
+        self.data_dir = self.root / "data"
+        self.manifest_path = self.root / "manifest.json"
+        self.derived_path = self.root / "month_derived.parquet"
+        self.means_path = self.root / "month_means.parquet"
+        self.schema_path = self.root / "schema.arrow"
+
+    # ---------------------------
+    # manifest / schema
+    # ---------------------------
+    def manifest(self) -> Dict:
+        if not self.manifest_path.exists():
+            return {}
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _write_manifest(self, manifest: Dict):
+        tmp = self.manifest_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.manifest_path)
+
+    def _load_schema(self):
+        import pyarrow as pa
+        if not self.schema_path.exists():
+            return None
+        with pa.memory_map(str(self.schema_path)) as src:
+            return pa.ipc.read_schema(src)
+
+    def _save_schema(self, schema):
+        with open(self.schema_path, "wb") as f:
+            f.write(schema.serialize().to_pybytes())
+
+    # ---------------------------
+    # 빌드/갱신
+    # ---------------------------
+    def is_fresh(self, csv_path: str) -> bool:
+        """원천 파일 해시가 manifest와 같으면 재계산 없이 사용 가능."""
+        src = self.manifest().get("source", {})
+        return bool(src) and src.get("sha256") == _file_sha256(csv_path) and self.derived_path.exists()
+
+    def build(self, csv_path: str, df_raw: Optional[pd.DataFrame] = None, force: bool = False,
+              **read_kwargs) -> Dict:
+        """
+        원천 CSV → 월 파티션 갱신.
+        - 원천 해시가 같으면 no-op
+        - 아니면 월별 해시를 비교해 바뀐/새 월만 _std 계산 후 파티션 교체, 사라진 월은 삭제
+        - 월평균 테이블은 전체 월 기준으로 다시 Δ/Trend 계산(월 수 × 컬럼 수라 저렴)
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        sha = _file_sha256(csv_path)
+        manifest = {} if force else self.manifest()
+        if manifest.get("source", {}).get("sha256") == sha and self.derived_path.exists():
+            print(f"[FSTORE] hit: {self.root} (source unchanged)")
+            return manifest
+
+        df = read_telecom_csv(csv_path, **read_kwargs) if df_raw is None else df_raw
+        df = ensure_year_month(df.copy()).reset_index(drop=True)   # 인덱스 = 원천 행 번호
+
+        # 파티션 스키마: 원천 컬럼 + _std(float64) + 행 ID. 원천 타입이 바뀌면 전체 무효화
+        raw_cols = [c for c in df.columns if c != MONTH_COL]
+        std_cols = standardized_columns(df, month_col=MONTH_COL)
+        part_cols = raw_cols + [c for c in std_cols if c not in raw_cols] + [ROW_ID_COL]
+        schema = pa.Schema.from_pandas(df[raw_cols], preserve_index=False).remove_metadata()
+        for c in std_cols:
+            if c not in raw_cols:
+                schema = schema.append(pa.field(c, pa.float64()))
+        schema = schema.append(pa.field(ROW_ID_COL, pa.int64()))
+        old_schema = self._load_schema()
+        if old_schema is None or not old_schema.equals(schema):
+            manifest = {}
+
+        new_hashes = _month_hashes(df)
+        old_months = manifest.get("months", {})
+        changed = [m for m, v in new_hashes.items() if old_months.get(m, {}).get("hash") != v["hash"]]
+        removed = [m for m in old_months if m not in new_hashes]
+        print(f"[FSTORE] months total={len(new_hashes)}, recompute={len(changed)}, removed={len(removed)}")
+
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        if not manifest and self.data_dir.exists():
+            shutil.rmtree(self.data_dir)
+            self.data_dir.mkdir(parents=True)
+        for m in removed:
+            shutil.rmtree(self.data_dir / f"{MONTH_COL}={m}", ignore_errors=True)
+
+        # 월평균(_std) 테이블: 바뀐 월만 갱신
+        means = pd.read_parquet(self.means_path) if (manifest and self.means_path.exists()) else pd.DataFrame()
+        if not means.empty:
+            means = means[~means[MONTH_COL].map(_month_key).isin(changed + removed)]
+
+        month_keys = df[MONTH_COL].map(_month_key)
+        new_means = []
+        for m in changed:
+            sub = df.loc[month_keys == m]
+            sub = ensure_all_standardized_features(sub, month_col=MONTH_COL, derive=False)
+            sub[ROW_ID_COL] = sub.index.to_numpy(dtype=np.int64)
+            new_means.append(sub.groupby(MONTH_COL, as_index=False)[std_cols].mean())
+
+            part_dir = self.data_dir / f"{MONTH_COL}={m}"
+            shutil.rmtree(part_dir, ignore_errors=True)
+            part_dir.mkdir(parents=True)
+            table = pa.Table.from_pandas(sub[part_cols], schema=schema, preserve_index=False)
+            pq.write_table(table, part_dir / "part-0.parquet")
+
+        means = pd.concat([means] + new_means, ignore_index=True) if new_means else means
+        means = means.sort_values(MONTH_COL).reset_index(drop=True)
+        means.to_parquet(self.means_path, index=False)
+
+        # 월 상수 파생(Δ3m/Trend12m) 재계산
+        derived = means[[MONTH_COL]].copy()
+        for suffix, window in DERIVED_WINDOWS:
+            derived = derived.join(month_rolling_diff(means, std_cols, window, suffix))
+        derived.to_parquet(self.derived_path, index=False)
+        self._save_schema(schema)
+
+        manifest = {
+            "key": self.key,
+            "code_version": FEATURE_CODE_VERSION,
+            "params": self.params,
+            "source": {"path": str(Path(csv_path).resolve()), "sha256": sha,
+                       "size": os.path.getsize(csv_path)},
+            "months": new_hashes,
+            "n_rows": int(len(df)),
+            "std_map": [{"original": c[: -len("_std")], "std_col": c} for c in std_cols],
+            "derived_cols": [c for c in derived.columns if c != MONTH_COL],
+            "updated_at": datetime.now().isoformat(),
+        }
+        self._write_manifest(manifest)
+        return manifest
+
+    # ---------------------------
+    # 로드
+    # ---------------------------
+    def columns(self) -> List[str]:
+        """캐시가 제공하는 전체 컬럼(파티션 + 월 파생 + year_month)."""
+        schema = self._load_schema()
+        base = [n for n in (schema.names if schema is not None else []) if n != ROW_ID_COL]
+        return [MONTH_COL] + base + self.manifest().get("derived_cols", [])
+
+    def months(self) -> List[str]:
+        return sorted(self.manifest().get("months", {}).keys())
+
+    def load(self, columns: Optional[Sequence[str]] = None,
+             months: Optional[Sequence] = None) -> pd.DataFrame:
+        """
+        필요한 컬럼/월만 로드. 인덱스는 원천 CSV 행 번호(ensure_all_standardized_features 결과와 동일).
+        - columns: None이면 전체. 없는 컬럼은 무시
+        - months: None이면 전체. 'YYYY-MM-DD'/Timestamp 모두 허용
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        schema = self._load_schema()
+        if schema is None:
+            raise FileNotFoundError(f"feature store not built: {self.root}")
+        derived_all = self.manifest().get("derived_cols", [])
+
+        if columns is None:
+            part_cols = [n for n in schema.names if n != ROW_ID_COL]
+            derived_cols = list(derived_all)
+        else:
+            want = [c for c in dict.fromkeys(columns) if c != MONTH_COL]
+            part_cols = [c for c in want if c in schema.names and c != ROW_ID_COL]
+            derived_cols = [c for c in want if c in derived_all]
+
+        dataset = ds.dataset(
+            str(self.data_dir), format="parquet", schema=schema.append(pa.field(MONTH_COL, pa.string())),
+            partitioning=ds.partitioning(pa.schema([(MONTH_COL, pa.string())]), flavor="hive"),
+        )
+        flt = None
+        if months is not None:
+            flt = ds.field(MONTH_COL).isin([_month_key(m) for m in months])
+        table = dataset.to_table(columns=[ROW_ID_COL, MONTH_COL] + part_cols, filter=flt)
+
+        df = table.to_pandas()
+        df[MONTH_COL] = pd.to_datetime(df[MONTH_COL])
+        df = df.set_index(ROW_ID_COL).sort_index()
+        df.index.name = None
+
+        if derived_cols:
+            derived = pd.read_parquet(self.derived_path, columns=[MONTH_COL] + derived_cols)
+            derived = derived.set_index(MONTH_COL)
+            for c in derived_cols:
+                df[c] = df[MONTH_COL].map(derived[c])
+        return df
+
+    def materialize(self, csv_path: str, columns: Optional[Sequence[str]] = None,
+                    months: Optional[Sequence] = None, **read_kwargs) -> pd.DataFrame:
+        """build(필요 시) → load. 학습/예측 진입점에서 사용."""
+        self.build(csv_path, **read_kwargs)
+        return self.load(columns=columns, months=months)
@@ -1,24 +1,18 @@
 # project/label_rules.py
 # -*- coding: utf-8 -*-
 import re, numpy as np, pandas as pd
+from pathlib import Path
+
+from .column_catalog import catalog_for
 
 def _has(df, c): 
     return (c is not None) and (c in df.columns)
 
 def _col(df, name):
-    if not name:
-        return None
-    if name in df.columns:
-        return name
-    cand = [c for c in df.columns if isinstance(c, str) and name in c]
-    return cand[0] if cand else None
+    return catalog_for(df.columns).first(name) if name else None
 
 def _col_sfx(df, base_name, sfx):
-    base = _col(df, base_name)
-    if not base:
-        return None
-    cand = base + sfx
-    return cand if cand in df.columns else None
+    return catalog_for(df.columns).with_suffix(base_name, sfx)
 
 def _rank_mask(series, by_month, side, q):
     pct = series.groupby(by_month).rank(pct=True, na_option="keep")
@@ -35,176 +29,81 @@ def _robust_z_by_month(s, month_col):
     scale = scale.fillna(mad.replace(0, np.nan)).fillna(std.replace(0, np.nan)).fillna(1.0)
     return (x - med) / scale.replace(0, 1.0)
 
-def _ensure_delta3m(df, base_cols, unit_cols, month_col):
-    out = df.sort_values((unit_cols or []) + [month_col]).copy()
+def _ensure_delta3m(df, base_cols, unit_cols, month_col, sort=True):
+    # sort=False: 이미 (unit_cols + 월) 정렬된 df에 제자리 추가
+    out = df.sort_values((unit_cols or []) + [month_col]) if sort else df
     base_cols = [c for c in base_cols if c and c in out.columns]
     for c in base_cols:
         dcol = c + "_delta3m"
         if dcol in out.columns:
             continue
         grp = (unit_cols or [month_col])
-        cur3  = out.groupby(grp)[c].transform(lambda x: x.rolling(3, min_periods=3).mean())
-        prev3 = out.groupby(grp)[c].transform(lambda x: x.shift(3).rolling(3, min_periods=3).mean())
+        cur3  = out.groupby(grp, observed=True)[c].transform(lambda x: x.rolling(3, min_periods=3).mean())
+        prev3 = out.groupby(grp, observed=True)[c].transform(lambda x: x.shift(3).rolling(3, min_periods=3).mean())
         out[dcol] = cur3 - prev3
     return out
 
 def _age_to_num(s: pd.Series) -> pd.Series:
     if s is None:
         return pd.Series(dtype=float)
-    if np.issubdtype(s.dtype, np.number):
+    if pd.api.types.is_numeric_dtype(s.dtype):   # category 등 확장 타입은 np.issubdtype에서 TypeError
         return s.astype(float)
     def parse_one(v):
         if pd.isna(v): return np.nan
         m = re.search(r"\d+", str(v))
         return float(m.group()) if m else np.nan
-    return s.map(parse_one)
-
-# ✅ 벡터화된 사유 추가 헬퍼
-def _append_reason(reasons: pd.Series, mask: pd.Series, desc: str) -> pd.Series:
-    base = reasons.fillna("").astype(str)
-    m = mask.fillna(False).astype(bool)
-    sep = np.where(base.ne(""), "; ", "")
-    new_vals = np.where(m, base + sep + (desc or ""), base)
-    return pd.Series(new_vals, index=reasons.index, dtype=object)
+    # 연령대는 고유값이 몇 개뿐 → 고유값만 파싱 후 코드로 펼침
+    codes, uniq = pd.factorize(s)
+    parsed = np.array([parse_one(v) for v in uniq] + [np.nan], dtype=float)
+    return pd.Series(parsed[codes], index=s.index)
+
+def _load_hybrid_spec(rules_path=None) -> dict:
+    """
+    rules.yml 'hybrid' 섹션. rules_path가 없으면 이 폴더의 rules.yml.
+    명시한 파일에 유효한 hybrid 섹션이 없으면 RulesError (다른 규칙으로 조용히 라벨링하지 않음).
+    """
+    from .rules_loader import load_hybrid_rules
+    return load_hybrid_rules(rules_path or Path(__file__).resolve().parent / "rules.yml")["labels"]
+
+def hybrid_reason_codes(rules_path: str = None) -> dict:
+    """라벨 → 사유 비트 설명표 (meta.json "reason_codes")."""
+    from .rule_compiler import reason_code_table
+    return reason_code_table(_load_hybrid_spec(rules_path))
+
+def decode_label_reasons(df: pd.DataFrame, label: str, reason_codes: dict) -> pd.Series:
+    """<label>_reason_mask → 사유 문자열. 표시/내보내기할 행만 잘라서 호출."""
+    from .rule_compiler import decode_reasons
+    return decode_reasons(df[label + "_reason_mask"], reason_codes[label])
 
 def apply_rule_hybrid(df: pd.DataFrame,
                       month_col: str = "year_month",
-                      z_thr: float = 1.64) -> pd.DataFrame:
-    out = df.copy()
-
-    unit_cols = [c for c in ["자치구", "성별", "연령대"] if c in out.columns]
+                      z_thr: float = 1.64,
+                      rules_path: str = None,
+                      timings: dict = None,
+                      resolution: dict = None) -> pd.DataFrame:
+    """
+    rules.yml 'hybrid' 섹션 규칙으로 LBL_* / *_score / *_reason_mask 생성 (rule_compiler로 컴파일).
+    rules_path가 없으면 이 폴더의 rules.yml (있는데 hybrid 섹션이 없거나 잘못되면 RulesError).
+    사유는 정수 비트마스크 → 문자열이 필요하면 decode_label_reasons(df, lbl, hybrid_reason_codes())
+    timings: dict를 주면 공유 변환/점수/라벨별 소요 시간(초) 기록
+    resolution: 신호 이름 → 컬럼 매핑 dict (있는 이름은 그대로, 새로 해석한 것은 기록 → meta.json 저장/재사용)
+    """
+    from .rule_compiler import compile_hybrid_rules, evaluate_hybrid_rules, delta_z_sources
+
+    spec = _load_hybrid_spec(rules_path)
+
+    unit_cols = [c for c in ["자치구", "성별", "연령대"] if c in df.columns]
     if not unit_cols:
-        unit_cols = ["행정동"] if "행정동" in out.columns else []
+        unit_cols = ["행정동"] if "행정동" in df.columns else []
+
+    # 연체 등 delta_z 신호 열의 Δ 생성(필요 시) — 이때의 행 정렬이 곧 복사본이므로 추가 복사 없음
+    late_cols = delta_z_sources(spec, df.columns)
+    out = df.sort_values(unit_cols + [month_col]) if late_cols else df.copy()
 
     out["_AGE_NUM"] = _age_to_num(out["연령대"]) if "연령대" in out.columns else pd.Series(index=out.index, dtype=float)
 
-    # 연체 열 및 Δ 생성(필요 시)
-    LATE = _col(out, "최근 3개월 내 요금 연체 비율")
-    if LATE:
-        out = _ensure_delta3m(out, [LATE], unit_cols, month_col)
-
-    RULES = {
-        "LBL_LIVELIHOOD": {
-            "cut": 1.0, "req_frac": 0.7,
-            "signals": [
-                {"col": LATE, "mode": "delta_z", "side": "ge", "w": 0.60, "desc": "연체 Δ↑(유의)"},
-                {"col": _col(out, "소액결재 비사용 인구수_pc_std"), "mode": "qscore", "side": "ge", "q": 0.85, "w": 0.25, "desc": "소액결제 비사용↑"},
-                {"col": _col(out, "소액결재 사용금액_pc_std"),     "mode": "qscore", "side": "le", "q": 0.15, "w": 0.15, "desc": "소액결제 금액↓"},
-            ],
-            "gate": None
-        },
-        "LBL_CARE": {
-            "cut": 1.0, "req_frac": 0.6,
-            "signals": [
-                {"col": _col(out, "평일 총 이동 거리 합계_pc_std"),         "mode": "qscore", "side": "le", "q": 0.15, "w": 0.25, "desc": "이동거리↓"},
-                {"col": _col(out, "지하철이동일수 합계_pc_std"),           "mode": "qscore", "side": "le", "q": 0.15, "w": 0.20, "desc": "지하철↓"},
-                {"col": _col(out, "집 추정 위치 평일 총 체류시간_pc_std"), "mode": "qscore", "side": "ge", "q": 0.85, "w": 0.15, "desc": "집체류↑"},
-            ],
-            "gate": {"expr": (out["_AGE_NUM"] >= 65), "desc": "연령대≥65", "w": 0.40, "hard_and": True}
-        },
-        "LBL_HEALTH_MENTAL_DELTA": {
-            "cut": 1.0, "req_frac": 0.6,
-            "signals": [
-                {"col": _col_sfx(out, "평일 총 이동 거리 합계_pc_std",         "_delta3m"), "mode":"qscore","side":"le","q":0.15,"w":0.40,"desc":"이동 Δ↓"},
-                {"col": _col_sfx(out, "집 추정 위치 평일 총 체류시간_pc_std", "_delta3m"), "mode":"qscore","side":"ge","q":0.85,"w":0.35,"desc":"집체류 Δ↑"},
-                {"col": _col_sfx(out, "동영상/방송 서비스 사용일수_pc_std",   "_delta3m"), "mode":"qscore","side":"ge","q":0.85,"w":0.25,"desc":"동영상 Δ↑"},
-            ],
-            "gate": None
-        },
-        "LBL_DAILY_LONGTERM": {
-            "cut": 1.0, "req_frac": 0.6,
-            "signals": [
-                {"col": _col_sfx(out, "평일 총 이동 거리 합계_pc_std", "_trend12m"), "mode":"qscore","side":"le","q":0.15,"w":0.40,"desc":"이동 장기↓"},
-                {"col": _col_sfx(out, "지하철이동일수 합계_pc_std",   "_trend12m"), "mode":"qscore","side":"le","q":0.15,"w":0.35,"desc":"지하철 장기↓"},
-                {"col": _col_sfx(out, "배달 서비스 사용일수_pc_std",   "_trend12m"), "mode":"qscore","side":"ge","q":0.85,"w":0.25,"desc":"배달 장기↑"},
-            ],
-            "gate": None
-        },
-        "LBL_HOUSING": {
-            "cut": 1.0, "req_frac": 0.8,
-            "signals": [
-                {"col": _col(out, "주간상주지 변경횟수 평균_pc_std"), "mode":"qscore","side":"ge","q":0.85,"w":0.50,"desc":"주간 상주지변경↑"},
-                {"col": _col(out, "야간상주지 변경횟수 평균_pc_std"), "mode":"qscore","side":"ge","q":0.85,"w":0.50,"desc":"야간 상주지변경↑"},
-            ],
-            "gate": None
-        },
-        "LBL_EMPLOYMENT": {
-            "cut": 1.0, "req_frac": 0.6,
-            "signals": [
-                {"col": _col(out, "평균 근무시간 평균_pc_std") or _col(out, "평균 근무시간_pc_std"),
-                 "mode":"qscore","side":"le","q":0.15,"w":0.45,"desc":"근무시간↓"},
-                {"col": _col(out, "지하철이동일수 합계_pc_std"), "mode":"qscore","side":"le","q":0.15,"w":0.30,"desc":"지하철↓"},
-                {"col": _col(out, "평일 총 이동 횟수_pc_std"),   "mode":"qscore","side":"le","q":0.15,"w":0.25,"desc":"평일 이동횟수↓"},
-            ],
-            "gate": None
-        },
-        "LBL_DEBT_LAW": {
-            "cut": 1.0, "req_frac": 1.0,
-            "signals": [
-                {"col": LATE, "mode":"delta_z", "side":"ge", "w":1.00, "desc":"연체 Δ↑(유의)"},
-            ],
-            "gate": None
-        },
-        "LBL_ISOLATION": {
-            "cut": 1.0, "req_frac": 0.6,
-            "signals": [
-                {"col": _col(out, "평균 통화량_pc_std"),          "mode":"qscore","side":"le","q":0.15,"w":0.25,"desc":"통화↓"},
-                {"col": _col(out, "평균 문자량_pc_std"),          "mode":"qscore","side":"le","q":0.15,"w":0.25,"desc":"문자↓"},
-                {"col": _col(out, "평균 통화대상자 수_pc_std"),    "mode":"qscore","side":"le","q":0.15,"w":0.25,"desc":"대상자수↓"},
-                {"col": _col(out, "평일 총 이동 거리 합계_pc_std"), "mode":"qscore","side":"le","q":0.15,"w":0.15,"desc":"이동거리↓"},
-                {"col": _col(out, "집 추정 위치 평일 총 체류시간_pc_std"), "mode":"qscore","side":"ge","q":0.85,"w":0.10,"desc":"집체류↑"},
-            ],
-            "gate": None
-        },
-    }
-
-    for lbl, cfg in RULES.items():
-        score   = pd.Series(0.0, index=out.index, dtype=float)
-        reasons = pd.Series("",   index=out.index, dtype=object)
-
-        gate_mask = pd.Series(True, index=out.index)
-        gate_w    = 0.0
-        if cfg.get("gate") is not None:
-            g = cfg["gate"]
-            gate_mask = g["expr"].fillna(False) if g.get("hard_and", True) else g["expr"].fillna(True)
-            gate_w    = float(g.get("w", 0.0))
-            score    += np.where(gate_mask, gate_w, 0.0)
-            reasons   = _append_reason(reasons, gate_mask, g.get("desc",""))
-
-        # 사용 가능한 신호 총 가중치
-        avail_w = 0.0
-        for s in cfg["signals"]:
-            col = s["col"]
-            if s["mode"] == "delta_z":
-                ok = _has(out, col) and _has(out, col + "_delta3m")
-            else:
-                ok = _has(out, col)
-            if ok:
-                avail_w += float(s.get("w", 0.0))
-
-        # 신호 적용
-        for s in cfg["signals"]:
-            col = s["col"]
-            if s["mode"] == "qscore":
-                if not _has(out, col): 
-                    continue
-                mask = _rank_mask(out[col], out[month_col], s["side"], s["q"])
-            elif s["mode"] == "delta_z":
-                if not (_has(out, col) and _has(out, col + "_delta3m")):
-                    continue
-                z = _robust_z_by_month(out[col + "_delta3m"], out[month_col])
-                mask = (z >= z_thr) if s["side"] == "ge" else (z <= -z_thr)
-            else:
-                continue
-
-            w = float(s.get("w", 0.0))
-            score   += np.where(mask, w, 0.0)
-            reasons  = _append_reason(reasons, mask, s.get("desc",""))
-
-        req_frac = float(cfg.get("req_frac", 0.6))
-        thr = cfg.get("cut", 1.0) * req_frac * (avail_w + gate_w * gate_mask.astype(float))
-        out[lbl + "_score"]   = score
-        out[lbl + "_reasons"] = reasons.replace("", np.nan)
-        out[lbl]              = (gate_mask) & (score >= thr)
+    if late_cols:
+        out = _ensure_delta3m(out, late_cols, unit_cols, month_col, sort=False)
 
-    return out
+    compiled = compile_hybrid_rules(spec, out.columns, z_thr=z_thr, resolution=resolution)
+    return evaluate_hybrid_rules(compiled, out, month_col=month_col, timings=timings)
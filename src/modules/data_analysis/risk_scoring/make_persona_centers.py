@@ -10,6 +10,7 @@ from sklearn.cluster import KMeans
 
 # 학습 파이프라인의 표준화 유틸 재사용
 from .train_pipeline import ensure_year_month, ensure_all_standardized_features
+from .telecom_schema import read_telecom_csv
 from .persona_soft import CLUST_FEATS
 
 def main():
@@ -20,7 +21,7 @@ def main():
     ap.add_argument("--k", type=int, default=3, help="클러스터 개수(기본 3)")
     args = ap.parse_args()
 
-    df = pd.read_csv(args.csv)
+    df = read_telecom_csv(args.csv)
     df = ensure_year_month(df)
     df = ensure_all_standardized_features(df, month_col="year_month")
 
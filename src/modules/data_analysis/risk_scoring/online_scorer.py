@@ -0,0 +1,311 @@
+# online_scorer.py
+# -*- coding: utf-8 -*-
+"""
+저지연 단건/소배치 위험 스코어링 (월 기준값 룩업)
+- _std는 '그 달 전체 분포'의 중앙값/스케일이 필요 → 학습/월 배치 실행이 월별 기준값을 저장
+- Δ3m/Trend12m은 월 상수 → 월별 값 테이블로 저장
+- 온라인 채점은 룩업 + 행 단위 연산만 수행: O(피처 수), 결과는 같은 달 배치 채점과 동일
+
+룩업 파일 (산출물 폴더 또는 별도 룩업 폴더):
+    month_baselines.parquet  year_month, column, median, iqr, std, scale, n   (rolling_state.month_baselines)
+    month_derived.parquet    year_month + *_delta3m / *_trend12m 월 상수
+
+사용 예:
+    scorer = OnlineScorer(load_artifacts("artifacts"), centers=load_centers("cluster_centers.csv"))
+    scorer.score_rows([{"month": "2025-06", "자치구": "구0", "성별": "남", "연령대": "20대", ...}])
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .train_pipeline import _safe_proba
+from .rolling_state import month_baselines
+from .feature_plan import OHE_SOURCES
+from .persona_soft import membership_matrix
+from .predict_persona import persona_keys, persona_threshold_table, _dominant_persona_codes
+
+BASELINES_FILE = "month_baselines.parquet"
+DERIVED_FILE = "month_derived.parquet"
+MONTH_COL = "year_month"
+
+
+# ---------------------------
+# 룩업 저장 (학습/배치 실행에서 호출)
+# ---------------------------
+def build_month_lookup(df: pd.DataFrame, std_cols: Sequence[str],
+                       derived: Optional[pd.DataFrame] = None, month_col: str = MONTH_COL):
+    """
+    df: year_month + 원천 컬럼(표준화 전 값 포함)
+    derived: df와 같은 인덱스의 Δ/Trend 컬럼(없으면 df에서 *_delta3m/*_trend12m 사용)
+    returns: (baselines, month_derived)
+    """
+    base = month_baselines(df, list(std_cols), month_col=month_col)
+    if derived is None:
+        derived = df[[c for c in df.columns if isinstance(c, str) and c.endswith(("_delta3m", "_trend12m"))]]
+    mder = derived.groupby(df[month_col].values).first().rename_axis(month_col).reset_index()
+    return base, mder
+
+
+def save_month_lookup(lookup_dir: str, baselines: pd.DataFrame, derived: pd.DataFrame):
+    """월 단위 upsert: 같은 달은 새 값으로 교체."""
+    d = Path(lookup_dir)
+    d.mkdir(parents=True, exist_ok=True)
+    for name, new, keys in [(BASELINES_FILE, baselines, [MONTH_COL, "column"]), (DERIVED_FILE, derived, [MONTH_COL])]:
+        path = d / name
+        if path.exists():
+            old = pd.read_parquet(path)
+            old = old[~old[MONTH_COL].isin(set(new[MONTH_COL]))]
+            new = pd.concat([old, new], ignore_index=True)
+        new.sort_values(keys).reset_index(drop=True).to_parquet(path, index=False)
+    print(f"[LOOKUP] saved: {d} (months={derived[MONTH_COL].nunique()})")
+
+
+# ---------------------------
+# 모델 빠른 경로: sklearn 래퍼 검증 오버헤드(라벨당 ~ms) 우회
+# ---------------------------
+def _booster_calibrators(model):
+    """
+    CalibratedClassifierCV(이진, LightGBM decision_function) → [(booster, calibrator), ...].
+    그 밖의 모델은 None (→ _safe_proba 일반 경로).
+    """
+    ccs = getattr(model, "calibrated_classifiers_", None)
+    if not ccs or len(getattr(model, "classes_", [])) != 2:
+        return None
+    parts = []
+    for cc in ccs:
+        est = cc.estimator
+        if not (hasattr(est, "booster_") and hasattr(est, "decision_function")) or len(cc.calibrators) != 1:
+            return None
+        parts.append((est.booster_, cc.calibrators[0]))
+    return parts
+
+
+def _fast_proba(parts, X: np.ndarray) -> np.ndarray:
+    """CalibratedClassifierCV.predict_proba[:, 1]과 같은 연산(원점수 → 보정기 → 1+1e-5 이내 클립 → 평균)."""
+    acc = np.zeros(len(X))
+    for booster, cal in parts:
+        p = cal.predict(booster.predict(X, raw_score=True))
+        p[(1.0 < p) & (p <= 1.0 + 1e-5)] = 1.0
+        acc += p
+    acc /= len(parts)
+    return acc
+
+
+def _to_float(values) -> np.ndarray:
+    """pd.to_numeric(errors='coerce')와 같은 float 변환(빠른 경로 우선)."""
+    try:
+        return np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+
+
+# ---------------------------
+# 온라인 채점기
+# ---------------------------
+class OnlineScorer:
+    """
+    번들(predict_persona.load_artifacts) + 센터 + 월 룩업으로 행 단위 채점.
+    meta['feature_plan']이 필요(_std 피처 → 원천 컬럼 매핑).
+    """
+
+    def __init__(self, bundle: dict, centers: Optional[pd.DataFrame] = None,
+                 lookup_dirs: Optional[Sequence[str]] = None):
+        meta = bundle["meta"]
+        plan = meta.get("feature_plan")
+        if not plan:
+            raise ValueError("meta.json has no feature_plan; retrain to enable online scoring")
+        self.bundle = bundle
+        self.features: List[str] = list(meta.get("all_features", []))
+        fidx = {c: i for i, c in enumerate(self.features)}
+
+        # 월 룩업 (산출물 폴더 → 추가 폴더 순으로 덮어씀)
+        dirs = [bundle["dir"]] + list(lookup_dirs or [])
+        baselines, derived = [], []
+        for d in dirs:
+            if (Path(d) / BASELINES_FILE).exists():
+                baselines.append(pd.read_parquet(Path(d) / BASELINES_FILE))
+            if (Path(d) / DERIVED_FILE).exists():
+                derived.append(pd.read_parquet(Path(d) / DERIVED_FILE))
+        if not baselines:
+            raise FileNotFoundError(f"{BASELINES_FILE} not found in {dirs}")
+        base = pd.concat(baselines).drop_duplicates([MONTH_COL, "column"], keep="last")
+        der = pd.concat(derived).drop_duplicates([MONTH_COL], keep="last") if derived else pd.DataFrame(columns=[MONTH_COL])
+
+        # _std: (피처명, 원천) — 원천이 표준화 전 컬럼인 것만 기준값 적용
+        self.std_feats = [f for f, src in plan["std"].items() if src != f]
+        self.std_src = [plan["std"][f] for f in self.std_feats]
+        self.months = sorted(pd.to_datetime(base[MONTH_COL]).unique())
+        self.month_pos = {pd.Timestamp(m): i for i, m in enumerate(self.months)}
+        self._month_cache: Dict[str, Optional[int]] = {}
+        med = base.pivot(index=MONTH_COL, columns="column", values="median")
+        scl = base.pivot(index=MONTH_COL, columns="column", values="scale")
+        med.index, scl.index = pd.to_datetime(med.index), pd.to_datetime(scl.index)
+        self.median = med.reindex(index=self.months, columns=self.std_src).to_numpy(dtype=float)
+        self.scale = scl.reindex(index=self.months, columns=self.std_src).to_numpy(dtype=float)
+        # 이미 *_std로 들어오는 입력(원천 = 자기 자신)
+        self.pass_std = [f for f, src in plan["std"].items() if src == f]
+
+        # Δ/Trend 월 상수
+        self.derived_feats = [f for f in self.features if f in set(plan["delta3m"]) | set(plan["trend12m"])]
+        if len(der):
+            der = der.assign(**{MONTH_COL: pd.to_datetime(der[MONTH_COL])}).set_index(MONTH_COL)
+            self.derived = der.reindex(index=self.months, columns=self.derived_feats).to_numpy(dtype=float)
+        else:
+            self.derived = np.full((len(self.months), len(self.derived_feats)), np.nan)
+
+        # 소프트 페르소나 입력: 센터 컬럼 → (_std 피처 위치 | 원천 컬럼)
+        self.centers = centers
+        self.persona_cols = []
+        if centers is not None:
+            std_pos = {f: i for i, f in enumerate(self.std_feats)}
+            for cc in centers.columns:
+                srcs = plan["persona_inputs"].get(cc, [])
+                if cc in std_pos:
+                    self.persona_cols.append(("std", std_pos[cc]))
+                elif srcs:
+                    self.persona_cols.append(("raw", srcs[0]))
+                else:
+                    self.persona_cols.append(("zero", None))
+            self.C = centers.to_numpy()
+
+        # 피처 행렬 위치
+        self.idx_std = [fidx.get(f, -1) for f in self.std_feats]
+        self.idx_pass = [(fidx[f], f) for f in self.pass_std if f in fidx]
+        self.idx_derived = [fidx[f] for f in self.derived_feats]
+        self.idx_persona = {c: fidx[c] for c in self.features if c.startswith("persona_")}
+        self.ohe = []   # (위치, 원천 컬럼, 값)
+        for c in self.features:
+            for cat in OHE_SOURCES:
+                if c.startswith(cat + "_"):
+                    self.ohe.append((fidx[c], cat, c[len(cat) + 1:]))
+                    break
+        self.label_idx = {lbl: [fidx.get(f, -1) for f in bundle["per_label_features"][lbl]]
+                          for lbl in bundle["models"]}
+        self.fast = {lbl: _booster_calibrators(m) for lbl, m in bundle["models"].items()}
+
+        # 입력에서 읽을 컬럼
+        self.input_cols = set(self.std_src) | {c for _, c in self.idx_pass} | {c for _, c, _ in self.ohe}
+        self.input_cols |= {ref for kind, ref in self.persona_cols if kind == "raw"}
+        self.input_cols |= {MONTH_COL, "month", "year", "month_num"}
+
+    # ---------------------------
+    def _columns(self, rows) -> (int, Dict[str, np.ndarray]):
+        """입력(dict | dict 리스트 | DataFrame) → 필요한 컬럼만 배열로 (DataFrame 생성 회피)."""
+        if isinstance(rows, pd.DataFrame):
+            return len(rows), {c: rows[c].to_numpy() for c in self.input_cols if c in rows.columns}
+        rows = [rows] if isinstance(rows, dict) else list(rows)
+        keys = set().union(*(r.keys() for r in rows)) & self.input_cols if rows else set()
+        return len(rows), {c: np.array([r.get(c) for r in rows], dtype=object) for c in keys}
+
+    def _month_index(self, value) -> Optional[int]:
+        """월 값(문자열/Timestamp) → 룩업 위치. 파싱 결과는 메모이즈."""
+        key = str(value)
+        if key not in self._month_cache:
+            try:
+                m = pd.Timestamp(key).to_period("M").to_timestamp()
+            except (ValueError, TypeError):
+                m = None
+            self._month_cache[key] = self.month_pos.get(m)
+        return self._month_cache[key]
+
+    def _row_months(self, cols: Dict[str, np.ndarray], n: int, month) -> np.ndarray:
+        if MONTH_COL in cols:
+            vals = cols[MONTH_COL]
+        elif "month" in cols:
+            vals = cols["month"]
+        elif "year" in cols and "month_num" in cols:
+            vals = [f"{int(y)}-{int(m):02d}" for y, m in zip(_to_float(cols["year"]), _to_float(cols["month_num"]))]
+        else:
+            vals = [month if month is not None else self.months[-1]] * n
+        uniq, inv = np.unique(np.asarray(vals).astype(str), return_inverse=True)
+        pos = np.array([self._month_index(u) for u in uniq], dtype=object)
+        unknown = [u for u, p in zip(uniq, pos) if p is None]
+        if unknown:
+            raise ValueError(f"no stored month baseline for {unknown}")
+        return pos.astype(int)[inv]
+
+    @staticmethod
+    def _raw(cols: Dict[str, np.ndarray], n: int, names: Sequence[str]) -> np.ndarray:
+        out = np.full((n, len(names)), np.nan)
+        for j, c in enumerate(names):
+            if c in cols:
+                out[:, j] = _to_float(cols[c])
+        return out
+
+    def features_for(self, rows: Union[dict, List[dict], pd.DataFrame], month=None) -> np.ndarray:
+        """행 → all_features 순서의 float64 행렬 (배치 prepare_features_for_inference와 동일 값)."""
+        n, cols = self._columns(rows)
+        mp = self._row_months(cols, n, month)
+        F = np.zeros((n, len(self.features)))
+
+        # 1) 월별 강건 z: (log1p(clip(x,0)) - median) / scale, 결측 → 0
+        x = np.log1p(np.maximum(self._raw(cols, n, self.std_src), 0))
+        with np.errstate(invalid="ignore"):
+            z = (x - self.median[mp]) / self.scale[mp]
+        z = np.where(np.isnan(z), 0.0, z)
+        for j, i in enumerate(self.idx_std):
+            if i >= 0:
+                F[:, i] = z[:, j]
+        for i, c in self.idx_pass:
+            F[:, i] = np.nan_to_num(self._raw(cols, n, [c])[:, 0], nan=0.0)
+
+        # 2) Δ/Trend 월 상수 (이력 부족 월은 NaN → 0)
+        if self.idx_derived:
+            F[:, self.idx_derived] = np.nan_to_num(self.derived[mp], nan=0.0)
+
+        # 3) 소프트 페르소나 (persona_soft.soft_membership과 같은 membership_matrix)
+        if self.centers is not None and self.persona_cols:
+            X = np.zeros((n, len(self.persona_cols)))
+            for j, (kind, ref) in enumerate(self.persona_cols):
+                if kind == "std":
+                    X[:, j] = z[:, ref]
+                elif kind == "raw":
+                    X[:, j] = self._raw(cols, n, [ref])[:, 0]
+            X = np.nan_to_num(X, nan=0.0, posinf=0.0, neginf=0.0)
+            P = membership_matrix(X, self.C)
+            label = P.argmax(axis=1)
+            # soft_membership과 같은 persona_conf 정의
+            conf = np.maximum(P.max(axis=1), label)
+            for k in range(P.shape[1]):
+                if f"persona_p{k}" in self.idx_persona:
+                    F[:, self.idx_persona[f"persona_p{k}"]] = P[:, k]
+            if "persona_label" in self.idx_persona:
+                F[:, self.idx_persona["persona_label"]] = label
+            if "persona_conf" in self.idx_persona:
+                F[:, self.idx_persona["persona_conf"]] = conf
+
+        # 4) 카테고리 OHE
+        for i, cat, val in self.ohe:
+            if cat in cols:
+                F[:, i] = (cols[cat].astype(str) == val)
+        return F
+
+    def score_rows(self, rows: Union[dict, List[dict], pd.DataFrame], month=None,
+                   apply_persona_thresholds: bool = True) -> pd.DataFrame:
+        """row_id, persona, <LBL>, <LBL>_pred, <LBL>_thr (scoring_service.score_frame과 같은 형식)."""
+        F = self.features_for(rows, month=month)
+        pcols = [c for c in self.features if c.startswith("persona_p")]
+        codes = _dominant_persona_codes(F[:, [self.features.index(c) for c in pcols]])
+        keys = np.asarray(persona_keys(len(pcols)), dtype=object)
+
+        out = {"row_id": np.arange(len(F)), "persona": keys[codes]}
+        labels = [lbl for lbl in self.bundle["labels"] if self.bundle["models"].get(lbl) is not None]
+        T = persona_threshold_table(self.bundle, labels, len(keys), apply_persona_thresholds)
+        for j, lbl in enumerate(labels):
+            model = self.bundle["models"][lbl]
+            feats = self.bundle["per_label_features"][lbl]
+            idx = self.label_idx[lbl]
+            Xin = np.zeros((len(F), len(idx)))
+            ok = [j for j, i in enumerate(idx) if i >= 0]
+            Xin[:, ok] = F[:, [idx[j] for j in ok]]
+            if self.fast.get(lbl):
+                p = _fast_proba(self.fast[lbl], Xin)
+            else:
+                p = _safe_proba(model, pd.DataFrame(Xin, columns=feats))
+            thr = T[codes, j]
+            out[lbl] = p
+            out[f"{lbl}_pred"] = (p >= thr).astype(int)
+            out[f"{lbl}_thr"] = thr
+        return pd.DataFrame(out)
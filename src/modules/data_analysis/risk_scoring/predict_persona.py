@@ -1,6 +1,10 @@
 # -*- coding: utf-8 -*-
-# 사용법:
-#   python predict_persona.py --csv new_month.csv --artifacts artifacts --centers project/cluster_centers.csv
+# 사용법 (src/modules 에서):
+#   python -m data_analysis.risk_scoring.predict_persona --csv new_month.csv --artifacts artifacts --centers project/cluster_centers.csv
+#   (표준화 캐시 사용) ... --feature_store feature_store --months 2025-06
+#   (월 증분 채점) 첫 실행은 전체 이력, 이후 매달 새 달 행만: ... --csv 2025-07.csv --state pred_state
+#   (온라인 채점 룩업 갱신) ... --online_lookup online_lookup
+#   (대용량 스트리밍) ... --stream  → 월 파티션 단위로 표준화/채점/기록(메모리 = 가장 큰 월)
 #
 # 산출물:
 #   pred_out/
@@ -9,9 +13,12 @@
 #     - thresholds_wide.parquet  (행 x 라벨 적용 임계값)
 #     - predictions_long.parquet (row_id, label, score, pred, thr)
 #     - persona.parquet          (row_id, persona)
+#     - drift_features.parquet   (월 × 피처 PSI/KS, monitor_baseline.npz가 있을 때)
+#     - drift_labels.parquet     (월 × 라벨 드리프트 요약)
 #     - feature_drift_warn.csv   (옵션: 분포 드리프트 경고)
+#     - profile.json             (단계/라벨별 시간·메모리, --cprofile 시 profile_<단계>.prof)
 
-import os, json, argparse
+import os, json, time, argparse
 from pathlib import Path
 
 import numpy as np
@@ -19,24 +26,56 @@ import pandas as pd
 from joblib import load as joblib_load
 
 # ==== 학습 파이프라인과 동일한 전처리 유틸 ====
-from train_pipeline import (
+from .train_pipeline import (
     ensure_year_month,
     ensure_all_standardized_features,
     _safe_proba,
 )
-from persona_soft import load_centers, soft_membership
+from .persona_soft import load_centers, soft_membership
+from .feature_plan import plan_input_columns, plan_std_kwargs
+from .telecom_schema import read_telecom_csv
 
 
 # ---------------------------
 # 내부 유틸
 # ---------------------------
+def persona_keys(n_personas: int) -> list:
+    """페르소나 코드 i → 키 'persona_i' (thresholds_by_persona.json 키와 같음)."""
+    return [f"persona_{i}" for i in range(max(1, n_personas))]
+
+
+def _dominant_persona_codes(P: np.ndarray) -> np.ndarray:
+    """persona_p* 행렬(행 × K) → 최대값 열 번호(정수 코드). K=0이면 전부 0."""
+    if P.shape[1] == 0:
+        return np.zeros(len(P), dtype=np.int64)
+    return np.argmax(P, axis=1)
+
+
 def _dominant_persona_from_matrix(df_like: pd.DataFrame) -> pd.Series:
-    """persona_p* 중 최대값의 인덱스를 dominant persona로 변환."""
+    """persona_p* 중 최대값의 인덱스를 dominant persona로 변환 (정수 코드 기반 category)."""
     pcols = [c for c in df_like.columns if isinstance(c, str) and c.startswith("persona_p")]
-    if not pcols:
-        return pd.Series(["persona_0"] * len(df_like), index=df_like.index)
-    idx = np.argmax(df_like[pcols].values, axis=1)
-    return pd.Series([f"persona_{i}" for i in idx], index=df_like.index)
+    codes = _dominant_persona_codes(df_like[pcols].to_numpy())
+    return pd.Series(pd.Categorical.from_codes(codes, categories=persona_keys(len(pcols))),
+                     index=df_like.index)
+
+
+def persona_threshold_table(bundle: dict, labels: list, n_personas: int,
+                            apply_persona_thresholds: bool = True) -> np.ndarray:
+    """
+    (페르소나 × 라벨) 임계값 표. 행 = persona_keys 순서.
+    우선순위: 페르소나별 → 라벨 _global → thresholds.json → 0.5 (끄면 thresholds.json → 0.5)
+    """
+    keys = persona_keys(n_personas)
+    T = np.empty((len(keys), len(labels)))
+    for j, lbl in enumerate(labels):
+        glob = float(bundle["thr_global"].get(lbl, 0.5))
+        if apply_persona_thresholds:
+            table = bundle["thr_by_persona"].get(lbl, {})
+            thr_def = float(table.get("_global", glob))
+            T[:, j] = [float(table.get(k, thr_def)) for k in keys]
+        else:
+            T[:, j] = glob
+    return T
 
 
 def _one_hot_if_needed(df: pd.DataFrame) -> pd.DataFrame:
@@ -52,32 +91,59 @@ def _force_schema(X: pd.DataFrame, columns: list) -> pd.DataFrame:
     return X.reindex(columns=columns, fill_value=0)
 
 
+def _store_columns_for(meta: dict, centers_path: str = None) -> list:
+    """피처 캐시에서 읽을 컬럼: 메타 피처 + 페르소나 센터 입력(_pc/_pc_std 변형 포함) + OHE 원천."""
+    plan = meta.get("feature_plan")
+    if plan:
+        return plan_input_columns(plan)
+    cols = list(meta.get("all_features", []))
+    if centers_path and os.path.exists(centers_path):
+        for c in load_centers(centers_path).columns:
+            base = c[: -len("_std")] if c.endswith("_std") else c
+            cols += [c, base + "_pc", base + "_pc_std"]
+    return cols + ["자치구", "성별", "연령대"]
+
+
 # ---------------------------
 # 피처 준비
 # ---------------------------
 def prepare_features_for_inference(
     df_raw: pd.DataFrame,
-    meta_path: str,
+    meta_path: str = None,
     centers_path: str = None,
+    standardized: bool = False,
+    meta: dict = None,
+    centers: pd.DataFrame = None,
 ) -> pd.DataFrame:
     """
     학습과 동일하게:
     - year_month 보장
-    - 모든 숫자형 월별 강건 표준화(_std) + Δ/Trend 파생
+    - 모든 숫자형 월별 강건 표준화(_std) + Δ/Trend 파생 (standardized=True면 이미 계산된 입력 → 생략)
+      meta['feature_plan']이 있으면 모델/페르소나가 쓰는 closure만 계산
     - soft persona join
     - 카테고리 OHE
     - meta['all_features'] 스키마로 정렬
+    meta/centers를 주면 파일을 다시 읽지 않음(상주 서비스용)
     """
-    with open(meta_path, "r", encoding="utf-8") as f:
-        meta = json.load(f)
+    if meta is None:
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+    plan = meta.get("feature_plan")
 
     # 1) year_month + 표준화 + 파생
+    if plan:
+        keep = set(plan_input_columns(plan))
+        df_raw = df_raw[[c for c in df_raw.columns if c in keep]]
     df = ensure_year_month(df_raw.copy())
-    df = ensure_all_standardized_features(df, month_col="year_month")
+    if not standardized:
+        df = ensure_all_standardized_features(
+            df, month_col="year_month", **(plan_std_kwargs(plan) if plan else {})
+        )
 
     # 2) soft persona
-    if centers_path and os.path.exists(centers_path):
+    if centers is None and centers_path and os.path.exists(centers_path):
         centers = load_centers(centers_path)
+    if centers is not None:
         P = soft_membership(df, centers, temp=1.0)
         df = df.join(P)
     else:
@@ -99,19 +165,14 @@ def prepare_features_for_inference(
 
 
 # ---------------------------
-# 예측: 위험확률 + (옵션) 페르소나별 임계값 라벨
+# 산출물 로드 (모델/임계값/메타 1회 로드)
 # ---------------------------
-def predict_scores_and_labels(
-    X: pd.DataFrame,
-    artifacts_dir: str,
-    apply_persona_thresholds: bool = True,
-):
+def load_artifacts(artifacts_dir: str, compact: bool = False) -> dict:
     """
-    returns:
-      scores:        (n_rows x n_labels) 위험확률
-      labels_bin:    (n_rows x n_labels) 0/1
-      persona_ids:   (n_rows,)           dominant persona 키
-      applied_thr:   (n_rows x n_labels) 각 행/라벨에 실제 적용된 임계값
+    meta.json, thresholds*.json, model_{LBL}.joblib을 한 번에 로드.
+    compact=True이고 모든 라벨의 model_{LBL}.npz가 있으면 joblib 대신 압축 배열(tree_export) 로드
+    → models[lbl] = CompactModel(predict_proba 호환), compact = CompactEnsemble(공유 행렬 채점)
+    returns: {"dir", "meta", "labels", "per_label_features", "models", "thr_global", "thr_by_persona", "compact"}
     """
     art = Path(artifacts_dir)
 
@@ -137,65 +198,171 @@ def predict_scores_and_labels(
         with open(thr_global_path, "r", encoding="utf-8") as f:
             thr_global = json.load(f)
 
-    # 결과 컨테이너
-    scores = pd.DataFrame(index=X.index, dtype=float)
-    labels_bin = pd.DataFrame(index=X.index, dtype=int)
-    applied_thresholds = pd.DataFrame(index=X.index, dtype=float)
-
-    # dominant persona (X에 persona_p*가 포함되어 있어야 함; meta 스키마로 강제됨)
-    persona_ids = _dominant_persona_from_matrix(X)
+    ensemble = None
+    if compact:
+        from .tree_export import CompactEnsemble
+        ensemble = CompactEnsemble.load(str(art), [lbl for lbl in labels if per_label_features.get(lbl)])
+        if ensemble is None:
+            print("[WARN] compact models (model_*.npz) incomplete → joblib")
 
-    # 라벨별 예측
+    models = dict(ensemble.models) if ensemble is not None else {}
     for lbl in labels:
-        feats = per_label_features.get(lbl, [])
-        if not feats:
+        if ensemble is not None:
+            break
+        if not per_label_features.get(lbl):
             print(f"[WARN] {lbl}: no feature list in meta → skip")
             continue
-
-        # 스키마 가드
-        missing = [c for c in feats if c not in X.columns]
-        if missing:
-            print(f"[WARN] {lbl}: {len(missing)} missing features; will fill 0")
-
         model_path = art / f"model_{lbl}.joblib"
         if not model_path.exists():
             print(f"[WARN] {lbl}: model file not found → skip")
             continue
-
         try:
-            model = joblib_load(model_path)
+            models[lbl] = joblib_load(model_path)
         except Exception as e:
             print(f"[WARN] {lbl}: failed to load model → {e}")
-            continue
 
-        Xin = _force_schema(X[feats], feats)
+    return {
+        "dir": str(art),
+        "meta": meta,
+        "labels": labels,
+        "per_label_features": per_label_features,
+        "models": models,
+        "thr_global": thr_global,
+        "thr_by_persona": thr_by_persona_map,
+        "compact": ensemble,
+    }
+
+
+# ---------------------------
+# 예측: 위험확률 + (옵션) 페르소나별 임계값 라벨
+# ---------------------------
+def predict_scores_and_labels(
+    X: pd.DataFrame,
+    artifacts_dir: str = None,
+    apply_persona_thresholds: bool = True,
+    bundle: dict = None,
+    timings: dict = None,
+):
+    """
+    bundle: load_artifacts() 결과(상주 서비스는 미리 로드한 번들 전달). 없으면 artifacts_dir에서 로드
+    timings: dict를 주면 라벨별 추론 시간(초)을 기록
+    returns:
+      scores:        (n_rows x n_labels) 위험확률
+      labels_bin:    (n_rows x n_labels) 0/1
+      persona_ids:   (n_rows,)           dominant persona 키 (category: 정수 코드 + 'persona_i')
+      applied_thr:   (n_rows x n_labels) 각 행/라벨에 실제 적용된 임계값
+    """
+    if bundle is None:
+        bundle = load_artifacts(artifacts_dir)
+    per_label_features = bundle["per_label_features"]
+
+    # dominant persona (X에 persona_p*가 포함되어 있어야 함; meta 스키마로 강제됨) → 정수 코드
+    persona_ids = _dominant_persona_from_matrix(X)
+    codes = persona_ids.cat.codes.to_numpy()
+
+    # 임계값: (페르소나 × 라벨) 표에서 코드로 gather
+    labels = [lbl for lbl in bundle["labels"] if bundle["models"].get(lbl) is not None]
+    T = persona_threshold_table(bundle, labels, len(persona_ids.cat.categories), apply_persona_thresholds)
+
+    # 결과 행렬 (행 × 라벨)
+    n = len(X)
+    S = np.empty((n, len(labels)))
+    B = np.empty((n, len(labels)), dtype=int)
+    R = np.empty((n, len(labels)))
+
+    # 압축 배열: 피처 합집합 행렬 하나로 전 라벨 한 번에
+    ensemble = bundle.get("compact")
+    if ensemble is not None:
+        S[:] = ensemble.predict(X, labels, timings=timings)
+
+    # 라벨별 예측
+    for j, lbl in enumerate(labels):
+        model = bundle["models"][lbl]
+        t0 = time.perf_counter()
+        feats = per_label_features[lbl]
+
+        # 스키마 가드
+        missing = [c for c in feats if c not in X.columns]
+        if missing:
+            print(f"[WARN] {lbl}: {len(missing)} missing features; will fill 0")
 
         # 위험확률 = predict_proba(1)
-        p = _safe_proba(model, Xin)
-        scores[lbl] = p
+        if ensemble is None:
+            Xin = _force_schema(X.reindex(columns=feats), feats)
+            S[:, j] = _safe_proba(model, Xin)
 
         # 임계값(페르소나별 → _global → thresholds.json → 0.5)
-        if apply_persona_thresholds:
-            thr_table = thr_by_persona_map.get(lbl, {})
-            thr_def = float(thr_table.get("_global", thr_global.get(lbl, 0.5)))
-            row_thr = persona_ids.map(lambda k: float(thr_table.get(k, thr_def)))
-        else:
-            row_thr = float(thr_global.get(lbl, 0.5))
+        R[:, j] = T[codes, j]
+        B[:, j] = S[:, j] >= R[:, j]
+        if timings is not None and ensemble is None:
+            timings[lbl] = time.perf_counter() - t0
+
+    scores = pd.DataFrame(S, index=X.index, columns=labels)
+    labels_bin = pd.DataFrame(B, index=X.index, columns=labels)
+    applied_thresholds = pd.DataFrame(R, index=X.index, columns=labels)
+    return scores, labels_bin, persona_ids, applied_thresholds
 
-        applied_thresholds[lbl] = np.asarray(row_thr)
-        labels_bin[lbl] = (p >= np.asarray(row_thr)).astype(int)
 
-    return scores, labels_bin, persona_ids, applied_thresholds
+# ---------------------------
+# 출력 프레임 (wide 4종 + long) — 배치/스트리밍 공용
+# ---------------------------
+def prediction_outputs(scores: pd.DataFrame, labels_bin: pd.DataFrame,
+                       persona_ids: pd.Series, applied_thr: pd.DataFrame) -> dict:
+    """
+    파일 이름(확장자 제외) → 저장할 Arrow 테이블. row_id = 입력 행 인덱스.
+    long(행 × 라벨, 행 우선 순서)은 wide 행렬을 그대로 펼침: row_id = repeat, label = tile(사전 코드)
+    label/persona는 사전(dictionary) 인코딩 문자열 → 판다스로 읽으면 category
+    """
+    import pyarrow as pa
+
+    row_id = scores.index.to_numpy(dtype=np.int64)
+    labels = list(scores.columns)
+    L = len(labels)
+
+    def _wide(frame):
+        cols = {"row_id": pa.array(row_id)}
+        cols.update({c: pa.array(frame[c].to_numpy()) for c in frame.columns})
+        return pa.table(cols)
+
+    persona = pa.DictionaryArray.from_arrays(
+        pa.array(persona_ids.cat.codes.to_numpy(dtype=np.int32)), pa.array(list(persona_ids.cat.categories)))
+    long_tbl = pa.table({
+        "row_id": pa.array(np.repeat(row_id, L)),
+        "label": pa.DictionaryArray.from_arrays(pa.array(np.tile(np.arange(L, dtype=np.int32), len(row_id))),
+                                                pa.array(labels, type=pa.string())),
+        "score": pa.array(scores.to_numpy(dtype=float).ravel()),
+        "pred": pa.array(labels_bin.to_numpy().ravel()),
+        "thr": pa.array(applied_thr.to_numpy(dtype=float).ravel()),
+    })
+    return {
+        "scores_wide": _wide(scores),
+        "labels_wide": _wide(labels_bin),
+        "thresholds_wide": _wide(applied_thr),
+        "persona": pa.table({"row_id": pa.array(row_id), "persona": persona}),
+        "predictions_long": long_tbl,
+    }
 
 
 # ---------------------------
 # 드리프트(간단) 점검
 # ---------------------------
-def quick_drift_check(X: pd.DataFrame, artifacts_dir: str, out_dir: str):
+def quick_drift_check(X: pd.DataFrame, artifacts_dir: str, out_dir: str, columns: list = None,
+                      months=None, per_label_features: dict = None):
     """
-    monitor_baseline.json에 저장된 학습 분포 분위수와 비교.
+    monitor_baseline.npz(모델 피처 전체 구간 건수)가 있으면 drift_monitor로 월별 PSI/KS
+    → drift_features/drift_labels.parquet + feature_drift_warn.csv.
+    없으면(이전 산출물) monitor_baseline.json 분위수와 비교:
     상/하 5% 분위수 밖 비율이 20% 이상인 피처를 경고로 저장.
+    columns: 점검 대상(기본 X 전체). 피처 플랜으로 계산을 생략한 0 채움 컬럼은 제외해야 함
     """
+    from .drift_monitor import DriftBaseline
+    drift = DriftBaseline.load(artifacts_dir)
+    if drift is not None:
+        acc = drift.accumulator()
+        acc.update(X, months=months)
+        acc.write(out_dir, per_label_features)
+        return
+
     base_path = Path(artifacts_dir) / "monitor_baseline.json"
     if not base_path.exists():
         return
@@ -206,9 +373,15 @@ def quick_drift_check(X: pd.DataFrame, artifacts_dir: str, out_dir: str):
     except Exception:
         return
 
-    drift_flags = {}
-    feat_hist = base.get("feature_hist", {})
-    for c in X.columns[:200]:
+    counts = _drift_oob_counts(X, base.get("feature_hist", {}), columns)
+    _write_drift_flags({c: k / len(X) for c, k in counts.items()}, out_dir)
+
+
+def _drift_oob_counts(X: pd.DataFrame, feat_hist: dict, columns: list = None) -> dict:
+    """피처별 학습 5~95% 분위 범위 밖 행 수 (스트리밍은 월별 합산 후 비율)."""
+    counts = {}
+    cols = [c for c in X.columns if columns is None or c in set(columns)]
+    for c in cols[:200]:
         if c not in feat_hist:
             continue
         try:
@@ -218,18 +391,124 @@ def quick_drift_check(X: pd.DataFrame, artifacts_dir: str, out_dir: str):
             q_hi = qs[19] if len(qs) >= 20 else np.nanpercentile(qs, 95)
 
             x = pd.to_numeric(X[c], errors="coerce")
-            oob = ((x < q_lo) | (x > q_hi)).mean()
-            if oob > 0.2:  # 20% 이상 범위를 벗어나면 경고
-                drift_flags[c] = float(oob)
+            counts[c] = int(((x < q_lo) | (x > q_hi)).sum())
         except Exception:
             continue
+    return counts
 
+
+def _write_drift_flags(oob_rate: dict, out_dir: str):
+    drift_flags = {c: float(r) for c, r in oob_rate.items() if r > 0.2}  # 20% 이상 범위를 벗어나면 경고
     if drift_flags:
         out_path = Path(out_dir) / "feature_drift_warn.csv"
         pd.Series(drift_flags).sort_values(ascending=False).to_csv(out_path, encoding="utf-8-sig")
         print(f"[DRIFT] {len(drift_flags)} features show potential drift → {out_path}")
 
 
+# ---------------------------
+# 스트리밍: 월 파티션 단위 채점
+# ---------------------------
+def _input_columns(plan: dict, dataset: str = None):
+    """CSV에서 읽을 컬럼: 피처 플랜 closure (+ 데이터셋 기록 시 차원 컬럼). 플랜 없으면 전부(None)."""
+    if not plan:
+        return None
+    keep = set(plan_input_columns(plan))
+    if dataset:
+        from .prediction_dataset import DIM_COLS
+        keep |= set(DIM_COLS)
+    return keep
+
+
+def stream_predict(args, meta: dict, prof):
+    """
+    CSV → 월 파티션(telecom_schema.iter_month_partitions) → 월마다
+    롤링 상태로 _std + Δ/Trend → 피처 → 채점 → 출력별 ParquetWriter에 row group 1개씩 추가.
+    - Δ/Trend는 이전 월 월평균(상태)만 있으면 되므로 전체 이력을 한 번에 올린 결과와 같다
+    - --state가 있으면 그 상태에서 이어서(마지막 월 이전 달은 건너뜀), 성공 후 저장
+    - 드리프트/온라인 룩업은 월별로 누적해 마지막에 한 번 기록
+    - 행 순서는 월 순서(월 안에서는 입력 순서), row_id = 입력 CSV 행 번호
+    - --dataset이면 월마다 해당 월 파티션만 교체 기록(prediction_dataset)
+    """
+    import pyarrow.parquet as pq
+    from .rolling_state import RollingState
+    from .telecom_schema import iter_month_partitions
+
+    out_dir = Path(args.out_dir)
+    plan = meta.get("feature_plan")
+    bundle = load_artifacts(args.artifacts, compact=args.compact)
+    centers = load_centers(args.centers) if args.centers and os.path.exists(args.centers) else None
+    # --state 없으면 이번 실행 전용(저장 안 함)
+    state = RollingState(args.state or str(out_dir / "_stream_state"))
+    last = state.last_month()
+    std_kwargs = plan_std_kwargs(plan) if plan else {}
+    keep = _input_columns(plan, args.dataset)
+
+    from .drift_monitor import DriftBaseline
+    drift = DriftBaseline.load(args.artifacts)
+    drift_acc = drift.accumulator() if drift is not None else None
+    feat_hist = {}
+    base_path = Path(args.artifacts) / "monitor_baseline.json"
+    if drift_acc is None and base_path.exists():
+        with open(base_path, "r", encoding="utf-8") as f:
+            feat_hist = json.load(f).get("feature_hist", {})
+    drift_cols = (plan or {}).get("model_features")
+    oob, n_rows = {}, 0
+    lookups = []
+    writers = {}
+
+    prof.mark("stream")
+    try:
+        for month, mdf in iter_month_partitions(args.csv, columns=keep, spill_dir=str(out_dir / "_stream_parts")):
+            if last is not None and month < last:
+                print(f"[STREAM] skip {month:%Y-%m} (< state last_month {last:%Y-%m})")
+                continue
+            with prof.span("features", label=f"{month:%Y-%m}"):
+                std = state.update(mdf, **std_kwargs)
+                X = prepare_features_for_inference(df_raw=std, meta=meta, centers=centers, standardized=True)
+            with prof.span("predict", label=f"{month:%Y-%m}"):
+                scores, labels_bin, persona_ids, applied_thr = predict_scores_and_labels(
+                    X, bundle=bundle, apply_persona_thresholds=not args.no_persona_thr)
+            with prof.span("write", label=f"{month:%Y-%m}"):
+                for name, tbl in prediction_outputs(scores, labels_bin, persona_ids, applied_thr).items():
+                    if name not in writers:
+                        writers[name] = pq.ParquetWriter(str(out_dir / f"{name}.parquet"), tbl.schema)
+                    writers[name].write_table(tbl.cast(writers[name].schema))
+                if args.dataset:
+                    from .prediction_dataset import prediction_dataset_table, write_prediction_dataset, dataset_dims
+                    write_prediction_dataset(args.dataset, prediction_dataset_table(
+                        scores, labels_bin, applied_thr, persona_ids, dataset_dims(std)))
+                if drift_acc is not None:
+                    drift_acc.update(X, months=month)
+                for c, k in _drift_oob_counts(X, feat_hist, drift_cols).items():
+                    oob[c] = oob.get(c, 0) + k
+                n_rows += len(X)
+                if args.online_lookup and plan:
+                    from .online_scorer import build_month_lookup
+                    derived_cols = list(plan["delta3m"]) + list(plan["trend12m"])
+                    lookups.append(build_month_lookup(ensure_year_month(std.copy()), list(plan["std"].keys()),
+                                                      derived=X.reindex(columns=derived_cols)))
+            print(f"[STREAM] {month:%Y-%m}: rows={len(X):,}")
+    finally:
+        for w in writers.values():
+            w.close()
+    if not writers:
+        raise ValueError("no months scored (input empty or all months older than state)")
+
+    prof.mark("drift")
+    if drift_acc is not None:
+        drift_acc.write(args.out_dir, meta.get("per_label_features"))
+    elif n_rows:
+        _write_drift_flags({c: k / n_rows for c, k in oob.items()}, args.out_dir)
+    if lookups:
+        from .online_scorer import save_month_lookup
+        save_month_lookup(args.online_lookup, pd.concat([b for b, _ in lookups], ignore_index=True),
+                          pd.concat([d for _, d in lookups], ignore_index=True))
+    if args.state:
+        state.save()
+    prof.finish(str(out_dir / "profile.json"))
+    print(f"[DONE] streamed {n_rows:,} rows to {args.out_dir}/")
+
+
 # ---------------------------
 # CLI
 # ---------------------------
@@ -240,65 +519,114 @@ def main():
     ap.add_argument("--centers", default="project/cluster_centers.csv", help="soft persona center csv")
     ap.add_argument("--out_dir", default="pred_out", help="출력 폴더")
     ap.add_argument("--no_persona_thr", action="store_true", help="페르소나별 임계값 적용 끄기")
+    ap.add_argument("--feature_store", default=None, help="표준화/파생 피처 캐시 폴더(월 파티션 Parquet)")
+    ap.add_argument("--months", default="", help='캐시 사용 시 채점할 월 콤마리스트 (예: "2025-05,2025-06")')
+    ap.add_argument("--state", default=None, help="월 증분 채점용 롤링 상태 폴더(최근 12개월 월평균/표준화 기준값)")
+    ap.add_argument("--online_lookup", default=None, help="온라인 채점용 월 기준값 룩업 폴더(채점 월 upsert)")
+    ap.add_argument("--cprofile", action="store_true", help="가장 느린 단계의 cProfile 덤프(profile_<단계>.prof)")
+    ap.add_argument("--stream", action="store_true",
+                    help="월 파티션 스트리밍(월별 표준화/채점, Parquet row group 단위 추가 기록)")
+    ap.add_argument("--compact", action="store_true",
+                    help="압축 배열(model_*.npz, tree_export)로 채점: 로드 ms 단위, LightGBM/joblib 불필요")
+    ap.add_argument("--dataset", default=None,
+                    help="Hive 파티션 예측 데이터셋 폴더(year_month=/label=, 같은 월은 교체)")
     args = ap.parse_args()
+    if args.state and args.feature_store:
+        ap.error("--state와 --feature_store는 함께 쓸 수 없습니다")
+    if args.stream and args.feature_store:
+        ap.error("--stream은 CSV 입력 전용입니다(--feature_store와 함께 쓸 수 없음)")
 
     os.makedirs(args.out_dir, exist_ok=True)
+    from .profiling import Profiler
+    prof = Profiler(cprofile=args.cprofile)
     meta_path = str(Path(args.artifacts) / "meta.json")
 
-    # 0) 원천 로드
-    df_raw = pd.read_csv(args.csv)
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    plan = meta.get("feature_plan")
+
+    if args.stream:
+        stream_predict(args, meta, prof)
+        return
+
+    # 0) 원천 로드 (캐시: 필요한 컬럼/월만 읽음 — Δ/Trend는 전체 이력 기준으로 이미 계산됨)
+    #    CSV: 피처 플랜이 있으면 closure 컬럼만 읽음
+    prof.mark("load")
+    if args.feature_store:
+        from .feature_store import FeatureStore
+        months = [pd.Timestamp(m) for m in args.months.split(",") if m.strip()] or None
+        df_raw = FeatureStore(args.feature_store).materialize(
+            args.csv, columns=_store_columns_for(meta, args.centers), months=months
+        )
+    else:
+        df_raw = read_telecom_csv(args.csv, columns=_input_columns(plan, args.dataset))
+
+    # 0-1) 롤링 상태: 새 달 행만으로 _std + Δ/Trend (빈 상태면 입력 전체로 시드)
+    state = None
+    if args.state:
+        from .rolling_state import RollingState
+        prof.mark("state")
+        state = RollingState(args.state)
+        df_raw = state.update(df_raw, **(plan_std_kwargs(plan) if plan else {}))
 
     # 1) 피처 준비
+    prof.mark("features")
     X = prepare_features_for_inference(
         df_raw=df_raw,
         meta_path=meta_path,
-        centers_path=args.centers
+        centers_path=args.centers,
+        standardized=bool(args.feature_store or state is not None),
     )
 
     # 2) 예측
+    prof.mark("predict")
+    timings = {}
     scores, labels_bin, persona_ids, applied_thr = predict_scores_and_labels(
         X,
-        artifacts_dir=args.artifacts,
-        apply_persona_thresholds=not args.no_persona_thr
+        bundle=load_artifacts(args.artifacts, compact=args.compact),
+        apply_persona_thresholds=not args.no_persona_thr,
+        timings=timings,
     )
+    for lbl, sec in timings.items():
+        prof.add("predict", sec, label=lbl)
 
     # 3) 저장 (wide + long)
-    #   - wide
-    scores.reset_index(names="row_id").to_parquet(Path(args.out_dir) / "scores_wide.parquet", index=False)
-    labels_bin.reset_index(names="row_id").to_parquet(Path(args.out_dir) / "labels_wide.parquet", index=False)
-    applied_thr.reset_index(names="row_id").to_parquet(Path(args.out_dir) / "thresholds_wide.parquet", index=False)
-    persona_ids.to_frame("persona").reset_index(names="row_id").to_parquet(Path(args.out_dir) / "persona.parquet", index=False)
-
-    #   - long
-    scores_long = (
-        scores.stack()
-            .to_frame("score")
-            .reset_index()
-            .rename(columns={"level_0": "row_id", "level_1": "label"})
-    )
-
-    labels_long = (
-        labels_bin.stack()
-                .to_frame("pred")
-                .reset_index()
-                .rename(columns={"level_0": "row_id", "level_1": "label"})
-    )
-    thr_long = (
-        applied_thr.stack()
-                .to_frame("thr")
-                .reset_index()
-                .rename(columns={"level_0": "row_id", "level_1": "label"})
-    )
-    pd.merge(pd.merge(scores_long, labels_long, on=["row_id", "label"]), thr_long, on=["row_id", "label"]) \
-        .to_parquet(Path(args.out_dir) / "predictions_long.parquet", index=False)
+    prof.mark("save")
+    import pyarrow.parquet as pq
+    for name, tbl in prediction_outputs(scores, labels_bin, persona_ids, applied_thr).items():
+        pq.write_table(tbl, str(Path(args.out_dir) / f"{name}.parquet"))
+    if args.dataset:
+        from .prediction_dataset import prediction_dataset_table, write_prediction_dataset, dataset_dims
+        write_prediction_dataset(args.dataset, prediction_dataset_table(
+            scores, labels_bin, applied_thr, persona_ids, dataset_dims(df_raw)))
 
     # 4) 간단 드리프트 리포트
-    quick_drift_check(X, artifacts_dir=args.artifacts, out_dir=args.out_dir)
+    prof.mark("drift")
+    from .drift_monitor import row_months
+    quick_drift_check(X, artifacts_dir=args.artifacts, out_dir=args.out_dir,
+                      columns=(plan or {}).get("model_features"),
+                      months=row_months(df_raw), per_label_features=meta.get("per_label_features"))
+
+    # 4-1) 온라인 채점 룩업: 이번 실행 월의 표준화 기준값 + Δ/Trend 월 상수
+    if args.online_lookup and plan:
+        prof.mark("online_lookup")
+        from .online_scorer import build_month_lookup, save_month_lookup
+        df_m = ensure_year_month(df_raw.copy())
+        derived_cols = list(plan["delta3m"]) + list(plan["trend12m"])
+        save_month_lookup(args.online_lookup, *build_month_lookup(
+            df_m, list(plan["std"].keys()), derived=X.reindex(columns=derived_cols)))
+
+    # 5) 상태 저장은 산출물 저장 후 (실패한 달이 상태를 전진시키지 않도록)
+    if state is not None:
+        state.save()
+    prof.finish(str(Path(args.out_dir) / "profile.json"))
 
     print(f"[DONE] saved to {args.out_dir}/")
     print(" - scores_wide.parquet, labels_wide.parquet, thresholds_wide.parquet")
     print(" - predictions_long.parquet, persona.parquet")
-    print(" - (optional) feature_drift_warn.csv")
+    print(" - (optional) drift_features/drift_labels.parquet, feature_drift_warn.csv, profile.json")
+    if args.dataset:
+        print(f" - dataset: {args.dataset}/year_month=*/label=*/ (+ _manifest.json)")
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
 from pathlib import Path
-import json, os, warnings
+import os, warnings
 import numpy as np
 import pandas as pd
 warnings.filterwarnings("ignore")
@@ -10,9 +10,10 @@ from .train_pipeline import (
     ensure_year_month, ensure_all_standardized_features, _build_proxy_scores, _ensure_default_scores,
     _resolve_col, load_centers, soft_membership
 )
+from .telecom_schema import read_telecom_csv
 
-def _build_feature_matrix(df_lbl: pd.DataFrame, centers_path: str):
-    # 학습 파이프라인의 BASE_STD 정의와 동일하게 구성
+def _build_feature_matrix(df_lbl: pd.DataFrame, centers_path: str, resolution: dict = None):
+    # 학습 파이프라인의 BASE_STD 정의와 동일하게 구성 (resolution: meta.json의 이름 → 컬럼 매핑, 없으면 느슨 매칭)
     base_std = [
         "평일 총 이동 거리 합계_std", "휴일 총 이동 거리 합계_std",
         "동영상/방송 서비스 사용일수_std", "게임 서비스 사용일수_std",
@@ -25,7 +26,7 @@ def _build_feature_matrix(df_lbl: pd.DataFrame, centers_path: str):
         "쇼핑 서비스 사용일수_std", "금융 서비스 사용일수_std",
         "배달 서비스 사용일수_std",
     ]
-    BASE_STD = [c for c in [_resolve_col(df_lbl, name) for name in base_std] if c]
+    BASE_STD = [c for c in [_resolve_col(df_lbl, name, resolution) for name in base_std] if c]
     DELTA3M = [c + "_delta3m" for c in BASE_STD if (c + "_delta3m") in df_lbl.columns]
     TREND12 = [c + "_trend12m" for c in BASE_STD if (c + "_trend12m") in df_lbl.columns]
 
@@ -57,44 +58,55 @@ def predict_rows(
     rules_path: str,
     centers_path: str,
     artifacts_dir: str,
-    out_csv: str = None
+    out_csv: str = None,
+    feature_store_dir: str = None,
+    bundle: dict = None,
+    out_dataset: str = None,
 ):
-    from joblib import load as joblib_load
-    # 0) 데이터 로드 & 전처리
-    df = pd.read_csv(csv_path)
-    df = ensure_year_month(df)
-    df = ensure_all_standardized_features(df, month_col="year_month")
+    """
+    bundle: predict_persona.load_artifacts() 결과(미리 로드한 모델/임계값 재사용).
+    out_dataset: Hive 파티션 예측 데이터셋 폴더(prediction_dataset). 주면 out_csv를 명시할 때만 CSV도 저장.
+    """
+    from .predict_persona import load_artifacts
+    # 0) 데이터 로드 & 전처리 (캐시가 있으면 표준화/파생 재사용)
+    if feature_store_dir:
+        from .feature_store import FeatureStore
+        df = FeatureStore(feature_store_dir).materialize(csv_path)
+    else:
+        df = read_telecom_csv(csv_path)
+        df = ensure_year_month(df)
+        df = ensure_all_standardized_features(df, month_col="year_month")
+
+    # 메타 & 임계값 & 모델 (번들 없으면 1회 로드) — 학습 때의 컬럼 해석 매핑을 먼저 확보
+    if bundle is None:
+        bundle = load_artifacts(artifacts_dir)
+    meta = bundle["meta"]
+    # 복사본에 기록(번들 재사용 시 메타 오염 방지). 구 산출물(매핑 없음)은 None → 느슨 매칭
+    resolution = {k: dict(v) for k, v in (meta.get("column_resolution") or {}).items()}
 
     # 1) 규칙 스코어 생성(학습과 동일)
     import yaml, io
     with open(rules_path, "r", encoding="utf-8") as f:
         rules_meta = yaml.safe_load(f) or {}
     lbl_cols = [c for c in df.columns if c.startswith("LBL_") and df[c].dtype == bool]
-    df = _build_proxy_scores(df, rules_meta, lbl_cols)
+    df = _build_proxy_scores(df, rules_meta, lbl_cols, resolution=resolution.get("score_signals"))
     df = _ensure_default_scores(df, lbl_cols)
 
     # 2) 특성 행렬 구성
-    X = _build_feature_matrix(df, centers_path)
+    X = _build_feature_matrix(df, centers_path, resolution=resolution.get("base_std"))
     X = X.fillna(0)
-
-    # 3) 메타 & 임계값 로드
-    meta_path = os.path.join(artifacts_dir, "meta.json")
-    thr_path  = os.path.join(artifacts_dir, "thresholds.json")
-    with open(meta_path, "r", encoding="utf-8") as f:
-        meta = json.load(f)
-    with open(thr_path, "r", encoding="utf-8") as f:
-        thresholds = json.load(f)
+    thresholds = bundle["thr_global"]
 
     labels = [c for c in meta["labels"] if c in thresholds]  # 모델이 실제로 저장된 라벨만
 
-    # 4) 라벨별 예측
+    # 3) 라벨별 예측
     proba_df = pd.DataFrame(index=X.index)
     pred_df  = pd.DataFrame(index=X.index)
+    thr_used = {}
     for lbl in labels:
-        model_file = os.path.join(artifacts_dir, f"model_{lbl}.joblib")
-        if not os.path.exists(model_file):
+        est = bundle["models"].get(lbl)
+        if est is None:
             continue
-        est = joblib_load(model_file)
 
         # 학습 시 사용한 피처 집합으로 얼라인
         feat_cols = meta["per_label_features"].get(lbl, [])
@@ -115,6 +127,7 @@ def predict_rows(
         thr = float(thresholds.get(lbl, 0.5))
         proba_df[f"proba_{lbl}"] = p
         pred_df[f"pred_{lbl}"]   = (p >= thr).astype(int)
+        thr_used[lbl] = thr
 
     # 5) 결과 머지 & 저장
     out = pd.DataFrame({
@@ -130,10 +143,21 @@ def predict_rows(
 
     out = pd.concat([out, proba_df, pred_df], axis=1)
 
-    if out_csv is None:
+    if out_dataset:
+        from .predict_persona import _dominant_persona_from_matrix
+        from .prediction_dataset import prediction_dataset_table, write_prediction_dataset, dataset_dims
+        scored = list(thr_used)
+        scores = proba_df[[f"proba_{l}" for l in scored]].set_axis(scored, axis=1)
+        preds = pred_df[[f"pred_{l}" for l in scored]].set_axis(scored, axis=1)
+        thr_df = pd.DataFrame(np.broadcast_to([thr_used[l] for l in scored], preds.shape),
+                              index=preds.index, columns=scored)
+        write_prediction_dataset(out_dataset, prediction_dataset_table(
+            scores, preds, thr_df, _dominant_persona_from_matrix(X), dataset_dims(df)))
+    if out_csv is None and not out_dataset:
         out_csv = os.path.join(artifacts_dir, "row_predictions.csv")
-    out.to_csv(out_csv, index=False, encoding="utf-8-sig")
-    print(f"[OK] saved: {out_csv}")
+    if out_csv is not None:
+        out.to_csv(out_csv, index=False, encoding="utf-8-sig")
+        print(f"[OK] saved: {out_csv}")
     # 요약 프린트
     cols = [c for c in pred_df.columns]
     if cols:
@@ -148,11 +172,15 @@ if __name__ == "__main__":
     ap.add_argument("--centers_path", required=True)
     ap.add_argument("--artifacts_dir", required=True)
     ap.add_argument("--out_csv", default=None)
+    ap.add_argument("--feature_store", default=None, help="표준화/파생 피처 캐시 폴더")
+    ap.add_argument("--out_dataset", default=None, help="Hive 파티션 예측 데이터셋 폴더(year_month=/label=)")
     args = ap.parse_args()
     predict_rows(
         csv_path=args.csv_path,
         rules_path=args.rules_path,
         centers_path=args.centers_path,
         artifacts_dir=args.artifacts_dir,
-        out_csv=args.out_csv
+        out_csv=args.out_csv,
+        feature_store_dir=args.feature_store,
+        out_dataset=args.out_dataset,
     )
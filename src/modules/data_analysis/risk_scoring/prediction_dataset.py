@@ -0,0 +1,176 @@
+# prediction_dataset.py
+# -*- coding: utf-8 -*-
+"""
+예측 결과 Hive 파티션 데이터셋 (대시보드용: 월/자치구/라벨 필터)
+- 레이아웃: <dir>/year_month=YYYY-MM/label=LBL_*/part-0.parquet  + <dir>/_manifest.json
+- 행 = (입력 행 × 라벨): row_id, score, pred, thr, persona, 자치구/행정동코드/성별/연령대(있는 것만)
+- 문자열 차원은 Parquet 사전(dictionary) 페이지로 인코딩, 파티션 안은 (자치구, row_id) 순 정렬
+  → row group(기본 64k행) 통계의 자치구 min/max가 좁아져 자치구 필터 시 row group 단위로 건너뜀
+  (Arrow 타입은 일반 string으로 기록: dictionary 타입 필드는 pyarrow가 통계로 거르지 않음.
+   읽을 때 read_prediction_dataset이 pandas category로 되돌림)
+- 쓰기는 파티션 단위 교체(existing_data_behavior="delete_matching"): 같은 월을 다시 쓰면 그 월만 바뀜
+  → 스트리밍(월별 호출)/재채점에 그대로 사용
+- _manifest.json: 스키마, 파티션별 행 수/파일, 갱신 시각 ('_' 접두라 데이터셋 스캔에서 제외)
+
+사용 예:
+    tbl = prediction_dataset_table(scores, labels_bin, applied_thr, persona_ids, dims=df_raw)
+    write_prediction_dataset("pred_out/dataset", tbl)
+    df = read_prediction_dataset("pred_out/dataset", months=["2025-06"], labels=["LBL_CARE"],
+                                 filters={"자치구": ["강남구"]})
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import os, json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+MONTH_COL = "year_month"
+PARTITION_COLS = (MONTH_COL, "label")
+DIM_COLS = ("자치구", "행정동코드", "성별", "연령대")
+SORT_DIM = "자치구"
+MANIFEST_FILE = "_manifest.json"
+ROW_GROUP_SIZE = 64 * 1024
+
+
+def _dict_array(s: pd.Series, order: np.ndarray, reps: int) -> pa.Array:
+    """문자열 category Series → (order로 정렬, reps번 반복한) 사전 배열. 숫자 코드 등은 일반 배열."""
+    if isinstance(s.dtype, pd.CategoricalDtype) and s.cat.categories.dtype == object:
+        codes = s.cat.codes.to_numpy()[order]
+        return pa.DictionaryArray.from_arrays(
+            pa.array(np.tile(codes.astype(np.int32), reps), mask=np.tile(codes < 0, reps)),
+            pa.array(s.cat.categories.astype(str)))
+    v = s.to_numpy()[order]
+    if isinstance(s.dtype, pd.CategoricalDtype) and not s.isna().any():
+        v = v.astype(s.cat.categories.dtype)   # 숫자 카테고리(행정동코드) → int64
+    return pa.array(np.tile(v, reps))
+
+
+def prediction_dataset_table(scores: pd.DataFrame, labels_bin: pd.DataFrame, applied_thr: pd.DataFrame,
+                             persona_ids: pd.Series, dims: pd.DataFrame) -> pa.Table:
+    """
+    wide 예측(행 × 라벨) + 행 차원(dims: year_month, 자치구 등; scores와 같은 인덱스) → 데이터셋용 long 테이블.
+    라벨 우선 배치(라벨 j의 행들이 연속), 라벨 안에서는 (월, 자치구, row_id) 순.
+    """
+    row_id = scores.index.to_numpy(dtype=np.int64)
+    dims = dims.loc[scores.index]
+    # 월 문자열은 고유 월에만 strftime (행 수만큼 포맷하지 않음)
+    uniq, month_code = np.unique(dims[MONTH_COL].to_numpy(), return_inverse=True)
+    month = pd.DatetimeIndex(uniq).strftime("%Y-%m").to_numpy(dtype=object)[month_code]
+    keys = [row_id]
+    if SORT_DIM in dims.columns:
+        s = dims[SORT_DIM]
+        keys.append(s.cat.codes.to_numpy() if isinstance(s.dtype, pd.CategoricalDtype) else s.to_numpy())
+    keys.append(month_code)
+    order = np.lexsort(keys)
+
+    labels = list(scores.columns)
+    L, n = len(labels), len(row_id)
+    cols = {
+        MONTH_COL: pa.array(np.tile(month[order], L)),
+        "label": pa.array(np.repeat(np.asarray(labels, dtype=object), n), type=pa.string()),
+        "row_id": pa.array(np.tile(row_id[order], L)),
+        "score": pa.array(scores.to_numpy(dtype=float)[order].T.ravel()),
+        "pred": pa.array(labels_bin.to_numpy()[order].T.ravel()),
+        "thr": pa.array(applied_thr.to_numpy(dtype=float)[order].T.ravel()),
+        "persona": _dict_array(persona_ids, order, L),
+    }
+    for c in DIM_COLS:
+        if c in dims.columns:
+            cols[c] = _dict_array(dims[c], order, L)
+    return pa.table(cols)
+
+
+def dataset_dims(df: pd.DataFrame) -> pd.DataFrame:
+    """원천/표준화 프레임에서 데이터셋 차원 컬럼만(year_month datetime 보장)."""
+    from .train_pipeline import ensure_year_month
+    src = [c for c in (MONTH_COL, "month", "year", "month_num") if c in df.columns]
+    return ensure_year_month(df[src + [c for c in DIM_COLS if c in df.columns]].copy())
+
+
+def _partitioning():
+    return ds.partitioning(pa.schema([(c, pa.string()) for c in PARTITION_COLS]), flavor="hive")
+
+
+def load_manifest(base_dir: str) -> Dict:
+    path = Path(base_dir) / MANIFEST_FILE
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_prediction_dataset(base_dir: str, tbl: pa.Table, row_group_size: int = ROW_GROUP_SIZE,
+                             compression: str = "zstd", extra: Optional[Dict] = None) -> Dict:
+    """tbl의 (월, 라벨) 파티션을 교체 기록하고 _manifest.json 갱신. extra: 매니페스트에 남길 정보(산출물 경로 등)."""
+    base = Path(base_dir)
+    base.mkdir(parents=True, exist_ok=True)
+    for i, f in enumerate(tbl.schema):
+        if pa.types.is_dictionary(f.type):
+            tbl = tbl.set_column(i, f.name, pc.cast(tbl.column(i), f.type.value_type))
+    fmt = ds.ParquetFileFormat()
+    ds.write_dataset(
+        tbl, str(base), format=fmt, partitioning=_partitioning(),
+        basename_template="part-{i}.parquet",
+        existing_data_behavior="delete_matching",
+        file_options=fmt.make_write_options(compression=compression, use_dictionary=True, write_statistics=True),
+        max_rows_per_group=row_group_size, min_rows_per_group=min(row_group_size, 1024),
+    )
+
+    # 매니페스트: 이번에 쓴 파티션만 갱신
+    manifest = load_manifest(base_dir)
+    parts = manifest.get("partitions", {})
+    month_arr, label_arr = tbl.column(MONTH_COL), tbl.column("label")
+    counts = pc.value_counts(pc.binary_join_element_wise(month_arr, label_arr, "|"))
+    for item in counts.to_pylist():
+        m, lbl = item["values"].split("|", 1)
+        d = base / f"{MONTH_COL}={m}" / f"label={lbl}"
+        files = sorted(p.name for p in d.glob("*.parquet"))
+        n_groups = sum(pq.ParquetFile(d / f).metadata.num_row_groups for f in files)
+        parts.setdefault(m, {})[lbl] = {"rows": int(item["counts"]), "files": files, "row_groups": n_groups}
+    schema = tbl.drop_columns(list(PARTITION_COLS)).schema
+    manifest.update({
+        "format": "parquet",
+        "partitioning": {"flavor": "hive", "columns": list(PARTITION_COLS)},
+        "sort_within_partition": [c for c in (SORT_DIM, "row_id") if c in tbl.column_names],
+        "row_group_size": row_group_size,
+        "compression": compression,
+        "schema": {f.name: str(f.type) for f in schema},
+        "partitions": {m: parts[m] for m in sorted(parts)},
+        "rows": int(sum(v["rows"] for lbls in parts.values() for v in lbls.values())),
+        "updated_at": datetime.now().isoformat(),
+        **(extra or {}),
+    })
+    tmp = base / (MANIFEST_FILE + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, base / MANIFEST_FILE)
+    print(f"[DATASET] {base}: +{tbl.num_rows:,} rows, months={len(parts)}")
+    return manifest
+
+
+def read_prediction_dataset(base_dir: str, months: Optional[Sequence[str]] = None,
+                            labels: Optional[Sequence[str]] = None,
+                            filters: Optional[Dict[str, Sequence]] = None,
+                            columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    파티션(월/라벨) + 행 필터(예: {"자치구": ["강남구"]})로 읽기. 월/라벨은 디렉터리 단위로,
+    그 밖의 필터는 row group 통계로 건너뜀.
+    """
+    dataset = ds.dataset(str(base_dir), format="parquet", partitioning=_partitioning())
+    expr = None
+    conds = [(MONTH_COL, months), ("label", labels)] + list((filters or {}).items())
+    for col, vals in conds:
+        if vals is None:
+            continue
+        e = pc.field(col).isin(list(vals))
+        expr = e if expr is None else (expr & e)
+    tbl = dataset.to_table(columns=columns, filter=expr)
+    cats = [c for c in ("persona",) + DIM_COLS if c in tbl.column_names and pa.types.is_string(tbl.schema.field(c).type)]
+    return tbl.to_pandas(categories=cats)
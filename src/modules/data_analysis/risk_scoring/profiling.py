@@ -0,0 +1,238 @@
+# profiling.py
+# -*- coding: utf-8 -*-
+"""
+학습/추론 단계별 계측
+- Profiler: 단계/스팬별 wall·CPU 시간 + RSS → profile.json (항상 켜도 되는 가벼운 계측)
+- MemoryReport: tracemalloc 기반 단계별 할당량 → memory_report.json (train_pipeline --memory-report)
+
+Profiler
+- 최상위 단계는 체크포인트 방식 mark("단계"), 단계 안의 세부 구간은 컨텍스트 매니저 span("이름", label=...)
+- 기록 항목(스팬별):
+    wall_sec / cpu_sec   경과 시간 / 프로세스 CPU 시간(멀티스레드 학습이면 wall보다 큼)
+    rss_mb               스팬 종료 시 RSS
+    peak_rss_mb          프로세스 최대 RSS(누적) — peak_growth_mb > 0이면 이 스팬에서 최고치 갱신
+- cprofile=True: 최상위 단계마다 cProfile을 따로 돌려 가장 느린 단계만 profile_<단계>.prof로 저장
+  (pstats 형식: python -m pstats / snakeviz로 열람. py-spy는 외부에서 붙이므로 이 옵션과 무관)
+- memory=MemoryReport(...)를 주면 mark()가 메모리 리포트 단계도 함께 넘김
+
+사용 예:
+    prof = Profiler(cprofile=args.cprofile, memory=MemoryReport(args.memory_report))
+    prof.mark("load");  df = ...
+    prof.mark("train")
+    for lbl in labels:
+        with prof.span("fit", label=lbl): clf.fit(...)
+    prof.finish(os.path.join(out_dir, "profile.json"))
+
+MemoryReport
+- 단계 구분은 체크포인트 방식: mark("다음 단계") 호출 시 직전 단계를 닫고 기록
+- 기록 항목(단계별):
+    rss_mb        단계 종료 시 RSS
+    peak_rss_mb   프로세스 최대 RSS(누적 최고치, 단계 안에서 갱신되면 이 단계가 원인)
+    alloc_mb      tracemalloc 기준 단계 중 최대 할당량(단계 시작 시점 대비, numpy 버퍼 포함)
+    net_mb        단계 종료 시 순증 할당량
+    sec           소요 시간
+- tracemalloc은 느리므로 enabled=False면 아무것도 하지 않음(호출 비용 0에 가깝게)
+
+사용 예:
+    mem = MemoryReport(enabled=args.memory_report)
+    mem.mark("load");  df = ...
+    mem.mark("rules"); df_lbl = ...
+    mem.finish(os.path.join(out_dir, "memory_report.json"))
+"""
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+import os, json, sys, time
+
+try:
+    import resource  # POSIX 전용
+except ImportError:  # pragma: no cover
+    resource = None
+
+
+def _rss_mb() -> float:
+    """현재 RSS(MB). /proc(리눅스) → psutil(선택) 순, 둘 다 없으면 NaN."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except Exception:
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 1e6
+    except Exception:
+        return float("nan")
+
+
+def _peak_rss_mb() -> float:
+    if resource is None:
+        return float("nan")
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # 리눅스는 KiB, macOS는 bytes
+    return peak / 1e6 if sys.platform == "darwin" else peak * 1024 / 1e6
+
+
+class MemoryReport:
+    """체크포인트 방식 단계별 메모리 기록기."""
+
+    def __init__(self, enabled: bool = True):
+        self.enabled = bool(enabled)
+        self.stages: List[Dict] = []
+        self._cur: Optional[str] = None
+        if self.enabled:
+            import tracemalloc
+            self._tm = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def _close(self):
+        if self._cur is None:
+            return
+        cur, peak = self._tm.get_traced_memory()
+        rec = {
+            "stage": self._cur,
+            "sec": round(time.perf_counter() - self._t0, 3),
+            "rss_mb": round(_rss_mb(), 1),
+            "peak_rss_mb": round(_peak_rss_mb(), 1),
+            "alloc_mb": round((peak - self._base) / 1e6, 1),
+            "net_mb": round((cur - self._base) / 1e6, 1),
+        }
+        self.stages.append(rec)
+        print(f"[MEM] {rec['stage']:<14} rss={rec['rss_mb']:.0f}MB peak={rec['peak_rss_mb']:.0f}MB "
+              f"alloc={rec['alloc_mb']:.0f}MB net={rec['net_mb']:+.0f}MB ({rec['sec']:.1f}s)")
+        self._cur = None
+
+    def mark(self, stage: str):
+        """직전 단계를 닫고 stage 시작."""
+        if not self.enabled:
+            return
+        self._close()
+        self._tm.reset_peak()
+        self._base = self._tm.get_traced_memory()[0]
+        self._t0 = time.perf_counter()
+        self._cur = stage
+
+    def finish(self, path: Optional[str] = None) -> List[Dict]:
+        """마지막 단계를 닫고 (path가 있으면) JSON 저장."""
+        if not self.enabled:
+            return []
+        self._close()
+        self._tm.stop()
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({"peak_rss_mb": round(_peak_rss_mb(), 1), "stages": self.stages},
+                          f, ensure_ascii=False, indent=2)
+            print(f"[MEM] saved: {path}")
+        return self.stages
+
+
+class Profiler:
+    """단계(mark) + 중첩 스팬(span) 시간/메모리 기록기. 출력: profile.json"""
+
+    def __init__(self, enabled: bool = True, cprofile: bool = False,
+                 memory: Optional[MemoryReport] = None):
+        self.enabled = bool(enabled)
+        self.cprofile = bool(cprofile) and self.enabled
+        self.memory = memory
+        self.spans: List[Dict] = []
+        self._stack: List[str] = []
+        self._stage: Optional[Dict] = None
+        self._stage_prof = {}   # 단계 → cProfile.Profile
+        self._t_start = time.perf_counter()
+
+    def _open(self, name: str, label: Optional[str]) -> Dict:
+        return {"name": name, "label": label, "parent": "/".join(self._stack) or None,
+                "_t0": time.perf_counter(), "_c0": time.process_time(), "_p0": _peak_rss_mb()}
+
+    def _close(self, rec: Dict):
+        peak = _peak_rss_mb()
+        rec["wall_sec"] = round(time.perf_counter() - rec.pop("_t0"), 4)
+        rec["cpu_sec"] = round(time.process_time() - rec.pop("_c0"), 4)
+        rec["rss_mb"] = round(_rss_mb(), 1)
+        rec["peak_rss_mb"] = round(peak, 1)
+        rec["peak_growth_mb"] = round(peak - rec.pop("_p0"), 1)
+        self.spans.append(rec)
+
+    def _close_stage(self):
+        if self._stage is None:
+            return
+        name = self._stage["name"]
+        if name in self._stage_prof:
+            self._stage_prof[name].disable()
+        self._close(self._stage)
+        print(f"[PROF] {name:<14} wall={self._stage['wall_sec']:.2f}s cpu={self._stage['cpu_sec']:.2f}s "
+              f"rss={self._stage['rss_mb']:.0f}MB")
+        self._stage = None
+        self._stack = []
+
+    def mark(self, stage: str):
+        """직전 최상위 단계를 닫고 stage 시작."""
+        if self.memory is not None:
+            self.memory.mark(stage)
+        if not self.enabled:
+            return
+        self._close_stage()
+        self._stage = self._open(stage, None)
+        self._stack = [stage]
+        if self.cprofile:
+            import cProfile
+            self._stage_prof[stage] = cProfile.Profile()
+            self._stage_prof[stage].enable()
+
+    @contextmanager
+    def span(self, name: str, label: Optional[str] = None):
+        """현재 단계 안의 세부 구간(중첩 가능). label: 라벨별 집계용 키."""
+        if not self.enabled:
+            yield
+            return
+        rec = self._open(name, label)
+        self._stack.append(name if label is None else f"{name}[{label}]")
+        try:
+            yield
+        finally:
+            self._stack.pop()
+            self._close(rec)
+
+    def add(self, name: str, wall_sec: float, label: Optional[str] = None):
+        """외부에서 잰 시간(예: timings dict)을 스팬으로 추가."""
+        if self.enabled:
+            self.spans.append({"name": name, "label": label, "parent": "/".join(self._stack) or None,
+                               "wall_sec": round(float(wall_sec), 4)})
+
+    def summary(self) -> Dict:
+        stages = [s for s in self.spans if s["parent"] is None]
+        per_label: Dict[str, Dict[str, float]] = {}
+        for s in self.spans:
+            if s.get("label") is not None:
+                d = per_label.setdefault(s["label"], {})
+                d[s["name"]] = round(d.get(s["name"], 0.0) + s["wall_sec"], 4)
+        slowest = max(stages, key=lambda s: s["wall_sec"])["name"] if stages else None
+        return {"total_sec": round(time.perf_counter() - self._t_start, 3),
+                "peak_rss_mb": round(_peak_rss_mb(), 1),
+                "slowest_stage": slowest,
+                "stages": stages,
+                "per_label": per_label,
+                "spans": [s for s in self.spans if s["parent"] is not None]}
+
+    def finish(self, path: Optional[str] = None, top: int = 25) -> Dict:
+        """마지막 단계를 닫고 profile.json(+ cprofile 시 가장 느린 단계 .prof) 저장."""
+        if self.memory is not None:
+            self.memory.finish(os.path.join(os.path.dirname(path) or ".", "memory_report.json")
+                               if (path and self.memory.enabled) else None)
+        if not self.enabled:
+            return {}
+        self._close_stage()
+        out = self.summary()
+        slowest = out["slowest_stage"]
+        if self.cprofile and slowest in self._stage_prof and path:
+            import pstats, io
+            prof_path = os.path.join(os.path.dirname(path) or ".", f"profile_{slowest}.prof")
+            self._stage_prof[slowest].dump_stats(prof_path)
+            buf = io.StringIO()
+            pstats.Stats(self._stage_prof[slowest], stream=buf).sort_stats("cumulative").print_stats(top)
+            print(buf.getvalue())
+            out["cprofile"] = os.path.basename(prof_path)
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(out, f, ensure_ascii=False, indent=2)
+            print(f"[PROF] saved: {path} (slowest={slowest})")
+        return out
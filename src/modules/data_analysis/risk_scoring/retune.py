@@ -0,0 +1,203 @@
+# retune.py
+# -*- coding: utf-8 -*-
+"""
+임계값/비용 재튜닝: 학습 때 저장한 보정 점수(label_scores.parquet)만으로 재계산 (피처/모델 학습 없음)
+- label_scores.parquet: 라벨별 임계값 기준세트(cal, 부족하면 train) + Test 구간의 보정 확률
+  컬럼 label/split(사전 인코딩), y(int8), score(float64), persona(int16: persona_p* 최대값 열)
+- 재계산: thresholds.json, metrics.csv(thr/PR_AUC/Recall/F1, 스킵 라벨 행은 그대로),
+  thresholds_by_persona.json(--by_persona 또는 이미 있으면), meta.json의 임계값 설정 키
+- 전략 선택은 train_pipeline.select_threshold 그대로 → 같은 설정이면 학습 결과와 같은 임계값
+- 지정하지 않은 옵션은 meta.json(학습 때 설정)을 따름
+
+사용 예:
+    python -m data_analysis.risk_scoring.retune --artifacts artifacts --cost_fn 10 \
+        --label_cost_map "LBL_CARE:6" --by_persona
+"""
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+import os, json, time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .train_pipeline import select_threshold, test_metrics, parse_label_map
+
+SCORES_FILE = "label_scores.parquet"
+MIN_PERSONA_POS = 20   # 페르소나별 임계값: 기준세트 양성 수 하한(미달이면 _global)
+
+
+def save_label_scores(out_dir: str, records: Sequence[tuple]) -> Optional[str]:
+    """records: [(label, split, y, score, persona), ...] → out_dir/label_scores.parquet"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    path = Path(out_dir) / SCORES_FILE
+    records = [r for r in records if len(r[2])]
+    if not records:
+        if path.exists():
+            path.unlink()   # 이전 학습의 캐시가 새 산출물과 어긋나지 않도록
+        return None
+    lens = [len(r[2]) for r in records]
+    labels = sorted({r[0] for r in records})
+    splits = ["cal", "train", "test"]
+    lab_code = np.repeat([labels.index(r[0]) for r in records], lens).astype(np.int32)
+    spl_code = np.repeat([splits.index(r[1]) for r in records], lens).astype(np.int32)
+    tbl = pa.table({
+        "label": pa.DictionaryArray.from_arrays(lab_code, pa.array(labels)),
+        "split": pa.DictionaryArray.from_arrays(spl_code, pa.array(splits)),
+        "y": pa.array(np.concatenate([np.asarray(r[2]) for r in records]).astype(np.int8)),
+        "score": pa.array(np.concatenate([np.asarray(r[3], dtype=float) for r in records])),
+        "persona": pa.array(np.concatenate([np.asarray(r[4]) for r in records]).astype(np.int16)),
+    })
+    pq.write_table(tbl, str(path), compression="zstd")
+    print(f"[SCORES] {path}: {tbl.num_rows:,} rows, labels={len(labels)}")
+    return str(path)
+
+
+def load_label_scores(art_dir: str) -> Dict[str, Dict[str, Dict[str, np.ndarray]]]:
+    """label_scores.parquet → {label: {split: {"y", "score", "persona"}}}"""
+    import pyarrow.parquet as pq
+    path = Path(art_dir) / SCORES_FILE
+    if not path.exists():
+        raise FileNotFoundError(f"{path} 없음 — 이 기능 이전의 산출물이면 train_pipeline을 한 번 다시 실행")
+    df = pq.read_table(str(path)).to_pandas()
+    out: Dict[str, Dict[str, Dict[str, np.ndarray]]] = {}
+    for (lbl, split), g in df.groupby(["label", "split"], observed=True, sort=False):
+        out.setdefault(str(lbl), {})[str(split)] = {
+            "y": g["y"].to_numpy(dtype=int), "score": g["score"].to_numpy(dtype=float),
+            "persona": g["persona"].to_numpy(dtype=np.int64)}
+    return out
+
+
+def persona_thresholds(lbl: str, base: Dict[str, np.ndarray], thr_global: float,
+                       min_pos: int = MIN_PERSONA_POS, **strategy) -> Dict[str, float]:
+    """기준세트를 지배 페르소나별로 나눠 같은 전략으로 임계값. 양성 부족/단일 클래스면 _global 사용."""
+    table = {"_global": float(thr_global)}
+    y, p, code = base["y"], base["score"], base["persona"]
+    for k in np.unique(code):
+        m = code == k
+        n_pos = int(y[m].sum())
+        if n_pos < min_pos or n_pos == int(m.sum()):
+            continue
+        thr, _, _ = select_threshold(lbl, y[m], p[m], **strategy)
+        table[f"persona_{int(k)}"] = float(thr)
+    return table
+
+
+def _write_json(path: Path, obj) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def retune(art_dir: str,
+           cost_fn: Optional[float] = None,
+           cost_fp: Optional[float] = None,
+           thr_strategy: Optional[str] = None,
+           target_prec: Optional[float] = None,
+           label_cost_map: Optional[Dict[str, float]] = None,
+           prec_labels: Optional[set] = None,
+           per_label_target_map: Optional[Dict[str, float]] = None,
+           by_persona: Optional[bool] = None,
+           min_persona_pos: int = MIN_PERSONA_POS) -> pd.DataFrame:
+    """
+    캐시된 보정 점수로 임계값/지표 재계산 후 산출물 갱신. None인 설정은 meta.json 값 사용.
+    by_persona: True → thresholds_by_persona.json 작성, None → 이미 있을 때만 재계산, False → 건드리지 않음
+    returns: 갱신된 metrics DataFrame
+    """
+    t0 = time.perf_counter()
+    art = Path(art_dir)
+    with open(art / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    strategy = {
+        "thr_strategy": thr_strategy or meta.get("threshold_strategy", "cost"),
+        "cost_fn": float(cost_fn if cost_fn is not None else meta.get("cost_fn_default", 20.0)),
+        "cost_fp": float(cost_fp if cost_fp is not None else meta.get("cost_fp", 1.0)),
+        "target_prec": float(target_prec if target_prec is not None else meta.get("target_precision", 0.6)),
+        "label_cost_map": label_cost_map if label_cost_map is not None else (meta.get("label_cost_map") or {}),
+        "prec_labels": set(prec_labels if prec_labels is not None else (meta.get("prec_labels") or [])),
+        "per_label_target_map": (per_label_target_map if per_label_target_map is not None
+                                 else (meta.get("per_label_target") or {})),
+    }
+    persona_path = art / "thresholds_by_persona.json"
+    if by_persona is None:
+        by_persona = persona_path.exists()
+
+    scores = load_label_scores(art_dir)
+    thresholds: Dict[str, float] = {}
+    by_persona_map: Dict[str, Dict[str, float]] = {}
+    updates: Dict[str, Dict] = {}
+    for lbl in sorted(scores):
+        splits = scores[lbl]
+        base_name = "cal" if "cal" in splits else "train"
+        base = splits[base_name]
+        thr, thr_used, cmsg = select_threshold(lbl, base["y"], base["score"], **strategy)
+        thresholds[lbl] = float(thr)
+        te = splits.get("test", {"y": np.array([], dtype=int), "score": np.array([])})
+        pr_auc, rec, f1 = test_metrics(te["y"], te["score"], thr)
+        updates[lbl] = {"thr": float(thr), "PR_AUC_test": float(pr_auc), "Recall@thr": float(rec),
+                        "F1@thr": float(f1)}
+        if by_persona:
+            by_persona_map[lbl] = persona_thresholds(lbl, base, thr, min_pos=min_persona_pos, **strategy)
+        print(f"[RETUNE] {lbl}: strategy={thr_used}, base={base_name}, thr={thr:0.3f}, {cmsg}, "
+              f"Recall@thr={rec:0.3f}, F1@thr={f1:0.3f}")
+
+    # metrics.csv: 캐시된 라벨 행만 갱신(스킵 라벨 행/카운트 컬럼은 그대로)
+    metrics_path = art / "metrics.csv"
+    old = pd.read_csv(metrics_path, encoding="utf-8-sig") if metrics_path.exists() else pd.DataFrame({"label": []})
+    rows: List[Dict] = old.to_dict("records")
+    seen = {r["label"] for r in rows}
+    for r in rows:
+        r.update(updates.get(r["label"], {}))
+    rows += [dict(label=lbl, **u) for lbl, u in updates.items() if lbl not in seen]
+    metrics_df = pd.DataFrame(rows).sort_values("PR_AUC_test", ascending=False, na_position="last")
+    metrics_df.to_csv(metrics_path, index=False, encoding="utf-8-sig")
+
+    _write_json(art / "thresholds.json", thresholds)
+    if by_persona:
+        _write_json(persona_path, by_persona_map)
+    meta.update({
+        "cost_fn_default": strategy["cost_fn"],
+        "cost_fp": strategy["cost_fp"],
+        "threshold_strategy": strategy["thr_strategy"],
+        "target_precision": strategy["target_prec"],
+        "label_cost_map": strategy["label_cost_map"],
+        "prec_labels": sorted(strategy["prec_labels"]),
+        "per_label_target": strategy["per_label_target_map"],
+        "retuned_at": datetime.now().isoformat(),
+    })
+    _write_json(art / "meta.json", meta)
+    print(f"[RETUNE] {art}: labels={len(thresholds)}, by_persona={bool(by_persona)}, "
+          f"{time.perf_counter() - t0:.2f}s")
+    return metrics_df
+
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="캐시된 보정 점수로 임계값/지표 재튜닝 (지정 안 한 옵션은 meta.json 값)")
+    ap.add_argument("--artifacts", required=True, help="train_pipeline 산출물 폴더")
+    ap.add_argument("--cost_fn", type=float, default=None)
+    ap.add_argument("--cost_fp", type=float, default=None)
+    ap.add_argument("--thr_strategy", choices=["cost", "f1", "rec_at_prec"], default=None)
+    ap.add_argument("--target", type=float, default=None, help="rec_at_prec 목표 precision")
+    ap.add_argument("--label_cost_map", default=None, help='예: "LBL_CARE:6,LBL_LIVELIHOOD:25"')
+    ap.add_argument("--prec_labels", default=None, help="rec_at_prec을 적용할 라벨 콤마리스트")
+    ap.add_argument("--per_label_target", default=None, help='예: "LBL_LIVELIHOOD:0.70,LBL_HOUSING:0.75"')
+    ap.add_argument("--by_persona", action="store_true",
+                    help="thresholds_by_persona.json 작성(기본: 이미 있을 때만 재계산)")
+    ap.add_argument("--min_persona_pos", type=int, default=MIN_PERSONA_POS,
+                    help="페르소나별 임계값 최소 양성 수(미달이면 _global)")
+    args = ap.parse_args()
+
+    m = retune(
+        args.artifacts,
+        cost_fn=args.cost_fn, cost_fp=args.cost_fp,
+        thr_strategy=args.thr_strategy, target_prec=args.target,
+        label_cost_map=None if args.label_cost_map is None else parse_label_map(args.label_cost_map),
+        prec_labels=None if args.prec_labels is None else {s.strip() for s in args.prec_labels.split(",") if s.strip()},
+        per_label_target_map=None if args.per_label_target is None else parse_label_map(args.per_label_target),
+        by_persona=True if args.by_persona else None,
+        min_persona_pos=args.min_persona_pos,
+    )
+    print(m.head(20))
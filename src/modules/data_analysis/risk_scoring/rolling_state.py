@@ -0,0 +1,186 @@
+# rolling_state.py
+# -*- coding: utf-8 -*-
+"""
+월 증분 채점용 롤링 상태 (predict_persona --state)
+- Δ3m/Trend12m은 '월평균(_std) 테이블'의 롤링 차이 → 최근 12개월 월평균만 있으면 새 달 계산 가능
+- _std는 월 내부 통계(log1p → 중앙값/IQR)만 쓰므로 새 달 행만으로 계산 가능
+- 따라서 매달 새 달 행만 넣고 상태를 갱신하면 이력 길이와 무관하게 실행 시간이 일정
+
+엔티티: 현재 Δ/Trend는 개인 ID가 아닌 월평균 기반(ensure_delta3m/ensure_trend12m) → 상태도 월 단위 집계
+
+저장 구조 (<state_dir>/):
+    month_means.parquet      year_month + 기준 _std 컬럼 월평균 (최근 HISTORY_MONTHS개월)
+    month_baselines.parquet  year_month, column, median, iqr, std, scale, n  (log1p 공간 표준화 기준값)
+    state.json               버전, 기준 컬럼, 마지막 월, 갱신 시각
+
+사용 예:
+    state = RollingState("pred_state")
+    df_std = state.update(df_new_month)   # _std + Δ/Trend 포함, 상태 갱신(메모리)
+    ...채점...
+    state.save()                          # 채점 성공 후 저장
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os, json
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .train_pipeline import (
+    ensure_year_month,
+    ensure_all_standardized_features,
+    month_rolling_diff,
+    DERIVED_WINDOWS,
+)
+
+STATE_VERSION = 1
+MONTH_COL = "year_month"
+# 가장 긴 파생(창 w: 현재 w개월 - 직전 w개월)에 필요한 월 수
+HISTORY_MONTHS = 2 * max(w for _, w in DERIVED_WINDOWS)
+
+
+def month_baselines(df: pd.DataFrame, std_cols: List[str], month_col: str = MONTH_COL) -> pd.DataFrame:
+    """
+    ensure_all_standardized_features와 같은 월별 표준화 기준값(log1p 공간).
+    scale = IQR(>0) → 표준편차 → 1.0 순 폴백. 원천 컬럼이 없는 *_std(원천에 이미 표준화됨)는 제외.
+    """
+    rows = []
+    for sc in std_cols:
+        col = sc[: -len("_std")]
+        if col not in df.columns or not pd.api.types.is_numeric_dtype(df[col]):
+            continue
+        x = np.log1p(pd.to_numeric(df[col], errors="coerce").astype(np.float64).clip(lower=0))
+        g = x.groupby(df[month_col])
+        b = pd.DataFrame({
+            "median": g.median(),
+            # 배치 표준화와 비트 단위로 같도록 같은 Series.quantile 경로 사용
+            "iqr": g.agg(lambda v: v.quantile(0.75) - v.quantile(0.25)),
+            "std": g.std(),
+            "n": g.count(),
+        })
+        scale = b["iqr"].where(b["iqr"] > 0, b["std"]).fillna(1.0)
+        b["scale"] = scale.where(scale > 0, 1.0)
+        b["column"] = col
+        rows.append(b.rename_axis(month_col).reset_index())
+    if not rows:
+        return pd.DataFrame(columns=[month_col, "column", "median", "iqr", "std", "scale", "n"])
+    return pd.concat(rows, ignore_index=True)[[month_col, "column", "median", "iqr", "std", "scale", "n"]]
+
+
+class RollingState:
+    """최근 월평균/표준화 기준값 상태. 디렉터리가 없으면 빈 상태(첫 실행 = 전체 이력으로 시드)."""
+
+    def __init__(self, state_dir: str):
+        self.dir = Path(state_dir)
+        self.means_path = self.dir / "month_means.parquet"
+        self.baselines_path = self.dir / "month_baselines.parquet"
+        self.info_path = self.dir / "state.json"
+        self.means = pd.DataFrame()
+        self.baselines = pd.DataFrame()
+        self.info: Dict = {}
+        if self.info_path.exists():
+            self.load()
+
+    # ---------------------------
+    # 입출력
+    # ---------------------------
+    def exists(self) -> bool:
+        return bool(self.info)
+
+    def load(self):
+        with open(self.info_path, "r", encoding="utf-8") as f:
+            self.info = json.load(f)
+        if self.info.get("version") != STATE_VERSION:
+            raise ValueError(f"rolling state version mismatch: {self.info.get('version')} != {STATE_VERSION}")
+        self.means = pd.read_parquet(self.means_path)
+        self.baselines = pd.read_parquet(self.baselines_path) if self.baselines_path.exists() else pd.DataFrame()
+        return self
+
+    def save(self):
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.means.to_parquet(self.means_path, index=False)
+        self.baselines.to_parquet(self.baselines_path, index=False)
+        tmp = self.info_path.with_suffix(".json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.info, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.info_path)
+        print(f"[STATE] saved: {self.dir} (last_month={self.info.get('last_month')}, "
+              f"months={len(self.means)})")
+
+    def last_month(self) -> Optional[pd.Timestamp]:
+        m = self.info.get("last_month")
+        return pd.Timestamp(m) if m else None
+
+    # ---------------------------
+    # 갱신
+    # ---------------------------
+    def update(self, df_raw: pd.DataFrame,
+               std_cols: Optional[List[str]] = None,
+               derived_cols: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        새 달 원천 행 → _std + Δ/Trend 파생을 붙여 반환하고 상태를 갱신(저장은 save()).
+        - 마지막 월보다 이전 월 행은 버림(이미 상태에 반영됨), 마지막 월과 같은 달은 재계산으로 교체
+        - 빈 상태면 입력 전체가 이력 → 전체 재계산과 동일 결과로 시드
+        - std_cols/derived_cols: ensure_all_standardized_features와 동일(피처 플랜 closure)
+        """
+        df = ensure_year_month(df_raw.copy())
+        last = self.last_month()
+        if last is not None:
+            old = df[MONTH_COL] < last
+            if old.any():
+                print(f"[STATE] drop {int(old.sum())} rows older than last_month={last.date()}")
+                df = df.loc[~old]
+        if df.empty:
+            raise ValueError("no rows to score after rolling-state month filter")
+
+        std = ensure_all_standardized_features(df, month_col=MONTH_COL, derive=False, std_cols=std_cols)
+
+        # 기준 컬럼: 시드 시 확정(파생이 필요한 _std만), 이후 고정
+        base_cols = self.info.get("base_cols")
+        if base_cols is None:
+            base_cols = [c for c in std.columns if isinstance(c, str) and c.endswith("_std")]
+            if derived_cols is not None:
+                want = set(derived_cols)
+                base_cols = [c for c in base_cols if any(c + suf in want for suf, _ in DERIVED_WINDOWS)]
+        missing = [c for c in base_cols if c not in std.columns]
+        if missing:
+            raise ValueError(f"rolling state base columns missing in input: {missing[:5]}")
+
+        new_means = std.groupby(MONTH_COL, as_index=False)[base_cols].mean()
+        new_months = set(new_means[MONTH_COL])
+        means = self.means
+        if not means.empty:
+            means = means[~means[MONTH_COL].isin(new_months)]
+        means = pd.concat([means, new_means], ignore_index=True).sort_values(MONTH_COL).reset_index(drop=True)
+
+        # 월 상수 파생 → 월로 매핑(행 순서/인덱스 유지)
+        derived = means[[MONTH_COL]].copy()
+        for suffix, window in DERIVED_WINDOWS:
+            derived = derived.join(month_rolling_diff(means, base_cols, window, suffix))
+        derived = derived.set_index(MONTH_COL)
+        out_cols = [c for c in derived.columns if derived_cols is None or c in set(derived_cols)]
+        for c in out_cols:
+            std[c] = std[MONTH_COL].map(derived[c])
+
+        # 표준화 기준값 (월별)
+        base = month_baselines(std, [c for c in std.columns if isinstance(c, str) and c.endswith("_std")])
+        baselines = self.baselines
+        if not baselines.empty:
+            baselines = baselines[~baselines[MONTH_COL].isin(new_months)]
+        baselines = pd.concat([baselines, base], ignore_index=True)
+
+        keep = means[MONTH_COL].iloc[-HISTORY_MONTHS:]
+        self.means = means[means[MONTH_COL].isin(keep)].reset_index(drop=True)
+        self.baselines = baselines[baselines[MONTH_COL].isin(keep)].sort_values([MONTH_COL, "column"]).reset_index(drop=True)
+        self.info = {
+            "version": STATE_VERSION,
+            "base_cols": base_cols,
+            "history_months": HISTORY_MONTHS,
+            "last_month": str(self.means[MONTH_COL].max().date()),
+            "months": [str(pd.Timestamp(m).date()) for m in self.means[MONTH_COL]],
+            "updated_at": datetime.now().isoformat(),
+        }
+        ms = sorted(str(pd.Timestamp(m).date()) for m in new_months)
+        print(f"[STATE] scored months={ms[0]}..{ms[-1]} ({len(ms)}), rows={len(std)}, base_cols={len(base_cols)}")
+        return std
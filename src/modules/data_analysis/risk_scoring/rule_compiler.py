@@ -0,0 +1,231 @@
+# rule_compiler.py
+# -*- coding: utf-8 -*-
+"""
+apply_rule_hybrid 규칙 컴파일러 (rules.yml 'hybrid' 섹션)
+- 컬럼 해석: 컬럼 카탈로그(column_catalog)에서 신호 이름별 1회 — _col과 같은 규칙(정확 일치 → 이름을 포함하는 첫 컬럼)
+- 변환 중복 제거: 같은 컬럼의 월별 백분위 순위/강건 z는 라벨이 여럿이어도 1회만 계산
+- 점수: (행 × 라벨) 행렬에 슬롯(라벨 내 신호 순번)별 마스크×가중치를 한 번에 누적
+  → 라벨별 합산 순서가 기존 루프와 같아 컷 경계(≥)에서도 결과가 동일
+- 사유: 문자열 대신 라벨별 정수 비트마스크(<LBL>_reason_mask)
+  비트 순서 = [게이트] + 신호(rules.yml 순서), 코드표는 reason_code_table → meta.json "reason_codes"
+  사람이 읽을 문자열은 표시/내보내기 시점에 decode_reasons로 필요한 행만 복원
+
+사용 예:
+    compiled = compile_hybrid_rules(load_hybrid_rules("rules.yml")["labels"], df.columns)
+    out = evaluate_hybrid_rules(compiled, df, month_col="year_month")
+    text = decode_reasons(out["LBL_CARE_reason_mask"], reason_code_table(spec)["LBL_CARE"])
+"""
+from typing import Dict, List, Optional, Sequence
+import operator, time
+
+import numpy as np
+import pandas as pd
+
+from .label_rules import _robust_z_by_month, _age_to_num
+from .column_catalog import catalog_for
+
+_OPS = {">=": operator.ge, ">": operator.gt, "<=": operator.le, "<": operator.lt,
+        "==": operator.eq, "!=": operator.ne}
+_TRANSFORMS = {"age_num": _age_to_num}
+
+
+class ColumnResolver:
+    """_col/_col_sfx와 같은 해석 (column_catalog의 프레임별 카탈로그 조회). resolved: 이름 → 컬럼 기록."""
+
+    def __init__(self, columns: Sequence, known: Optional[Dict] = None):
+        self.catalog = catalog_for(columns)
+        self.exact = self.catalog.exact
+        self.resolved: Dict[str, Optional[str]] = {} if known is None else known
+
+    def resolve(self, name) -> Optional[str]:
+        return self.catalog.first(name, self.resolved)
+
+    def resolve_sfx(self, name, sfx: str) -> Optional[str]:
+        return self.catalog.with_suffix(name, sfx, self.resolved)
+
+
+def delta_z_sources(spec: Dict, columns: Sequence) -> List[str]:
+    """delta_z 신호의 원천 컬럼(‹col›_delta3m이 먼저 만들어져야 하는 컬럼)."""
+    r = ColumnResolver(columns)
+    cols = []
+    for cfg in spec.values():
+        for s in cfg.get("signals") or []:
+            if s["mode"] == "delta_z":
+                c = r.resolve(s.get("col"))
+                if c and c not in cols:
+                    cols.append(c)
+    return cols
+
+
+def reason_code_table(spec: Dict) -> Dict[str, List[str]]:
+    """라벨 → 비트별 사유 설명 (bit i = 리스트 i번째). 컬럼 가용성과 무관하게 규칙 정의만으로 고정."""
+    table = {}
+    for lbl, cfg in spec.items():
+        descs = [cfg["gate"].get("desc", "")] if cfg.get("gate") is not None else []
+        descs += [s.get("desc", "") for s in cfg.get("signals") or []]
+        table[lbl] = descs
+    return table
+
+
+def _mask_dtype(n_bits: int):
+    for dt in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if n_bits <= np.iinfo(dt).bits:
+            return dt
+    raise ValueError(f"too many reason bits: {n_bits} (max 64)")
+
+
+def decode_reasons(mask, descs: Sequence[str], sep: str = "; ") -> pd.Series:
+    """
+    비트마스크 → 사유 문자열 ('a; b', 사유 없으면 NaN). 기존 <LBL>_reasons와 같은 형식.
+    고유 마스크 값만 디코드 후 펼치므로 표시할 행만 넘기면 된다.
+    """
+    m = mask if isinstance(mask, pd.Series) else pd.Series(np.asarray(mask))
+    codes, uniq = pd.factorize(m)
+    texts = []
+    for v in uniq:
+        v = int(v)
+        parts = [d for b, d in enumerate(descs) if (v >> b) & 1]
+        texts.append(sep.join(parts) if parts else np.nan)
+    vals = np.array(texts + [np.nan], dtype=object)
+    return pd.Series(vals[codes], index=m.index, dtype=object)
+
+
+def compile_hybrid_rules(spec: Dict, columns: Sequence, z_thr: float = 1.64,
+                         resolution: Optional[Dict] = None) -> Dict:
+    """
+    spec: rules.yml 'hybrid' (라벨 → cut/req_frac/signals/gate)
+    resolution: 신호 이름 → 컬럼 매핑(dict). 있는 이름은 그대로 쓰고 새로 해석한 것은 기록
+    returns: {"labels", "transforms", "masks", "slots", "avail_w", "gates", "cut_frac", "columns"}
+      transforms: key → (kind, 컬럼)          kind: rank | robust_z
+      masks:      key → (transform key, side, 임계)
+      slots[i]:   라벨 i의 [(mask key | None, w, desc), ...]  (None = 사용 불가 신호)
+      reason_bits[i]: 라벨 i의 비트 수 (게이트 1 + 신호 수, reason_code_table과 같은 순서)
+      columns:    신호 이름 → 해석된 컬럼(None = 없음)
+    """
+    r = ColumnResolver(columns, resolution)
+    transforms: Dict[str, tuple] = {}
+    masks: Dict[str, tuple] = {}
+    labels, slots, avail_w, gates, cut_frac, reason_bits = [], [], [], [], [], []
+
+    for lbl, cfg in spec.items():
+        lbl_slots = []
+        aw = 0.0
+        for s in cfg.get("signals") or []:
+            w = float(s.get("w", 0.0))
+            if s["mode"] == "qscore":
+                col = r.resolve_sfx(s.get("col"), s["sfx"]) if s.get("sfx") else r.resolve(s.get("col"))
+                if not col:
+                    lbl_slots.append((None, w, s.get("desc", "")))
+                    continue
+                tkey = f"rank:{col}"
+                transforms[tkey] = ("rank", col)
+                thr = float(s["q"])
+            else:  # delta_z
+                col = r.resolve(s.get("col"))
+                if not (col and (col + "_delta3m") in r.exact):
+                    lbl_slots.append((None, w, s.get("desc", "")))
+                    continue
+                tkey = f"z:{col}_delta3m"
+                transforms[tkey] = ("robust_z", col + "_delta3m")
+                thr = float(z_thr)
+            mkey = f"{tkey}|{s['side']}|{thr}"
+            masks[mkey] = (tkey, s["side"], thr)
+            lbl_slots.append((mkey, w, s.get("desc", "")))
+            aw += w     # 기존 루프와 같은 순서로 가용 가중치 누적
+
+        gate = cfg.get("gate")
+        if gate is not None:
+            gate = {**gate, "col": r.resolve(gate.get("col"))}
+        labels.append(lbl)
+        slots.append(lbl_slots)
+        avail_w.append(aw)
+        gates.append(gate)
+        cut_frac.append(float(cfg.get("cut", 1.0)) * float(cfg.get("req_frac", 0.6)))
+        reason_bits.append(int(gate is not None) + len(lbl_slots))
+
+    return {"labels": labels, "transforms": transforms, "masks": masks, "slots": slots,
+            "avail_w": avail_w, "gates": gates, "cut_frac": cut_frac, "reason_bits": reason_bits,
+            "columns": r.resolved}
+
+
+def _gate_mask(out: pd.DataFrame, gate: Dict) -> pd.Series:
+    col = gate.get("col")
+    if col is None:
+        expr = pd.Series(False, index=out.index)
+    else:
+        x = out[col]
+        if gate.get("transform"):
+            x = _TRANSFORMS[gate["transform"]](x)
+        expr = _OPS[gate["op"]](x, gate["value"])
+    return expr.fillna(False) if gate.get("hard_and", True) else expr.fillna(True)
+
+
+def evaluate_hybrid_rules(compiled: Dict, out: pd.DataFrame, month_col: str = "year_month",
+                          timings: Optional[Dict[str, float]] = None) -> pd.DataFrame:
+    """컴파일된 규칙으로 <LBL>_score / <LBL>_reason_mask / <LBL> 컬럼을 out에 직접 붙여 반환."""
+    n, labels = len(out), compiled["labels"]
+    timings = {} if timings is None else timings
+    month = out[month_col]
+
+    # 1) 공유 변환: 컬럼별 1회
+    t0 = time.perf_counter()
+    tvals: Dict[str, pd.Series] = {}
+    for tkey, (kind, col) in compiled["transforms"].items():
+        if kind == "rank":
+            tvals[tkey] = out[col].groupby(month).rank(pct=True, na_option="keep")
+        else:
+            tvals[tkey] = _robust_z_by_month(out[col], month)
+    mvals: Dict[str, np.ndarray] = {}
+    for mkey, (tkey, side, thr) in compiled["masks"].items():
+        v = tvals[tkey]
+        if tkey.startswith("rank:"):
+            m = (v >= thr) if side == "ge" else (v <= thr)
+        else:
+            m = (v >= thr) if side == "ge" else (v <= -thr)
+        mvals[mkey] = m.to_numpy(dtype=bool)
+    timings["_transforms"] = time.perf_counter() - t0
+
+    # 2) 점수: (n × L) 행렬에 게이트 → 슬롯 순서로 누적 (라벨별 합산 순서 = 기존 루프)
+    t0 = time.perf_counter()
+    S = np.zeros((n, len(labels)))
+    G = np.ones((n, len(labels)), dtype=bool)
+    gate_w = np.zeros(len(labels))
+    for i, gate in enumerate(compiled["gates"]):
+        if gate is not None:
+            G[:, i] = _gate_mask(out, gate).to_numpy(dtype=bool)
+            gate_w[i] = float(gate.get("w", 0.0))
+    S += np.where(G, gate_w[None, :], 0.0)
+    zeros = np.zeros(n, dtype=bool)
+    for j in range(max((len(s) for s in compiled["slots"]), default=0)):
+        M = np.column_stack([mvals[s[j][0]] if j < len(s) and s[j][0] else zeros for s in compiled["slots"]])
+        W = np.array([s[j][1] if j < len(s) and s[j][0] else 0.0 for s in compiled["slots"]])
+        S += np.where(M, W[None, :], 0.0)
+    thr = np.asarray(compiled["cut_frac"])[None, :] * (np.asarray(compiled["avail_w"])[None, :] + gate_w[None, :] * G)
+    Y = G & (S >= thr)
+    timings["_score"] = time.perf_counter() - t0
+
+    # 3) 라벨별 사유 비트마스크 + 출력 컬럼
+    new_cols = {}
+    for i, lbl in enumerate(labels):
+        t0 = time.perf_counter()
+        dt = _mask_dtype(compiled["reason_bits"][i])
+        mask = np.zeros(n, dtype=dt)
+        bit = 0
+        if compiled["gates"][i] is not None:
+            mask |= G[:, i].astype(dt)
+            bit += 1
+        for mkey, _, _ in compiled["slots"][i]:
+            if mkey:
+                mask |= mvals[mkey].astype(dt) << dt(bit)
+            bit += 1
+        new_cols[lbl + "_score"] = S[:, i]
+        new_cols[lbl + "_reason_mask"] = mask
+        new_cols[lbl] = Y[:, i]
+        timings[lbl] = time.perf_counter() - t0
+
+    for c, v in new_cols.items():   # 제자리 추가(프레임 전체 복사 없음)
+        out[c] = v
+    print(f"[RULES] transforms={len(compiled['transforms'])} ({timings['_transforms']:.3f}s), "
+          f"score={timings['_score']:.3f}s | " +
+          ", ".join(f"{lbl}={timings[lbl]:.3f}s" for lbl in labels))
+    return out
@@ -25,3 +25,25 @@ def load_rules(path="rules.yml", require_targets=True):
 
 def rules_version(meta: dict) -> str:
     return f'{meta.get("version","na")}#{meta.get("_hash","----")}'
+
+HYBRID_MODES = ("qscore", "delta_z")
+HYBRID_OPS = (">=", ">", "<=", "<", "==", "!=")
+
+def load_hybrid_rules(path="rules.yml"):
+    """rules.yml의 'hybrid' 섹션(apply_rule_hybrid 규칙) 로드 + 최소 검증."""
+    data = load_rules(path, require_targets=False)
+    hybrid = data.get("hybrid")
+    if not isinstance(hybrid, dict) or not hybrid:
+        raise RulesError(f"'hybrid' section is required: {data['_path']}")
+    for lbl, cfg in hybrid.items():
+        for s in cfg.get("signals") or []:
+            if s.get("mode") not in HYBRID_MODES:
+                raise RulesError(f"{lbl}: unknown signal mode {s.get('mode')!r}")
+            if s.get("side") not in ("ge", "le"):
+                raise RulesError(f"{lbl}: side must be 'ge' or 'le'")
+            if s["mode"] == "qscore" and "q" not in s:
+                raise RulesError(f"{lbl}: qscore signal needs 'q'")
+        gate = cfg.get("gate")
+        if gate is not None and gate.get("op") not in HYBRID_OPS:
+            raise RulesError(f"{lbl}: unknown gate op {gate.get('op')!r}")
+    return {"labels": hybrid, "_hash": data["_hash"], "_path": data["_path"]}
@@ -0,0 +1,378 @@
+# scoring_service.py
+# -*- coding: utf-8 -*-
+"""
+상주 위험 스코어링 서비스 (FastAPI)
+- 산출물(meta/thresholds/model_*.joblib)을 기동 시 1회 로드 → 버전별 레지스트리에 보관
+- /models/reload: 새 산출물 폴더를 요청 경로 밖(스레드풀)에서 로드한 뒤 잠금 하에 원자적 교체
+- /score: Arrow IPC(stream/file) 또는 Parquet 본문으로 배치 채점 → 같은 형식(또는 JSON)으로 응답
+- /score/online: JSON 단건/소배치 → 저장된 월 기준값으로 O(피처) 채점 (online_scorer)
+- /metrics: 라벨별 추론 지연(Prometheus 텍스트)
+
+실행 (src/modules 에서):
+    RISK_ARTIFACTS_DIR=artifacts RISK_CENTERS_PATH=project/cluster_centers.csv \\
+    python -m data_analysis.risk_scoring.scoring_service --port 8010
+
+요청 예:
+    curl -X POST localhost:8010/score -H "Content-Type: application/vnd.apache.parquet" \\
+         --data-binary @month.parquet -o scored.parquet
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os, time, hashlib, threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .persona_soft import load_centers
+from .online_scorer import OnlineScorer, BASELINES_FILE, DERIVED_FILE
+from .predict_persona import (
+    load_artifacts,
+    prepare_features_for_inference,
+    predict_scores_and_labels,
+)
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+PARQUET = "application/vnd.apache.parquet"
+# 지연 히스토그램 버킷(초)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+# ---------------------------
+# 모델 레지스트리
+# ---------------------------
+def _file_sig(p: Path) -> str:
+    if not p.exists():
+        return f"{p}:missing"
+    st = p.stat()
+    return f"{p.resolve()}:{st.st_size}:{st.st_mtime_ns}"
+
+
+def _artifacts_version(artifacts_dir: str, centers_path: Optional[str] = None,
+                       lookup_dirs: Optional[List[str]] = None) -> str:
+    """
+    meta/thresholds 내용 + 모델 파일 크기/수정시각 + 센터/월 룩업 파일 서명 해시 → 버전 ID.
+    같은 산출물이라도 센터·룩업이 다르면 다른 버전(캐시된 번들 재사용 안 함).
+    """
+    art = Path(artifacts_dir)
+    h = hashlib.sha256()
+    for name in ["meta.json", "thresholds.json", "thresholds_by_persona.json"]:
+        p = art / name
+        if p.exists():
+            h.update(p.read_bytes())
+    for p in sorted(art.glob("model_*.joblib")):
+        st = p.stat()
+        h.update(f"{p.name}:{st.st_size}:{st.st_mtime_ns}".encode())
+    h.update(f"centers={_file_sig(Path(centers_path)) if centers_path else None}".encode())
+    for d in [art] + [Path(d) for d in (lookup_dirs or [])]:
+        for name in (BASELINES_FILE, DERIVED_FILE):
+            h.update(f"lookup={_file_sig(d / name)}".encode())
+    return h.hexdigest()[:12]
+
+
+class ModelRegistry:
+    """
+    버전별 번들 보관 + 현재 버전 포인터.
+    로드는 잠금 밖에서, 교체만 잠금 안에서 → 채점 요청은 항상 완성된 번들만 봄.
+    """
+
+    def __init__(self, keep: int = 2, lookup_dirs: Optional[List[str]] = None):
+        self.keep = keep
+        self.lookup_dirs = list(lookup_dirs or [])
+        self._lock = threading.Lock()
+        self._bundles: Dict[str, dict] = {}
+        self._order: List[str] = []
+        self._current: Optional[str] = None
+
+    def load(self, artifacts_dir: str, centers_path: Optional[str] = None, activate: bool = True) -> str:
+        version = _artifacts_version(artifacts_dir, centers_path, self.lookup_dirs)
+        with self._lock:
+            cached = self._bundles.get(version)
+        if cached is None:
+            t0 = time.perf_counter()
+            bundle = load_artifacts(artifacts_dir)
+            bundle["centers"] = load_centers(centers_path) if centers_path and os.path.exists(centers_path) else None
+            bundle["version"] = version
+            try:
+                bundle["online"] = OnlineScorer(bundle, bundle["centers"], self.lookup_dirs)
+            except (ValueError, FileNotFoundError) as e:
+                bundle["online"] = None
+                print(f"[REGISTRY] online scoring disabled: {e}")
+            bundle["loaded_at"] = datetime.now().isoformat()
+            bundle["load_seconds"] = time.perf_counter() - t0
+            print(f"[REGISTRY] loaded {artifacts_dir} → v{version} "
+                  f"({len(bundle['models'])} models, {bundle['load_seconds']:.2f}s)")
+        with self._lock:
+            if cached is None:
+                self._bundles[version] = bundle
+                self._order = [v for v in self._order if v != version] + [version]
+            if activate:
+                self._current = version
+            # 오래된 버전 정리(현재 버전은 유지)
+            while len(self._order) > self.keep:
+                old = next((v for v in self._order if v != self._current), None)
+                if old is None:
+                    break
+                self._order.remove(old)
+                self._bundles.pop(old, None)
+        return version
+
+    def activate(self, version: str):
+        with self._lock:
+            if version not in self._bundles:
+                raise KeyError(version)
+            self._current = version
+
+    def current(self) -> dict:
+        with self._lock:
+            if self._current is None:
+                raise LookupError("no model bundle loaded")
+            return self._bundles[self._current]
+
+    def describe(self) -> dict:
+        with self._lock:
+            return {
+                "current": self._current,
+                "versions": [
+                    {"version": v, "dir": self._bundles[v]["dir"], "loaded_at": self._bundles[v]["loaded_at"],
+                     "labels": sorted(self._bundles[v]["models"].keys())}
+                    for v in self._order
+                ],
+            }
+
+
+# ---------------------------
+# 지연 메트릭
+# ---------------------------
+class LatencyStats:
+    """라벨/단계별 누적 지연 히스토그램 (Prometheus 텍스트로 노출)."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._data: Dict[tuple, dict] = {}
+
+    def observe(self, metric: str, key: str, seconds: float):
+        with self._lock:
+            d = self._data.setdefault((metric, key), {"count": 0, "sum": 0.0,
+                                                      "buckets": [0] * len(self.buckets)})
+            d["count"] += 1
+            d["sum"] += seconds
+            for i, b in enumerate(self.buckets):
+                if seconds <= b:
+                    d["buckets"][i] += 1
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            items = sorted(self._data.items())
+        seen = set()
+        for (metric, key), d in items:
+            name, label = metric.split(":", 1)
+            if name not in seen:
+                lines.append(f"# TYPE {name} histogram")
+                seen.add(name)
+            tag = f'{label}="{key}"'
+            for b, c in zip(self.buckets, d["buckets"]):
+                lines.append(f'{name}_bucket{{{tag},le="{b}"}} {c}')
+            lines.append(f'{name}_bucket{{{tag},le="+Inf"}} {d["count"]}')
+            lines.append(f"{name}_sum{{{tag}}} {d['sum']:.6f}")
+            lines.append(f"{name}_count{{{tag}}} {d['count']}")
+        return "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# 페이로드 입출력
+# ---------------------------
+def read_payload(body: bytes, content_type: str) -> pd.DataFrame:
+    """Arrow IPC(stream/file) 또는 Parquet 바이트 → DataFrame."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    ct = (content_type or "").split(";")[0].strip().lower()
+    buf = pa.BufferReader(body)
+    if ct in (PARQUET, "application/x-parquet") or body[:4] == b"PAR1":
+        return pq.read_table(buf).to_pandas()
+    if ct == ARROW_FILE or body[:6] == b"ARROW1":
+        return pa.ipc.open_file(buf).read_all().to_pandas()
+    return pa.ipc.open_stream(buf).read_all().to_pandas()
+
+
+def write_payload(df: pd.DataFrame, fmt: str) -> bytes:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    if fmt == "parquet":
+        pq.write_table(table, sink)
+    else:
+        with pa.ipc.new_stream(sink, table.schema) as w:
+            w.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def score_frame(df_raw: pd.DataFrame, bundle: dict, stats: Optional[LatencyStats] = None,
+                standardized: bool = False, apply_persona_thresholds: bool = True) -> pd.DataFrame:
+    """번들로 배치 채점 → row_id, persona, <LBL> 점수, <LBL>_pred, <LBL>_thr (wide)."""
+    t0 = time.perf_counter()
+    X = prepare_features_for_inference(
+        df_raw, standardized=standardized, meta=bundle["meta"], centers=bundle.get("centers"),
+    )
+    t1 = time.perf_counter()
+    timings: Dict[str, float] = {}
+    scores, labels_bin, persona_ids, applied_thr = predict_scores_and_labels(
+        X, bundle=bundle, apply_persona_thresholds=apply_persona_thresholds, timings=timings,
+    )
+    if stats is not None:
+        stats.observe("risk_stage_seconds:stage", "features", t1 - t0)
+        for lbl, sec in timings.items():
+            stats.observe("risk_label_inference_seconds:label", lbl, sec)
+
+    out = pd.DataFrame({"row_id": np.arange(len(X)), "persona": persona_ids.to_numpy()})
+    for lbl in scores.columns:
+        out[lbl] = scores[lbl].to_numpy()
+        out[f"{lbl}_pred"] = labels_bin[lbl].to_numpy()
+        out[f"{lbl}_thr"] = applied_thr[lbl].to_numpy()
+    return out
+
+
+# ---------------------------
+# FastAPI 앱
+# ---------------------------
+def create_app(artifacts_dir: Optional[str] = None, centers_path: Optional[str] = None):
+    from fastapi import FastAPI, HTTPException, Request
+    from fastapi.concurrency import run_in_threadpool
+    from fastapi.responses import Response, PlainTextResponse
+    from pydantic import BaseModel
+
+    artifacts_dir = artifacts_dir or os.environ.get("RISK_ARTIFACTS_DIR", "artifacts")
+    centers_path = centers_path or os.environ.get("RISK_CENTERS_PATH")
+    lookup_dirs = [d for d in os.environ.get("RISK_LOOKUP_DIRS", "").split(os.pathsep) if d]
+
+    app = FastAPI(title="Risk Scoring Service", version="1.0.0")
+    app.state.registry = ModelRegistry(lookup_dirs=lookup_dirs)
+    app.state.stats = LatencyStats()
+    app.state.centers_path = centers_path
+
+    class ReloadRequest(BaseModel):
+        artifacts_dir: str
+        centers_path: Optional[str] = None
+        activate: bool = True
+
+    class OnlineRequest(BaseModel):
+        rows: List[Dict]
+        month: Optional[str] = None
+        persona_thresholds: bool = True
+
+    @app.on_event("startup")
+    async def _startup():
+        # 모델 로드는 기동 시(요청 경로 밖)
+        await run_in_threadpool(app.state.registry.load, artifacts_dir, centers_path)
+
+    def current_bundle() -> dict:
+        try:
+            return app.state.registry.current()
+        except LookupError:
+            raise HTTPException(status_code=503, detail="model not loaded")
+
+    @app.get("/health")
+    async def health():
+        b = current_bundle()
+        return {"status": "ok", "version": b["version"], "labels": len(b["models"])}
+
+    @app.get("/models")
+    async def models():
+        return app.state.registry.describe()
+
+    @app.post("/models/reload")
+    async def reload(req: ReloadRequest):
+        if not Path(req.artifacts_dir, "meta.json").exists():
+            raise HTTPException(status_code=400, detail=f"meta.json not found in {req.artifacts_dir}")
+        version = await run_in_threadpool(
+            app.state.registry.load, req.artifacts_dir, req.centers_path or app.state.centers_path, req.activate
+        )
+        return {"version": version, **app.state.registry.describe()}
+
+    @app.post("/models/activate/{version}")
+    async def activate(version: str):
+        try:
+            app.state.registry.activate(version)
+        except KeyError:
+            raise HTTPException(status_code=404, detail=f"unknown version {version}")
+        return app.state.registry.describe()
+
+    @app.post("/score")
+    async def score(request: Request, output: Optional[str] = None,
+                    standardized: bool = False, persona_thresholds: bool = True):
+        """
+        본문: Arrow IPC 또는 Parquet (원천 컬럼, 한 달 이상의 전체 행 — _std는 월 내부 통계)
+        output: arrow(기본, 입력이 Parquet면 parquet) | parquet | json
+        standardized: 입력에 _std/Δ/Trend가 이미 있으면 true (피처 캐시 출력 등)
+        """
+        body = await request.body()
+        if not body:
+            raise HTTPException(status_code=400, detail="empty body")
+        t0 = time.perf_counter()
+        try:
+            df = read_payload(body, request.headers.get("content-type", ""))
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"invalid Arrow/Parquet payload: {e}")
+
+        bundle = current_bundle()   # 요청 시작 시점 버전 고정
+        try:
+            out = await run_in_threadpool(score_frame, df, bundle, app.state.stats,
+                                          standardized, persona_thresholds)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        app.state.stats.observe("risk_request_seconds:endpoint", "score", time.perf_counter() - t0)
+
+        headers = {"X-Model-Version": bundle["version"], "X-Rows": str(len(out))}
+        fmt = output or ("parquet" if body[:4] == b"PAR1" else "arrow")
+        if fmt == "json":
+            return Response(out.to_json(orient="records", force_ascii=False),
+                            media_type="application/json", headers=headers)
+        media = PARQUET if fmt == "parquet" else ARROW_STREAM
+        return Response(write_payload(out, fmt), media_type=media, headers=headers)
+
+    @app.post("/score/online")
+    def score_online(req: OnlineRequest):
+        """
+        단건/소배치 JSON 채점. 행의 month/year_month(없으면 req.month, 그것도 없으면 최신 룩업 월)의
+        저장된 기준값으로 표준화 → 같은 달 배치 채점과 동일한 결과.
+        """
+        bundle = current_bundle()
+        scorer = bundle.get("online")
+        if scorer is None:
+            raise HTTPException(status_code=503, detail="online lookup not available for this model version")
+        t0 = time.perf_counter()
+        try:
+            out = scorer.score_rows(req.rows, month=req.month, apply_persona_thresholds=req.persona_thresholds)
+        except ValueError as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        app.state.stats.observe("risk_request_seconds:endpoint", "score_online", time.perf_counter() - t0)
+        return {"version": bundle["version"], "rows": out.to_dict(orient="records")}
+
+    @app.get("/metrics")
+    async def metrics():
+        return PlainTextResponse(app.state.stats.render())
+
+    return app
+
+
+def main():
+    import argparse
+    import uvicorn
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--artifacts", default=os.environ.get("RISK_ARTIFACTS_DIR", "artifacts"), help="학습 산출물 폴더")
+    ap.add_argument("--centers", default=os.environ.get("RISK_CENTERS_PATH"), help="soft persona center csv")
+    ap.add_argument("--host", default="0.0.0.0")
+    ap.add_argument("--port", type=int, default=8010)
+    args = ap.parse_args()
+    uvicorn.run(create_app(args.artifacts, args.centers), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
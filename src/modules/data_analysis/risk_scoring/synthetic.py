@@ -0,0 +1,200 @@
+# synthetic.py
+# -*- coding: utf-8 -*-
+"""
+telecom_group_monthly_all.csv 모양의 합성 데이터 생성기 (벤치마크/스케일 테스트용)
+- 단위(unit) = 자치구 × 행정동 × 성별 × 연령대, 행 = 월 × 단위 (원본과 같은 월-단위 패널)
+- 컬럼명은 rules.yml / base_std / 페르소나 센터가 기대하는 원천 이름 그대로(METRIC_SPECS)
+  + 1인당 지표 <지표>_pc = 지표 / 1인가구수 (preprocess.make_per_capita와 같은 분모)
+    → 학습 표준화가 <지표>_pc_std를 만들어 rules.yml 하이브리드 신호가 그대로 해석됨
+- 값 구조: 지표 기준값 × 단위 효과 × 연령 효과 × 계절성 × 단위별 완만한 추세 × 월 잡음
+  + 일부 단위에 3~6개월 충격(Δ3m/Trend12m 신호가 실제로 생기도록), 연체 비율은 [0, 1]
+- 결정적: 같은 (rows, months, start, seed)면 항상 같은 값. 월별 난수열이 (seed, 월 순번)에서
+  파생되므로 월 단위로 흘려 쓰기(write_telecom_csv)를 해도 한 번에 만든 것과 같다.
+
+사용 예 (src/modules 에서):
+    python -m data_analysis.risk_scoring.synthetic --rows 1M --out bench/telecom_1M.csv
+    df = generate_telecom(100_000, seed=0)
+"""
+from typing import Dict, Iterator
+import os, math, time, argparse
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except Exception:
+    HAS_PYARROW = False
+
+SEOUL_GU = ("종로구", "중구", "용산구", "성동구", "광진구", "동대문구", "중랑구", "성북구", "강북구",
+            "도봉구", "노원구", "은평구", "서대문구", "마포구", "양천구", "강서구", "구로구", "금천구",
+            "영등포구", "동작구", "관악구", "서초구", "강남구", "송파구", "강동구")
+SEXES = ("남", "여")
+AGE_BANDS = ("10대", "20대", "30대", "40대", "50대", "60대", "70대이상")
+
+# 지표 → (기준값, 단위 간 변동(로그 sd), 연령 기울기(고령일수록 +/-), 계절 진폭)
+METRIC_SPECS: Dict[str, tuple] = {
+    "평일 총 이동 거리 합계":        (120.0, 0.35, -0.30, 0.05),
+    "휴일 총 이동 거리 합계":        (60.0,  0.40, -0.25, 0.10),
+    "동영상/방송 서비스 사용일수":   (18.0,  0.25, -0.20, 0.03),
+    "게임 서비스 사용일수":          (8.0,   0.50, -0.60, 0.05),
+    "지하철이동일수 합계":           (14.0,  0.40, -0.35, 0.04),
+    "집 추정 위치 평일 총 체류시간": (300.0, 0.20,  0.20, 0.03),
+    "평균 통화대상자 수":            (25.0,  0.30, -0.15, 0.02),
+    "평균 문자량":                   (40.0,  0.35, -0.25, 0.02),
+    "평균 통화량":                   (90.0,  0.30,  0.05, 0.02),
+    "평일 총 이동 횟수":             (45.0,  0.30, -0.25, 0.04),
+    "주간상주지 변경횟수 평균":      (1.2,   0.40, -0.20, 0.05),
+    "야간상주지 변경횟수 평균":      (0.8,   0.40, -0.20, 0.05),
+    "소액결재 사용금액 평균":        (35000.0, 0.45, -0.30, 0.08),
+    "소액결재 사용횟수 평균":        (9.0,   0.45, -0.35, 0.08),
+    "쇼핑 서비스 사용일수":          (10.0,  0.35, -0.25, 0.10),
+    "금융 서비스 사용일수":          (12.0,  0.30, -0.15, 0.03),
+    "배달 서비스 사용일수":          (7.0,   0.45, -0.40, 0.06),
+    "평균 근무시간 평균":            (170.0, 0.20, -0.25, 0.02),
+    "SNS 사용횟수":                  (60.0,  0.50, -0.55, 0.03),
+    "1인가구수":                     (150.0, 0.50,  0.15, 0.00),
+    "소액결재 비사용 인구수":        (80.0,  0.45,  0.35, 0.00),
+}
+LATE_RATIO_COL = "최근 3개월 내 요금 연체 비율"   # [0, 1] 비율(로지스틱)
+PC_DENOM_COL = "1인가구수"                        # 1인당(_pc) 분모
+PC_COLS = tuple(c for c in METRIC_SPECS if c != PC_DENOM_COL)
+SHOCK_RATE = 0.03                                 # 충격 단위 비율(월 무관, 단위 고정)
+
+
+def parse_rows(s) -> int:
+    """'100k' / '1M' / '10M' / '250000' → 행 수."""
+    if isinstance(s, (int, np.integer)):
+        return int(s)
+    s = str(s).strip().lower().replace("_", "")
+    mult = {"k": 10**3, "m": 10**6, "g": 10**9}.get(s[-1:], 1)
+    return int(float(s[:-1] if mult > 1 else s) * mult)
+
+
+def _rng(seed: int, *key: int) -> np.random.Generator:
+    return np.random.default_rng([seed, *key])
+
+
+def synth_units(n_units: int, seed: int = 0) -> pd.DataFrame:
+    """
+    단위 테이블(자치구/행정동/행정동코드/성별/연령대 + 잠재 효과). 구별 행정동 수가 고르도록
+    행정동 순번 우선으로 격자를 채운 뒤 n_units개만 남기고 원본 순서(구 → 동 → 성별 → 연령)로 정렬.
+    """
+    per_dong = len(SEXES) * len(AGE_BANDS)
+    n_dong = max(1, math.ceil(n_units / (len(SEOUL_GU) * per_dong)))
+    d, g, s, a = np.meshgrid(np.arange(n_dong), np.arange(len(SEOUL_GU)),
+                             np.arange(len(SEXES)), np.arange(len(AGE_BANDS)), indexing="ij")
+    grid = np.column_stack([g.ravel(), d.ravel(), s.ravel(), a.ravel()])[:n_units]
+    grid = grid[np.lexsort(grid.T[::-1])]
+    gi, di, si, ai = grid.T
+
+    gu = np.asarray(SEOUL_GU, dtype=object)[gi]
+    dong = np.array([f"{name[:-1]}{k + 1}동" for name, k in zip(gu, di)], dtype=object)
+    rng = _rng(seed, 0)
+    n = len(grid)
+    units = pd.DataFrame({
+        "자치구": gu,
+        "행정동": dong,
+        "행정동코드": (1100000000 + (gi + 1) * 100000 + (di + 1) * 100).astype(np.int64),
+        "성별": np.asarray(SEXES, dtype=object)[si],
+        "연령대": np.asarray(AGE_BANDS, dtype=object)[ai],
+    })
+    # 잠재 효과: 구 효과(공유) + 단위 효과, 연령 z, 추세 기울기, 충격(시작 월/길이/크기)
+    gu_eff = rng.normal(0.0, 0.15, len(SEOUL_GU))[gi]
+    units["_eff"] = gu_eff + rng.normal(0.0, 1.0, n)
+    units["_age_z"] = (ai - (len(AGE_BANDS) - 1) / 2) / ((len(AGE_BANDS) - 1) / 2)
+    units["_slope"] = rng.normal(0.0, 0.01, n)
+    units["_late"] = rng.normal(-3.2, 0.8, n) + 0.4 * (ai <= 1)
+    shock = rng.random(n) < SHOCK_RATE
+    units["_shock_start"] = np.where(shock, rng.integers(6, 10**6, n), -1)   # 월 수로 나눈 나머지를 시작 월로
+    units["_shock_len"] = rng.integers(3, 7, n)
+    units["_shock_size"] = rng.choice([-0.6, 0.6], n)
+    return units
+
+
+def synth_month(units: pd.DataFrame, t: int, month: pd.Timestamp, n_months: int,
+                seed: int = 0) -> pd.DataFrame:
+    """t번째 월의 행(units 순서). 난수열은 (seed, 1, t)에서 파생 → 월별 독립 생성 가능."""
+    rng = _rng(seed, 1, t)
+    n = len(units)
+    out = units[["자치구", "행정동", "행정동코드", "성별", "연령대"]].copy()
+    out.insert(0, "month", month.strftime("%Y-%m"))
+
+    start = np.where(units["_shock_start"].to_numpy() >= 0,
+                     6 + units["_shock_start"].to_numpy() % max(1, n_months - 6), -1)
+    in_shock = (start >= 0) & (t >= start) & (t < start + units["_shock_len"].to_numpy())
+    shock = np.where(in_shock, units["_shock_size"].to_numpy(), 0.0)
+    eff, age_z, slope = (units[c].to_numpy() for c in ("_eff", "_age_z", "_slope"))
+
+    for j, (col, (base, sd, age_coef, season)) in enumerate(METRIC_SPECS.items()):
+        # 지표마다 단위 효과 부호/크기를 조금씩 다르게(열 간 상관은 남기되 완전 공선 아님)
+        w = 0.5 + 0.5 * math.cos(j)
+        log_v = (np.log(base) + sd * w * eff + age_coef * age_z + slope * t
+                 + season * math.sin(2 * math.pi * (month.month - 1) / 12)
+                 + shock * (1 if j % 2 == 0 else -1) * 0.5
+                 + rng.normal(0.0, 0.08, n))
+        v = np.exp(log_v)
+        if "일수" in col:   # 일수 지표는 그 달 일수 이내
+            v = np.minimum(v, month.days_in_month)
+        out[col] = np.round(v, 3)
+    den = out[PC_DENOM_COL].replace(0, np.nan)
+    for col in PC_COLS:
+        out[f"{col}_pc"] = np.round(out[col] / den, 6)
+    late = units["_late"].to_numpy() + 1.5 * in_shock + rng.normal(0.0, 0.3, n)
+    out[LATE_RATIO_COL] = np.round(1.0 / (1.0 + np.exp(-late)), 4)
+    return out
+
+
+def iter_telecom_months(n_rows: int, n_months: int = 30, start: str = "2023-01",
+                        seed: int = 0) -> Iterator[pd.DataFrame]:
+    """월별 프레임을 차례로 생성 (행 수 ≈ n_rows, 단위 수 = ceil(n_rows / n_months))."""
+    units = synth_units(max(1, math.ceil(n_rows / n_months)), seed=seed)
+    months = pd.date_range(pd.Timestamp(start), periods=n_months, freq="MS")
+    for t, m in enumerate(months):
+        yield synth_month(units, t, m, n_months, seed=seed)
+
+
+def generate_telecom(n_rows: int, n_months: int = 30, start: str = "2023-01",
+                     seed: int = 0) -> pd.DataFrame:
+    """메모리에 한 번에 생성 (작은 크기/테스트용)."""
+    return pd.concat(list(iter_telecom_months(n_rows, n_months, start, seed)), ignore_index=True)
+
+
+def write_telecom_csv(path: str, n_rows: int, n_months: int = 30, start: str = "2023-01",
+                      seed: int = 0) -> Dict:
+    """월 단위로 흘려 쓰기(메모리 = 한 달치). pyarrow CSV writer 우선, 없으면 pandas append."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    t0 = time.perf_counter()
+    rows, writer = 0, None
+    for i, mdf in enumerate(iter_telecom_months(n_rows, n_months, start, seed)):
+        if HAS_PYARROW:
+            tbl = pa.Table.from_pandas(mdf, preserve_index=False)
+            if writer is None:
+                writer = pacsv.CSVWriter(path, tbl.schema)
+            writer.write_table(tbl)
+        else:
+            mdf.to_csv(path, mode="w" if i == 0 else "a", header=(i == 0), index=False, encoding="utf-8")
+        rows += len(mdf)
+    if writer is not None:
+        writer.close()
+    info = {"path": path, "rows": rows, "months": n_months, "start": start, "seed": seed,
+            "bytes": os.path.getsize(path), "sec": round(time.perf_counter() - t0, 2)}
+    print(f"[SYNTH] {path}: rows={rows:,} months={n_months} ({info['bytes'] / 1e6:.0f}MB, {info['sec']:.1f}s)")
+    return info
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", default="100k", help="행 수 (예: 100k, 1M, 10M)")
+    ap.add_argument("--out", required=True, help="CSV 저장 경로")
+    ap.add_argument("--months", type=int, default=30)
+    ap.add_argument("--start", default="2023-01")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    write_telecom_csv(args.out, parse_rows(args.rows), args.months, args.start, args.seed)
+
+
+if __name__ == "__main__":
+    main()
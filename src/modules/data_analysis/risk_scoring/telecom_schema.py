@@ -0,0 +1,253 @@
+# telecom_schema.py
+# -*- coding: utf-8 -*-
+"""
+telecom_group_monthly_all.csv 스키마 + 타입 지정 로더
+- 카테고리: 자치구/행정동/성별/연령대/행정동코드 → category (카테고리는 정렬 → 정렬/OHE 순서가 object와 동일)
+- 연/월 정수: year/month_num → int16
+- 지표: 나머지 숫자 컬럼 → float32 (표준화 등 계산은 float64로 올려서 수행)
+- year_month: 'month'(YYYY-MM) 또는 year/month_num에서 로드 시 바로 생성(datetime64)
+- pyarrow.csv(멀티스레드, 컬럼 투영) 우선, 없으면 pandas C 엔진 폴백
+
+주의: 카테고리 컬럼 groupby는 observed=True로(미관측 조합 생성 방지)
+
+스트리밍(월 파티션): iter_month_partitions
+- CSV를 블록 단위로 한 번 훑으며 월별 임시 파일로 나눈 뒤 월 순서대로 한 달씩 돌려줌
+  (입력이 월 정렬이 아니어도 됨, 메모리 = 블록 1개 + 가장 큰 월 1개)
+- 각 월 프레임은 read_telecom_csv와 같은 스키마, 인덱스 = 원본 CSV 행 번호(row_id)
+
+사용 예:
+    df = read_telecom_csv("telecom_group_monthly_all.csv")                 # 전체
+    df = read_telecom_csv(path, columns=["자치구", "평균 문자량"])           # 필요한 컬럼만(+월)
+    for month, mdf in iter_month_partitions(path, spill_dir="tmp_parts"):  # 월 단위
+        ...
+"""
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+import os, shutil
+import numpy as np
+import pandas as pd
+
+MONTH_COL = "year_month"
+MONTH_SOURCE_COLS = ("month", "year", "month_num")
+CATEGORY_COLS = ("자치구", "행정동", "성별", "연령대", "행정동코드")
+INT_COLS = {"year": "int16", "month_num": "int16"}
+METRIC_DTYPE = "float32"
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    HAS_PYARROW = True
+except Exception:
+    HAS_PYARROW = False
+
+
+def csv_header(path: str, encoding: str = "utf-8") -> List[str]:
+    return list(pd.read_csv(path, nrows=0, encoding=encoding).columns)
+
+
+def schema_dtypes(columns: Sequence[str]) -> Dict[str, str]:
+    """컬럼 → 로드 타입(카테고리/정수/월 원천). 그 밖의 숫자 컬럼은 로드 후 METRIC_DTYPE."""
+    out = {}
+    for c in columns:
+        if c in CATEGORY_COLS:
+            out[c] = "category"
+        elif c in INT_COLS:
+            out[c] = INT_COLS[c]
+        elif c == "month":
+            out[c] = "str"
+    return out
+
+
+def _projection(header: Sequence[str],
+                columns: Optional[Union[Sequence[str], Callable[[str], bool]]]) -> List[str]:
+    if columns is None:
+        return list(header)
+    keep = columns if callable(columns) else set(columns).__contains__
+    # 월 원천은 항상 포함(year_month 생성용)
+    return [c for c in header if keep(c) or c in MONTH_SOURCE_COLS or c == MONTH_COL]
+
+
+def _read_pyarrow(path: str, cols: List[str], encoding: str) -> pd.DataFrame:
+    # 문자열 카테고리/월은 파싱 단계에서 사전 인코딩 → 판다스 Categorical로 바로 변환(문자열 객체 없음)
+    types = {c: pa.dictionary(pa.int32(), pa.string()) for c in cols
+             if (c in CATEGORY_COLS and c != "행정동코드") or c == "month"}
+    tbl = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(encoding=encoding),
+        convert_options=pacsv.ConvertOptions(include_columns=cols, column_types=types),
+    )
+    # 숫자 지표는 Arrow에서 바로 float32로(판다스 변환 시 float64 중간 사본 없음)
+    arrays, names = [], []
+    for name, col in zip(tbl.column_names, tbl.columns):
+        if name in types or name in INT_COLS:
+            pass
+        elif name in CATEGORY_COLS:
+            col = col.dictionary_encode()   # 행정동코드: 정수 카테고리
+        elif pa.types.is_integer(col.type) or pa.types.is_floating(col.type):
+            col = col.cast(pa.float32())
+        arrays.append(col)
+        names.append(name)
+    df = pa.table(arrays, names=names).to_pandas()
+    for c in cols:
+        if c in INT_COLS and c in df.columns:
+            df[c] = df[c].astype(INT_COLS[c])
+    return df
+
+
+def _read_pandas(path: str, cols: List[str], encoding: str) -> pd.DataFrame:
+    dtypes = {c: t for c, t in schema_dtypes(cols).items() if t != "category"}
+    df = pd.read_csv(path, usecols=cols, dtype=dtypes, encoding=encoding, low_memory=False)
+    for c in df.columns:
+        if c not in INT_COLS and c not in CATEGORY_COLS and pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = df[c].astype(METRIC_DTYPE)
+    return df
+
+
+def _to_categories(df: pd.DataFrame) -> pd.DataFrame:
+    """카테고리 컬럼: 정렬된 카테고리(코드 컬럼은 정수 카테고리)."""
+    for c in CATEGORY_COLS:
+        if c not in df.columns:
+            continue
+        s = df[c]
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            # pyarrow 경로: 등장 순서 카테고리 → 정렬(코드만 재매핑)
+            df[c] = s.cat.reorder_categories(np.sort(s.cat.categories.to_numpy()))
+            continue
+        if c == "행정동코드":
+            s = pd.to_numeric(s, errors="coerce")
+            if s.notna().all():
+                s = s.astype("int64")
+        vals = pd.unique(s.dropna())
+        df[c] = pd.Categorical(s, categories=np.sort(vals))
+    return df
+
+
+def _add_year_month(df: pd.DataFrame) -> pd.DataFrame:
+    if MONTH_COL in df.columns:
+        df[MONTH_COL] = pd.to_datetime(df[MONTH_COL]).dt.to_period("M").dt.to_timestamp()
+    elif "month" in df.columns:
+        # 고유 월 값만 파싱 후 펼침(행 수와 무관)
+        m = df["month"].astype("category")
+        months = pd.to_datetime(pd.Series(m.cat.categories)).dt.to_period("M").dt.to_timestamp()
+        df[MONTH_COL] = pd.Series(np.append(months.to_numpy(), np.datetime64("NaT"))[m.cat.codes.to_numpy()],
+                                  index=df.index)
+        df["month"] = m
+    elif {"year", "month_num"}.issubset(df.columns):
+        df[MONTH_COL] = pd.to_datetime(dict(year=df["year"].astype(int), month=df["month_num"].astype(int), day=1))
+    return df
+
+
+def read_telecom_csv(path: str,
+                     columns: Optional[Union[Sequence[str], Callable[[str], bool]]] = None,
+                     encoding: str = "utf-8",
+                     engine: str = "auto") -> pd.DataFrame:
+    """
+    스키마 적용 로드 (+ year_month). columns: 이름 목록 또는 판별 함수(usecols 의미), 없는 이름은 무시.
+    engine: auto(pyarrow 있으면 사용) | pyarrow | c
+    """
+    header = csv_header(path, encoding)
+    cols = _projection(header, columns)
+    use_arrow = HAS_PYARROW if engine == "auto" else (engine == "pyarrow")
+    df = _read_pyarrow(path, cols, encoding) if use_arrow else _read_pandas(path, cols, encoding)
+    df = _add_year_month(_to_categories(df))
+    return df
+
+
+def _month_keys(df: pd.DataFrame) -> pd.Series:
+    """파티션 키 'YYYY-MM' (월 원천 컬럼에서)."""
+    if MONTH_COL in df.columns:
+        return pd.to_datetime(df[MONTH_COL]).dt.strftime("%Y-%m")
+    if "month" in df.columns:
+        m = df["month"].astype("category")
+        keys = pd.to_datetime(pd.Series(m.cat.categories)).dt.strftime("%Y-%m").to_numpy()
+        return pd.Series(np.append(keys, None)[m.cat.codes.to_numpy()], index=df.index)
+    if {"year", "month_num"}.issubset(df.columns):
+        return (df["year"].astype(int).astype(str) + "-" + df["month_num"].astype(int).map("{:02d}".format))
+    raise ValueError("month source column not found (month / year_month / year+month_num)")
+
+
+def _spill_pyarrow(path: str, cols: List[str], encoding: str, spill_dir: str,
+                   block_size: int) -> Dict[str, str]:
+    import pyarrow.parquet as pq
+    # 문자열은 블록마다 사전이 달라지므로 평문 문자열로 받고, 읽을 때 카테고리화
+    types = {c: pa.string() for c in cols if (c in CATEGORY_COLS and c != "행정동코드") or c in ("month", MONTH_COL)}
+    reader = pacsv.open_csv(
+        path,
+        read_options=pacsv.ReadOptions(encoding=encoding, block_size=block_size),
+        convert_options=pacsv.ConvertOptions(include_columns=cols, column_types=types),
+    )
+    writers, files, offset = {}, {}, 0
+    try:
+        for batch in reader:
+            tbl = pa.Table.from_batches([batch])
+            tbl = tbl.append_column("row_id", pa.array(np.arange(offset, offset + len(tbl), dtype=np.int64)))
+            offset += len(tbl)
+            src = [c for c in ("month", MONTH_COL, "year", "month_num") if c in tbl.column_names]
+            keys = _month_keys(tbl.select(src).to_pandas()).to_numpy()
+            for k in pd.unique(keys):
+                part = tbl.filter(pa.array(keys == k))
+                if k not in writers:
+                    files[k] = os.path.join(spill_dir, f"{k}.parquet")
+                    writers[k] = pq.ParquetWriter(files[k], part.schema)
+                writers[k].write_table(part.cast(writers[k].schema))
+    finally:
+        for w in writers.values():
+            w.close()
+    return files
+
+
+def _spill_pandas(path: str, cols: List[str], encoding: str, spill_dir: str,
+                  chunksize: int = 500_000) -> Dict[str, str]:
+    dtypes = {c: ("str" if t == "category" else t) for c, t in schema_dtypes(cols).items()}
+    files, offset = {}, 0
+    for chunk in pd.read_csv(path, usecols=cols, dtype=dtypes, encoding=encoding, chunksize=chunksize):
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        for k, part in chunk.groupby(_month_keys(chunk), sort=False):
+            f = os.path.join(spill_dir, f"{k}.csv")
+            part.rename_axis("row_id").to_csv(f, mode="a", header=k not in files, encoding="utf-8")
+            files[k] = f
+    return files
+
+
+def _read_spill(f: str, encoding: str = "utf-8") -> pd.DataFrame:
+    if f.endswith(".parquet"):
+        df = pd.read_parquet(f)
+    else:
+        head = csv_header(f)
+        dtypes = {c: ("str" if t == "category" else t) for c, t in schema_dtypes(head).items()}
+        df = pd.read_csv(f, dtype=dtypes, encoding=encoding)
+    df = df.set_index("row_id")
+    df.index.name = None
+    for c in df.columns:
+        if c not in INT_COLS and c not in CATEGORY_COLS and c not in MONTH_SOURCE_COLS \
+                and c != MONTH_COL and pd.api.types.is_numeric_dtype(df[c]):
+            df[c] = df[c].astype(METRIC_DTYPE)
+    for c, t in INT_COLS.items():
+        if c in df.columns:
+            df[c] = df[c].astype(t)
+    return _add_year_month(_to_categories(df))
+
+
+def iter_month_partitions(path: str,
+                          columns: Optional[Union[Sequence[str], Callable[[str], bool]]] = None,
+                          spill_dir: Optional[str] = None,
+                          encoding: str = "utf-8",
+                          engine: str = "auto",
+                          block_size: int = 64 << 20) -> Iterator[Tuple[pd.Timestamp, pd.DataFrame]]:
+    """
+    (월, 그 달 프레임)을 월 순서대로. spill_dir: 임시 월 파일 폴더(끝나면 삭제, 없으면 CSV 옆에 생성).
+    프레임 스키마는 read_telecom_csv와 같고 인덱스는 원본 CSV 행 번호.
+    """
+    header = csv_header(path, encoding)
+    cols = _projection(header, columns)
+    spill_dir = spill_dir or (os.path.abspath(path) + ".parts")
+    os.makedirs(spill_dir, exist_ok=True)
+    use_arrow = HAS_PYARROW if engine == "auto" else (engine == "pyarrow")
+    try:
+        files = (_spill_pyarrow(path, cols, encoding, spill_dir, block_size) if use_arrow
+                 else _spill_pandas(path, cols, encoding, spill_dir))
+        print(f"[SCHEMA] partitioned {path} → {len(files)} months ({spill_dir})")
+        for k in sorted(files):
+            yield pd.Timestamp(k + "-01"), _read_spill(files[k], encoding)
+    finally:
+        shutil.rmtree(spill_dir, ignore_errors=True)
@@ -3,18 +3,24 @@
 """
 멀티라벨 학습 파이프라인
 - 규칙 라벨링(hybrid) → (자동 분할: single-class 라벨 GMM/KMeans) → (선택) 컷 튜닝(라벨율 목표)
+  (분할/컷 적합은 월 층화 표본 상한 LABEL_FIT_SAMPLE, 적용은 전체 행)
   → 시간 분할(train/cal/test) → LGBM(LogReg 폴백) 학습
 - 단일 클래스/저양성, 상수 피처/누수 자동 방어
 - 규칙-피처 강제 제외(Fallback): signals + gate 전부 제거
 - 캘리브레이션(isotonic→sigmoid 폴백)
 - 임계값 선택 전략: cost / f1 / rec_at_prec(target) (+라벨별 비용지도)
+- 보정 점수 캐시 label_scores.parquet (retune: 학습 없이 임계값/비용 재튜닝)
 - 메트릭/임계값/메타/모니터링 히스토그램/라벨율/중요도/PR커브 저장
+- 모델 피처 전체 드리프트 베이스라인 monitor_baseline.npz (drift_monitor: 분위 구간 경계 + 학습 건수)
+- 단계/라벨별 시간·메모리 profile.json (--cprofile: 가장 느린 단계 pstats 덤프)
+- 보정 모델 압축 배열 model_{LBL}.npz 내보내기(tree_export, 보정 세트로 1e-6 검증)
+- (옵션) warm start: 이전 산출물 부스터에 새 학습 월만 이어 학습 + 재보정/임계값 (warm_start)
 - (옵션) 개인 기준 Δ3m/Trend12m 계산 지원
 - CLI 인자 지원
 """
 from pathlib import Path
 from typing import Optional, List, Tuple, Dict
-import os, json, warnings
+import os, json, time, warnings
 from datetime import datetime
 
 import numpy as np
@@ -23,39 +29,17 @@ warnings.filterwarnings("ignore")
 
 # --- 프로젝트 모듈 ---
 from .rules_loader import load_rules, rules_version
-from .label_rules import apply_rule_hybrid
+from .label_rules import apply_rule_hybrid, hybrid_reason_codes
 from .persona_soft import load_centers, soft_membership
+from .feature_plan import build_feature_plan
+from .telecom_schema import read_telecom_csv
+from .column_catalog import catalog_for
 
 
 # ========== 유틸 ==========
-def _resolve_col(df: pd.DataFrame, name: str):
-    if not isinstance(name, str) or not name:
-        return None
-    base = name
-    for suf in ["_pc_std", "_pc", "_std"]:
-        if base.endswith(suf):
-            base = base[: -len(suf)]
-            break
-
-    # 1차: 정확/표준 후보
-    candidates = [name, f"{base}_std", base]
-    seen = set()
-    for c in candidates:
-        if c and c not in seen:
-            seen.add(c)
-            if c in df.columns:
-                return c
-
-    # 2차: 느슨 매칭(길이 짧은 것 우선, *_std 우선)
-    pool = [c for c in df.columns if isinstance(c, str) and base in c]
-    if not pool:
-        return None
-    pool_std = [c for c in pool if c.endswith("_std")]
-    if pool_std:
-        pool = pool_std
-    # '평균' 우선, 그 다음 전체 길이 짧은 순
-    pool.sort(key=lambda x: (0 if "평균" in x else 1, len(x)))
-    return pool[0]
+def _resolve_col(df: pd.DataFrame, name: str, known: Optional[Dict] = None):
+    """규칙/피처 이름 → 실제 컬럼 (프레임 컬럼당 1회 만든 카탈로그에서 조회, known: 이름→컬럼 고정 매핑)."""
+    return catalog_for(df.columns).resolve(name, known)
 
 
 def run_diagnostic_check(df_lbl, rules_meta, lbl_cols, mask_train):
@@ -125,23 +109,50 @@ def as_pyfloat_list(arr) -> List[float]:
     return [float(x) for x in np.asarray(arr).ravel().tolist()]
 
 
+# 표준화 대상에서 빠지는 ID/카테고리성 컬럼 (month_col은 호출 시 추가)
+STD_EXCLUDE_COLS = ("year", "month_num", "행정동코드", "자치구", "성별", "연령대")
+
+# 월평균 기반 Δ/Trend 창 크기: (접미어, 창) — 현재 창 평균 - 직전 창 평균
+DERIVED_WINDOWS = (("_delta3m", 3), ("_trend12m", 6))
+
+
+def standardized_columns(df: pd.DataFrame, month_col: str = "year_month") -> List[str]:
+    """ensure_all_standardized_features(derive=False) 이후 존재할 *_std 컬럼 목록(계산 없이)."""
+    exclude_cols = {month_col, *STD_EXCLUDE_COLS}
+    cols = [c for c in df.columns if isinstance(c, str) and c.endswith("_std")]
+    for col in df.columns:
+        if col in exclude_cols or not isinstance(col, str) or col.endswith("_std"):
+            continue
+        if pd.api.types.is_numeric_dtype(df[col]) and f"{col}_std" not in cols:
+            cols.append(f"{col}_std")
+    return cols
+
+
 # 기존 _monthwise_robust_z_log1p 와 ensure_pc_std_all 함수를 지우고 아래 코드로 교체
 
-def ensure_all_standardized_features(df: pd.DataFrame, month_col: str = "year_month") -> pd.DataFrame:
+def ensure_all_standardized_features(df: pd.DataFrame, month_col: str = "year_month",
+                                     derive: bool = True,
+                                     std_cols: Optional[List[str]] = None,
+                                     derived_cols: Optional[List[str]] = None,
+                                     copy: bool = True,
+                                     dtype=None) -> pd.DataFrame:
     """
     데이터프레임의 모든 숫자형 컬럼에 대해 월별 강건한 표준화(_std)를 적용하는 최종 함수.
     - 원본 컬럼이름에 _std를 붙여 새 컬럼을 생성.
     - ID, 날짜, 카테고리성 컬럼은 제외.
+    - derive=False면 _std만 만들고 Δ/Trend 파생은 건너뜀(월 단위 캐시용)
+    - std_cols/derived_cols를 주면 그 컬럼만 계산(추론 시 피처 플랜 closure)
+    - copy=False면 df에 컬럼을 직접 추가(복사 없음), dtype(예: np.float32)을 주면 _std/파생을 그 타입으로 저장
     """
     print("모든 숫자형 피처에 대한 표준화(_std)를 시작합니다...")
-    out = df.copy()
+    out = df.copy() if copy else df
     
     # 표준화에서 제외할 컬럼들
-    exclude_cols = {month_col, "year", "month_num", "행정동코드", "자치구", "성별", "연령대"}
+    exclude_cols = {month_col, *STD_EXCLUDE_COLS}
 
     
     # df에 있는 모든 컬럼을 순회
-    for col in df.columns:
+    for col in list(df.columns):
         if col in exclude_cols or col.endswith("_std"):
             continue
             
@@ -150,52 +161,81 @@ def ensure_all_standardized_features(df: pd.DataFrame, month_col: str = "year_mo
             std_col_name = f"{col}_std"
             if std_col_name in out.columns:
                 continue
+            if std_cols is not None and std_col_name not in std_cols:
+                continue
 
             # 월별 강건한 표준화 (log1p + z-score)
-            x = np.log1p(pd.to_numeric(df[col], errors="coerce").clip(lower=0))
+            # float32 원천(telecom_schema)도 계산은 float64로
+            x = np.log1p(pd.to_numeric(df[col], errors="coerce").astype(np.float64).clip(lower=0))
             g = x.groupby(df[month_col])
             med = g.transform("median")
             iqr = g.transform(lambda v: v.quantile(0.75) - v.quantile(0.25))
             scale = iqr.where(iqr > 0, g.transform("std")).fillna(1.0)
             
-            out[std_col_name] = ((x - med) / scale.where(scale > 0, 1.0)).fillna(0)
+            z = ((x - med) / scale.where(scale > 0, 1.0)).fillna(0)
+            out[std_col_name] = z if dtype is None else z.astype(dtype)
             print(f"  - '{std_col_name}' 생성 완료.")
 
+    if not derive:
+        return out
+
     # Δ/Trend 피처들은 원본이 아닌 _std 피처를 기반으로 생성하도록 수정
     base_std_cols_for_derived = [c for c in out.columns if c.endswith("_std")]
-    out = ensure_delta3m(out, base_std_cols_for_derived, month_col)
-    out = ensure_trend12m(out, base_std_cols_for_derived, month_col)
+    if derived_cols is None:
+        out = ensure_delta3m(out, base_std_cols_for_derived, month_col, copy=False, dtype=dtype)
+        out = ensure_trend12m(out, base_std_cols_for_derived, month_col, copy=False, dtype=dtype)
+    else:
+        want = set(derived_cols)
+        out = ensure_delta3m(out, [c for c in base_std_cols_for_derived if c + "_delta3m" in want], month_col,
+                             copy=False, dtype=dtype)
+        out = ensure_trend12m(out, [c for c in base_std_cols_for_derived if c + "_trend12m" in want], month_col,
+                              copy=False, dtype=dtype)
 
     return out
 
 
 # ===== Δ3m/Trend12m: (A) 월평균 기반 스냅샷  =====
-def ensure_delta3m(df: pd.DataFrame, base_cols: List[str], month_col: str = "year_month") -> pd.DataFrame:
-    """월평균 기반 3개월 변화(현재3M-직전3M). (개인ID 없을 때의 안전한 폴백)"""
-    out = df.copy()
-    base_cols = [c for c in base_cols if c in out.columns]
-    if not base_cols: return out
+def month_rolling_diff(mdf: pd.DataFrame, base_cols: List[str], window: int, suffix: str) -> pd.DataFrame:
+    """
+    월평균 테이블(월 오름차순, 월당 1행)에서 '현재 window개월 평균 - 직전 window개월 평균' 파생.
+    ensure_delta3m/ensure_trend12m 및 피처 캐시가 공유.
+    """
+    out = pd.DataFrame(index=mdf.index)
+    for c in base_cols:
+        cur = mdf[c].rolling(window, min_periods=window).mean()
+        prev = mdf[c].shift(window).rolling(window, min_periods=window).mean()
+        out[c + suffix] = cur - prev
+    return out
+
+
+def _append_month_derived(out: pd.DataFrame, base_cols: List[str], window: int, suffix: str,
+                          month_col: str, dtype=None) -> pd.DataFrame:
+    """월평균 롤링 파생을 월 → 행 위치 룩업으로 out에 직접 추가(merge/복사 없음, 인덱스 유지)."""
     mdf = out.groupby([month_col], as_index=False)[base_cols].mean().sort_values(month_col)
+    der = month_rolling_diff(mdf, base_cols, window, suffix)
+    pos = pd.Index(mdf[month_col]).get_indexer(out[month_col])   # 월 결측 → -1 → NaN
     for c in base_cols:
-        cur3 = mdf[c].rolling(3, min_periods=3).mean()
-        prev3 = mdf[c].shift(3).rolling(3, min_periods=3).mean()
-        mdf[c + "_delta3m"] = cur3 - prev3
-    out = out.merge(mdf[[month_col] + [c + "_delta3m" for c in base_cols]], on=month_col, how="left")
+        v = np.append(der[c + suffix].to_numpy(dtype=float), np.nan)[pos]
+        out[c + suffix] = v if dtype is None else v.astype(dtype)
     return out
 
 
-def ensure_trend12m(df: pd.DataFrame, base_cols: List[str], month_col: str = "year_month") -> pd.DataFrame:
+def ensure_delta3m(df: pd.DataFrame, base_cols: List[str], month_col: str = "year_month",
+                   copy: bool = True, dtype=None) -> pd.DataFrame:
+    """월평균 기반 3개월 변화(현재3M-직전3M). (개인ID 없을 때의 안전한 폴백)"""
+    out = df.copy() if copy else df
+    base_cols = [c for c in base_cols if c in out.columns]
+    if not base_cols: return out
+    return _append_month_derived(out, base_cols, 3, "_delta3m", month_col, dtype)
+
+
+def ensure_trend12m(df: pd.DataFrame, base_cols: List[str], month_col: str = "year_month",
+                    copy: bool = True, dtype=None) -> pd.DataFrame:
     """월평균 기반 12개월 트렌드(6M-6M). (개인ID 없을 때의 안전한 폴백)"""
-    out = df.copy()
+    out = df.copy() if copy else df
     base_cols = [c for c in base_cols if c in out.columns]
     if not base_cols: return out
-    mdf = out.groupby([month_col], as_index=False)[base_cols].mean().sort_values(month_col)
-    for c in base_cols:
-        cur6 = mdf[c].rolling(6, min_periods=6).mean()
-        prev6 = mdf[c].shift(6).rolling(6, min_periods=6).mean()
-        mdf[c + "_trend12m"] = cur6 - prev6
-    out = out.merge(mdf[[month_col] + [c + "_trend12m" for c in base_cols]], on=month_col, how="left")
-    return out
+    return _append_month_derived(out, base_cols, 6, "_trend12m", month_col, dtype)
 
 
 # ===== Δ3m/Trend12m: (B) 개인 기준 버전 (권장) =====
@@ -222,33 +262,36 @@ def ensure_trend12m_per_id(df: pd.DataFrame, base_cols: List[str], id_col: str,
 
 
 # ===== 임계값 선택 =====
+def _counts_at(y: np.ndarray, p: np.ndarray, thr_grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, int]:
+    """임계값 격자별 (TP, FP) 건수(p >= t) — 정렬 1회 + searchsorted. returns (tp, fp, 양성 수)."""
+    pos = np.sort(p[y == 1])
+    neg = np.sort(p[y != 1])
+    tp = len(pos) - np.searchsorted(pos, thr_grid, side="left")
+    fp = len(neg) - np.searchsorted(neg, thr_grid, side="left")
+    return tp, fp, len(pos)
+
+
 def pick_threshold_cost(y_true, p_pred, cost_fn: float = 20.0, cost_fp: float = 1.0) -> float:
     y = np.asarray(y_true).astype(int)
     p = np.asarray(p_pred).astype(float)
     thr_grid = np.linspace(0.01, 0.99, 99)
-    best_thr, best_cost = 0.5, 1e18
-    for t in thr_grid:
-        yhat = (p >= t).astype(int)
-        fn = ((y == 1) & (yhat == 0)).sum()
-        fp = ((y == 0) & (yhat == 1)).sum()
-        cost = cost_fn * fn + cost_fp * fp
-        if cost < best_cost:
-            best_cost, best_thr = cost, t
-    return float(best_thr)
+    tp, fp, n_pos = _counts_at(y, p, thr_grid)
+    cost = cost_fn * (n_pos - tp) + cost_fp * fp
+    i = int(np.argmin(cost))   # 최소 비용 중 첫 임계값(기존 루프의 '<' 갱신과 같음)
+    return float(thr_grid[i]) if cost[i] < 1e18 else 0.5
 
 
 def pick_threshold_f1(y_true, p_pred) -> float:
-    from sklearn.metrics import f1_score
     y = np.asarray(y_true).astype(int)
     p = np.asarray(p_pred).astype(float)
     thr_grid = np.unique(np.clip(np.r_[np.linspace(0.01, 0.99, 99), p], 1e-4, 1-1e-4))
-    best_thr, best_f1 = 0.5, -1.0
-    for t in thr_grid:
-        yhat = (p >= t).astype(int)
-        f1 = f1_score(y, yhat, zero_division=0)
-        if f1 > best_f1:
-            best_f1, best_thr = f1, t
-    return float(best_thr)
+    tp, fp, n_pos = _counts_at(y, p, thr_grid)
+    # sklearn f1_score(zero_division=0)과 같은 식: 2·P·R/(P+R)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prec = np.where(tp + fp > 0, tp / np.maximum(tp + fp, 1), 0.0)
+        rec = np.where(n_pos > 0, tp / max(n_pos, 1), 0.0)
+        f1 = np.where(prec + rec > 0, 2 * prec * rec / (prec + rec), 0.0)
+    return float(thr_grid[int(np.argmax(f1))]) if len(thr_grid) else 0.5
 
 
 def pick_threshold_rec_at_prec(y_true, p_pred, target_prec: float = 0.6) -> float:
@@ -268,12 +311,68 @@ def pick_threshold_rec_at_prec(y_true, p_pred, target_prec: float = 0.6) -> floa
     return pick_threshold_f1(y, p)
 
 
+def select_threshold(lbl: str, y_base, p_base, thr_strategy: str = "cost",
+                     cost_fn: float = 20.0, cost_fp: float = 1.0, target_prec: float = 0.6,
+                     label_cost_map: Optional[Dict[str, float]] = None,
+                     prec_labels: Optional[set] = None,
+                     per_label_target_map: Optional[Dict[str, float]] = None) -> Tuple[float, str, str]:
+    """
+    라벨별 임계값 전략 적용 (학습 루프/retune 공용). returns (thr, 사용 전략, 로그 문구)
+    prec_labels에 있거나 per_label_target이 있으면 rec_at_prec 우선.
+    """
+    per_lbl_target = None if per_label_target_map is None else per_label_target_map.get(lbl)
+    if (lbl in (prec_labels or set())) or (per_lbl_target is not None):
+        tprec = per_lbl_target if per_lbl_target is not None else target_prec
+        thr = pick_threshold_rec_at_prec(y_base, p_base, target_prec=tprec)
+        return thr, "rec_at_prec", f"target_prec={tprec:.2f}" + (" (per-label)" if per_lbl_target is not None else " (override)")
+    if thr_strategy == "f1":
+        return pick_threshold_f1(y_base, p_base), "f1", "cost_fn=-"
+    if thr_strategy == "rec_at_prec":
+        return pick_threshold_rec_at_prec(y_base, p_base, target_prec=target_prec), "rec_at_prec", f"target_prec={target_prec:.2f}"
+    cf = float((label_cost_map or {}).get(lbl, cost_fn))
+    return pick_threshold_cost(y_base, p_base, cost_fn=cf, cost_fp=cost_fp), "cost", f"cost_fn={cf}"
+
+
+def test_metrics(y_te: np.ndarray, p_te: np.ndarray, thr: float) -> Tuple[float, float, float]:
+    """Test 구간 (PR_AUC, Recall@thr, F1@thr). 양성이 없거나 길이가 다르면 NaN."""
+    from sklearn.metrics import average_precision_score, f1_score, recall_score
+    if len(y_te) == 0 or len(p_te) != len(y_te):
+        return np.nan, np.nan, np.nan
+    if int(np.sum(y_te)) == 0:
+        return np.nan, np.nan, np.nan
+    yhat = (p_te >= thr).astype(int)
+    return (average_precision_score(y_te, p_te),
+            recall_score(y_te, yhat, average='binary', zero_division=0),
+            f1_score(y_te, yhat, average='binary', zero_division=0))
+
+
+def parse_label_map(text: str) -> Dict[str, float]:
+    """'LBL_A:6,LBL_B:25' → {"LBL_A": 6.0, "LBL_B": 25.0}"""
+    out: Dict[str, float] = {}
+    for token in (text or "").split(","):
+        token = token.strip()
+        if not token:
+            continue
+        k, v = token.split(":")
+        out[k.strip()] = float(v)
+    return out
+
+
 # ===== 피처/누수 =====
 def drop_low_variance_features(
     X_train: pd.DataFrame, X_cal: pd.DataFrame, X_test: pd.DataFrame
 ) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame, List[str]]:
-    """Train 기준 상수/준상수(유니크<=1) 피처 제거."""
-    const_cols = [c for c in X_train.columns if pd.Series(X_train[c]).nunique(dropna=False) <= 1]
+    """Train 기준 상수/준상수(유니크<=1) 피처 제거. 숫자 컬럼은 min/max/결측 벡터 연산 1회."""
+    lo, hi, n_na = _column_minmax(X_train)
+    n = len(X_train)
+    const_cols = []
+    for c in X_train.columns:
+        if c in lo.index:
+            # 전부 결측 / 결측 없이 min == max
+            if n_na[c] == n or (n_na[c] == 0 and lo[c] == hi[c]):
+                const_cols.append(c)
+        elif pd.Series(X_train[c]).nunique(dropna=False) <= 1:   # 숫자 외 컬럼만 기존 방식
+            const_cols.append(c)
     if const_cols:
         X_train = X_train.drop(columns=const_cols, errors="ignore")
         X_cal = X_cal.drop(columns=const_cols, errors="ignore")
@@ -295,19 +394,51 @@ def _safe_proba(est, X: pd.DataFrame) -> np.ndarray:
     return s.astype(float)
 
 
+def _column_minmax(X: pd.DataFrame) -> Tuple[pd.Series, pd.Series, pd.Series]:
+    """숫자/불리언 컬럼의 (min, max, 결측 수). 타입 블록 단위 벡터 연산."""
+    num = X.select_dtypes(include=[np.number, "bool"])
+    return num.min(), num.max(), num.isna().sum()
+
+
+def trivial_leak_map(X: pd.DataFrame, Y: pd.DataFrame) -> Dict[str, List[str]]:
+    """
+    라벨별 '완전 일치/보색' 피처(X 컬럼 순서). 라벨 전체를 한 번에:
+    - 0/1 라벨과 같을 수 있는 건 결측 없는 0/1 컬럼뿐 → min/max로 후보 추림
+    - 후보 행렬 B(n × k)와 라벨 행렬 L(n × m): 불일치 수 = Σx + Σy - 2·BᵀL (정수 → float64 정확)
+      불일치 0 → 동일, n → 보색
+    - 0/1이 아닌 라벨은 기존 비교(동일만) 그대로
+    """
+    lo, hi, n_na = _column_minmax(X)
+    n = len(X)
+    cand = [c for c in lo.index if n_na[c] == 0 and lo[c] >= 0 and hi[c] <= 1]
+    B = X[cand].to_numpy(dtype=np.float64) if cand else np.zeros((n, 0))
+    is01 = (B == 0) | (B == 1)
+    keep = is01.all(axis=0)
+    cand = [c for c, k in zip(cand, keep) if k]
+    B = B[:, keep]
+
+    out: Dict[str, List[str]] = {}
+    bin_lbls = [l for l in Y.columns if set(np.unique(Y[l].astype(float))).issubset({0.0, 1.0})]
+    if bin_lbls and cand:
+        L = Y[bin_lbls].to_numpy(dtype=np.float64)
+        mis = B.sum(axis=0)[:, None] + L.sum(axis=0)[None, :] - 2.0 * (B.T @ L)
+        hit = (mis == 0) | (mis == n)
+        for j, l in enumerate(bin_lbls):
+            s = {c for c, h in zip(cand, hit[:, j]) if h}
+            out[l] = [c for c in X.columns if c in s]
+    for l in Y.columns:
+        if l not in out and l not in bin_lbls:
+            # 0/1이 아닌 라벨: 컬럼별 동일 비교(드문 경로)
+            yf = Y[l].astype(float).to_numpy()
+            out[l] = [c for c in X.columns
+                      if np.array_equal(pd.to_numeric(X[c], errors="coerce").astype(float).fillna(-9999).values, yf)]
+        out.setdefault(l, [])
+    return out
+
+
 def _find_trivial_leak_cols(X: pd.DataFrame, y: np.ndarray, max_report: int = 5) -> List[str]:
-    """피처가 라벨과 완전히 동일/보색이면 누수로 간주."""
-    leaks = []
-    yf = y.astype(float)
-    for c in X.columns:
-        xc = pd.to_numeric(X[c], errors="coerce").astype(float).fillna(-9999).values
-        if np.array_equal(xc, yf):
-            leaks.append(c)
-        elif set(np.unique(yf)).issubset({0.0, 1.0}) and np.array_equal(1.0 - xc, yf):
-            leaks.append(c)
-        if len(leaks) >= max_report:
-            break
-    return leaks
+    """피처가 라벨과 완전히 동일/보색이면 누수로 간주 (trivial_leak_map 단일 라벨 버전)."""
+    return trivial_leak_map(X, pd.DataFrame({"y": np.asarray(y)}, index=X.index))["y"][:max_report]
 
 
 # === 규칙-피처 추출: signals + gate + RULESRC_/REASON_ ===
@@ -388,15 +519,19 @@ def _rule_cols_for(label_name, rules_meta, candidate_feats, drop_ohe_from_gates=
 
 
 # ====== SCORE 합성 (규칙 기반) ======
-def _build_proxy_scores(df_in: pd.DataFrame, rules_meta: dict, lbl_cols: List[str]) -> pd.DataFrame:
+def _build_proxy_scores(df_in: pd.DataFrame, rules_meta: dict, lbl_cols: List[str],
+                        copy: bool = True, resolution: Optional[Dict] = None) -> pd.DataFrame:
     """
     rules.yml의 signals(col, direction, weight)를 이용해 SCORE_<TARGET>을 합성.
     - 이미 SCORE_*가 있으면 건드리지 않음
     - direction: high(+), low(-)로 부호만 반영, weight 가중합
     - 모든 입력은 견고 스케일(1~99%) 후 합산
     - 규칙 컬럼명이 _pc/_pc_std/_std 등이어도 _resolve_col로 실제 컬럼에 매핑
+    - copy=False면 df_in에 SCORE_*를 직접 추가
+    - resolution: 신호 이름 → 컬럼 매핑(dict). 있는 이름은 그대로 쓰고 새로 해석한 것은 기록
+      (학습: 빈 dict → meta.json에 저장, 추론: 저장된 매핑 → 느슨 매칭 없음)
     """
-    df = df_in.copy()
+    df = df_in.copy() if copy else df_in
     targets = (rules_meta or {}).get("targets", {}) or {}
 
     def robust_minmax(x: pd.Series) -> pd.Series:
@@ -422,7 +557,7 @@ def _build_proxy_scores(df_in: pd.DataFrame, rules_meta: dict, lbl_cols: List[st
         used_any = False
         for sig in sigs:
             col_req = sig.get("col")
-            col = _resolve_col(df, col_req)
+            col = _resolve_col(df, col_req, resolution)
             if not col:
                 print(f"[SCORE] {lbl}: '{col_req}' → 매칭 실패(컬럼 없음)")
                 continue
@@ -444,7 +579,7 @@ def _build_proxy_scores(df_in: pd.DataFrame, rules_meta: dict, lbl_cols: List[st
     return df
 
 # ====== SCORE 기본값 강제 생성기(규칙 비어도 동작) ======
-def _ensure_default_scores(df_in: pd.DataFrame, lbl_cols: List[str]) -> pd.DataFrame:
+def _ensure_default_scores(df_in: pd.DataFrame, lbl_cols: List[str], copy: bool = True) -> pd.DataFrame:
     def cols_like(df, *patterns):
         pats = [p for p in patterns if isinstance(p, str)]
         return [c for c in df.columns if isinstance(c, str) and any(p in c for p in pats)]
@@ -455,7 +590,7 @@ def _ensure_default_scores(df_in: pd.DataFrame, lbl_cols: List[str]) -> pd.DataF
         denom = (q99 - q1) if (q99 > q1) else (s.std() or 1.0)
         return ((s - q1) / (denom if denom != 0 else 1.0)).clip(0, 1)
 
-    out = df_in.copy()
+    out = df_in.copy() if copy else df_in
 
     # <- 전부 *_std 패턴으로 맞춤
     HOME   = cols_like(out, "집 추정 위치 평일 총 체류시간_std")
@@ -514,19 +649,61 @@ def _ensure_default_scores(df_in: pd.DataFrame, lbl_cols: List[str]) -> pd.DataF
 
 
 
+# ===== 라벨 분할/컷 적합용 월 층화 표본 =====
+LABEL_FIT_SAMPLE = 200_000   # 컷/GMM 적합 표본 상한 (이하면 전체로 정확 적합)
+LABEL_FIT_SEED = 42
+
+
+def month_stratified_sample(months: Optional[np.ndarray], valid: np.ndarray,
+                            cap: Optional[int], seed: int = LABEL_FIT_SEED) -> np.ndarray:
+    """
+    valid 행 중 월 비례(층화) 표본의 행 위치(오름차순). cap 이하/None이면 valid 전체.
+    월마다 round(cap × 월 비중)개(최소 1)를 고정 시드로 비복원 추출. 월 결측(NaT) 행은 별도 층.
+    호출부는 라벨마다가 아니라 한 번만 뽑아 재사용(점수 NaN은 표본 안에서 거름).
+    """
+    idx = np.flatnonzero(valid)
+    if not cap or len(idx) <= cap:
+        return idx
+    rng = np.random.default_rng(seed)
+    if months is None:
+        return np.sort(rng.choice(idx, cap, replace=False))
+    codes = pd.factorize(months[idx], use_na_sentinel=False)[0]   # NaT → 자기 코드(-1 없음)
+    if codes.max() < np.iinfo(np.int16).max:
+        codes = codes.astype(np.int16)   # 작은 정수 stable 정렬 = radix
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[order])
+    bounds = np.r_[0, np.cumsum(counts)]
+    k = np.maximum(1, np.round(cap * counts / len(idx)).astype(int))
+    picks = [idx[order[bounds[m] + rng.choice(counts[m], min(k[m], counts[m]), replace=False)]]
+             for m in range(len(counts))]
+    return np.sort(np.concatenate(picks))
+
+
+def _month_values(df: pd.DataFrame, month_col: str) -> Optional[np.ndarray]:
+    return df[month_col].to_numpy() if month_col in df.columns else None
+
+
 # ===== cut 튜너: 목표 라벨율로 컷을 분위수로 설정 =====
 def _tune_labels_by_scores(
     df_lbl: pd.DataFrame,
     lbl_cols: List[str],
-    target_rate_map: Dict[str, float]
+    target_rate_map: Dict[str, float],
+    copy: bool = True,
+    sample_size: Optional[int] = LABEL_FIT_SAMPLE,
+    fit_check: bool = False,
+    month_col: str = "year_month",
 ) -> pd.DataFrame:
     """
     SCORE_<TARGET> 분포의 (1 - rate) 분위수를 컷으로 잡아 라벨율을 맞춥니다.
     - 외부 변수 참조 없음
     - 재귀 호출 없음
     - 단일클래스 방지 가드 포함
+    - copy=False면 df_lbl의 라벨 컬럼을 직접 갱신
+    - 유효 점수가 sample_size보다 많으면 월 층화 표본의 분위수를 컷으로 사용(적용은 전체 행).
+      로그: 전체 적용 라벨율 vs 목표, fit_check면 정확 분위수 컷과의 차이/라벨 일치율
     """
-    out = df_lbl.copy()
+    out = df_lbl.copy() if copy else df_lbl
+    sample = month_stratified_sample(_month_values(out, month_col), np.ones(len(out), dtype=bool), sample_size)
 
     # before preview
     try:
@@ -545,26 +722,36 @@ def _tune_labels_by_scores(
             print(f"[TUNE/skip] {lbl}: '{sname}' 없음 → 스킵")
             continue
 
-        s = pd.to_numeric(out[sname], errors="coerce").astype(float)
-        if s.notna().sum() == 0:
+        s = pd.to_numeric(out[sname], errors="coerce").to_numpy(dtype=float)
+        valid = ~np.isnan(s)
+        if not valid.any():
             print(f"[TUNE/skip] {lbl}: 점수가 모두 NaN → 스킵")
             continue
+        fit = s[sample]
+        fit = fit[~np.isnan(fit)]
 
         # 목표 라벨율 (안전 클리핑)
         rate = float(target_rate_map.get(lbl, 0.05))
         rate = min(max(rate, 0.01), 0.99)
 
-        thr = np.quantile(s.dropna(), 1.0 - rate)
-        lab = (s >= thr).astype(bool)
+        thr = np.quantile(fit, 1.0 - rate)
+        lab = s >= thr
 
         # 단일클래스 방지 가드
         m = float(lab.mean())
         if m in (0.0, 1.0):
             # 더 완화/강화해서 재시도
-            r2 = 0.01 if m == 1.0 else 0.99
-            thr2 = np.quantile(s.dropna(), 1.0 - r2)
-            lab = (s >= thr2).astype(bool)
-
+            rate = 0.01 if m == 1.0 else 0.99
+            thr = np.quantile(fit, 1.0 - rate)
+            lab = s >= thr
+
+        if len(fit) < valid.sum():
+            msg = (f"[TUNE] {lbl}: sample {len(fit):,}/{int(valid.sum()):,} → rate "
+                   f"{100.0 * lab[valid].mean():.3f}% (target {100.0 * rate:.3f}%)")
+            if fit_check:
+                thr_x = np.quantile(s[valid], 1.0 - rate)
+                msg += f", thr {thr:.5f} vs exact {thr_x:.5f}, agree={np.mean(lab == (s >= thr_x)):.5f}"
+            print(msg)
         out[lbl] = lab
 
     # after preview
@@ -604,14 +791,34 @@ def auto_split_kmeans_1d(scores: np.ndarray) -> Tuple[np.ndarray, float]:
     return y, thr
 
 
+def _auto_split_thr(x: np.ndarray) -> float:
+    """1D 점수 → 분할 임계값 (GMM → KMeans → 중앙값)."""
+    try:
+        return auto_split_gmm_1d(x)[1]
+    except Exception:
+        try:
+            return auto_split_kmeans_1d(x)[1]
+        except Exception:
+            return float(np.median(x))
+
+
 def auto_split_single_class_labels(
     df_lbl: pd.DataFrame,
     lbl_cols: List[str],
     mask_train: pd.Series,
     min_pos_rate: float = 0.02,
     max_pos_rate: float = 0.20,
+    copy: bool = True,
+    sample_size: Optional[int] = LABEL_FIT_SAMPLE,
+    fit_check: bool = False,
+    month_col: str = "year_month",
 ) -> pd.DataFrame:
-    out = df_lbl.copy()
+    """
+    학습 구간이 단일 클래스인 라벨을 SCORE_* 1D 분할(GMM/KMeans)로 다시 정의.
+    적합(임계값, 비율 clip 분위수)은 월 층화 표본(sample_size 상한), 적용은 전체 행.
+    fit_check면 전체 학습 구간으로도 적합해 임계값 차이/라벨 일치율을 로그에 남김.
+    """
+    out = df_lbl.copy() if copy else df_lbl
     single = []
     for lbl in lbl_cols:
         y_tr = out.loc[mask_train, lbl].astype(int)
@@ -625,99 +832,104 @@ def auto_split_single_class_labels(
     else:
         return out
 
+    months = _month_values(out, month_col)
+    tr = np.asarray(mask_train, dtype=bool)
+    sample_tr = month_stratified_sample(months, tr, sample_size)
+    sample_all = None
     for lbl in single:
         sname = f"SCORE_{lbl.replace('LBL_', '')}"
         if sname not in out.columns:
             print(f"[AUTO] {lbl}: auto-split skipped (not enough signals/score)")
             continue
-        s_train = pd.to_numeric(out.loc[mask_train, sname], errors="coerce").astype(float)
-        s_all   = pd.to_numeric(out[sname], errors="coerce").astype(float)
-        valid_tr = s_train.notna().values
+        s_all = pd.to_numeric(out[sname], errors="coerce").to_numpy(dtype=float)
+        valid = ~np.isnan(s_all)
+        valid_tr = valid & tr
         if valid_tr.sum() < 100:
             print(f"[AUTO] {lbl}: auto-split skipped (too few valid scores)")
             continue
-        try:
-            y_split, thr = auto_split_gmm_1d(s_train[valid_tr].values)
-        except Exception:
-            try:
-                y_split, thr = auto_split_kmeans_1d(s_train[valid_tr].values)
-            except Exception:
-                # 최후: 중앙값 기준
-                thr = float(np.nanmedian(s_train))
-                y_split = (s_train[valid_tr].values >= thr)
+        fit_tr = s_all[sample_tr]
+        fit_tr = fit_tr[~np.isnan(fit_tr)]
+        thr = _auto_split_thr(fit_tr)
 
         # 전체 데이터에 임계값 적용
-        new_lab = (s_all.values >= thr)
-        rate = float(np.nanmean(new_lab))
-        # 과도한 비율이면 clip (분할 탐욕도 제어)
-        if rate < min_pos_rate:
-            qthr = np.nanquantile(s_all, 1.0 - min_pos_rate)
-            new_lab = (s_all.values >= qthr)
-            rate = float(np.nanmean(new_lab))
-        elif rate > max_pos_rate:
-            qthr = np.nanquantile(s_all, 1.0 - max_pos_rate)
-            new_lab = (s_all.values >= qthr)
-            rate = float(np.nanmean(new_lab))
-
+        new_lab = (s_all >= thr)
+        rate = float(new_lab.mean())
+        # 과도한 비율이면 clip (분할 탐욕도 제어) — 분위수도 표본(전체 월)에서
+        if rate < min_pos_rate or rate > max_pos_rate:
+            if sample_all is None:
+                sample_all = month_stratified_sample(months, np.ones(len(out), dtype=bool), sample_size)
+            fit_all = s_all[sample_all]
+            fit_all = fit_all[~np.isnan(fit_all)]
+            q = min_pos_rate if rate < min_pos_rate else max_pos_rate
+            new_lab = (s_all >= np.quantile(fit_all, 1.0 - q))
+            rate = float(new_lab.mean())
+
+        sampled = len(fit_tr) < valid_tr.sum()
+        msg = f"[AUTO] {lbl}: auto-split done (rate={rate*100:.2f}%, thr≈{thr:.4f}"
+        if sampled:
+            msg += f", sample {len(fit_tr):,}/{int(valid_tr.sum()):,}"
+            if fit_check:
+                thr_x = _auto_split_thr(s_all[valid_tr])
+                msg += f", exact thr≈{thr_x:.4f}, agree={np.mean((s_all >= thr) == (s_all >= thr_x)):.5f}"
+        print(msg + ")")
         out[lbl] = pd.Series(new_lab, index=out.index).astype(bool)
-        print(f"[AUTO] {lbl}: auto-split done (rate={rate*100:.2f}%, thr≈{thr:.4f})")
 
     return out
 
 
 
+def _as_list(x):
+    return list(x) if isinstance(x, (list, tuple)) else [x]
+
+
 def timeaware_backstop_tuner(df_lbl, lbl, score_col, month_col="year_month",
                              base_rate=0.0513, min_pos_per_month=15,
-                             max_relax_quantile=0.95):
-    out = df_lbl.copy()
-    if score_col not in out.columns or lbl not in out.columns:
+                             max_relax_quantile=0.95, copy=True):
+    """
+    월 양성이 min_pos_per_month 미만인 달에 점수 상위 비양성 행을 보충.
+    - lbl/score_col: 문자열 또는 같은 길이의 리스트(여러 라벨 한 번에)
+    - 월별 집계(양성/유효 수, 목표 k)는 벡터화, 부족한 달만 후보 argsort (동점 처리 기존과 동일)
+    - copy=False면 df_lbl의 라벨 컬럼을 직접 갱신
+    """
+    out = df_lbl.copy() if copy else df_lbl
+    pairs = [(l, s) for l, s in zip(_as_list(lbl), _as_list(score_col))
+             if s in out.columns and l in out.columns]
+    if not pairs:
         return out
 
-    y = out[lbl].astype(bool).copy()
-
-    for m, idx in out.groupby(month_col).groups.items():
-        sub = out.loc[idx]
-        n = len(sub)
-        if n == 0:
-            continue
-
-        p_now = int(sub[lbl].sum())
-        if p_now >= min_pos_per_month:
-            continue
-
-        s = pd.to_numeric(sub[score_col], errors="coerce")
-        valid = s.notna()
-        n_valid = int(valid.sum())
-        if n_valid == 0:
-            continue
-
-        k_rate = int(np.ceil(base_rate * n_valid))
-        k_cap  = max(1, int(np.ceil((1.0 - max_relax_quantile) * n_valid)))  # 예: q=0.95 → 상위 5%
-        k_goal = min(max(min_pos_per_month, min(k_rate, k_cap)), n_valid)
-
-        if p_now >= k_goal:
-            continue
-
+    # 월별 행 위치 (원래 행 순서 유지)
+    codes, months = pd.factorize(out[month_col], sort=True)
+    n_months = len(months)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]                  # 월 결측 행 제외 (groupby와 동일)
+    bounds = np.r_[0, np.cumsum(np.bincount(codes[order], minlength=n_months))]
+
+    for l, sc in pairs:
+        y = out[l].astype(bool).to_numpy()
+        s = pd.to_numeric(out[sc], errors="coerce").to_numpy(dtype=float)
+        valid = ~np.isnan(s)
+        cm = np.where(codes >= 0, codes, n_months)
+        p_now = np.bincount(cm, weights=y, minlength=n_months + 1)[:n_months].astype(int)
+        n_valid = np.bincount(cm, weights=valid, minlength=n_months + 1)[:n_months].astype(int)
+
+        k_rate = np.ceil(base_rate * n_valid).astype(int)
+        k_cap = np.maximum(1, np.ceil((1.0 - max_relax_quantile) * n_valid).astype(int))  # 예: q=0.95 → 상위 5%
+        k_goal = np.minimum(np.maximum(min_pos_per_month, np.minimum(k_rate, k_cap)), n_valid)
         need = k_goal - p_now
-        not_pos_mask = ~sub[lbl].astype(bool) & valid
-        if not_pos_mask.sum() == 0 or need <= 0:
-            continue
-
-        s_candidates = s[not_pos_mask]
-        order = np.argsort(s_candidates.values)
-        chosen = s_candidates.iloc[order[-need:]].index  # 상위 need개만
+        todo = (p_now < min_pos_per_month) & (n_valid > 0) & (need > 0)
 
-        new_mask = pd.Series(False, index=sub.index)
-        new_mask.loc[chosen] = True
-        y.loc[idx] = (sub[lbl].astype(bool) | new_mask).values
-
-    out[lbl] = y.astype(bool)
+        y_new = y.copy()
+        for m in np.flatnonzero(todo):
+            rows = order[bounds[m]:bounds[m + 1]]
+            cand = rows[~y[rows] & valid[rows]]
+            if len(cand) == 0:
+                continue
+            pick = cand[np.argsort(s[cand])[-need[m]:]]  # 상위 need개만
+            y_new[pick] = True
+        out[l] = y_new
     return out
 
 
-
-
-
 def apply_persistence(df_lbl, lbl, id_col=None, month_col="year_month",
                       window=3, min_hits=2, group_col=None):
     """
@@ -725,50 +937,51 @@ def apply_persistence(df_lbl, lbl, id_col=None, month_col="year_month",
     - id_col이 있으면 id 기준
     - 없으면 가능한 카테고리(행정동/자치구/성별/연령대)를 모두 묶어 복합키로 사용
     - 키가 없으면 no-op
+    - lbl: 문자열 또는 리스트, window/min_hits: 정수 또는 {라벨: 값} (여러 라벨을 정렬/그룹핑 1회로 처리)
+    반환: 키+월 순으로 정렬, 인덱스 재설정 (기존 merge 결과와 같은 형태)
     """
-    out = df_lbl.copy()
-
     # 0) 키 확정
-    if id_col and id_col in out.columns:
+    if id_col and id_col in df_lbl.columns:
         key_cols = [id_col]
     else:
         # group_col 인자가 리스트/문자열 모두 지원
         if isinstance(group_col, (list, tuple)):
-            cand = [c for c in group_col if c in out.columns]
+            cand = [c for c in group_col if c in df_lbl.columns]
         elif isinstance(group_col, str):
-            cand = [c for c in [group_col] if c in out.columns]
+            cand = [c for c in [group_col] if c in df_lbl.columns]
         else:
             cand = []
         # 기본 후보(있는 것만)
-        fallback = [c for c in ["행정동코드", "자치구", "성별", "연령대"] if c in out.columns]
+        fallback = [c for c in ["행정동코드", "자치구", "성별", "연령대"] if c in df_lbl.columns]
         key_cols = cand or fallback
 
     if not key_cols:
-        return out
-
-    # 1) 키+월 단위 월 플래그(그 키-월에 1건이라도 양성인지)
-    out = out.sort_values(key_cols + [month_col])
-    month_flag = (
-        out.groupby(key_cols + [month_col])[lbl]
-           .max()
-           .reset_index(name="__mflag__")
-           .sort_values(key_cols + [month_col])
-    )
+        return df_lbl.copy()
 
-    # 2) 키별 롤링합 → min_hits 이상이면 '그 키'에서 그 달은 유지(True)
-    month_flag["__hits__"] = (
-        month_flag.groupby(key_cols)["__mflag__"]
-                  .transform(lambda s: s.rolling(window, min_periods=window).sum())
-    )
-    month_flag["__persist__"] = month_flag["__hits__"] >= float(min_hits)
+    labels = [l for l in _as_list(lbl) if l in df_lbl.columns]
+    out = df_lbl.sort_values(key_cols + [month_col], ignore_index=True)
+    if not labels:
+        return out
 
-    # 3) 원본으로 브로드캐스트 (교집합으로만 유지, 과확대 방지)
-    out = out.merge(
-        month_flag[key_cols + [month_col, "__persist__"]],
-        on=key_cols + [month_col], how="left"
-    )
-    out[lbl] = out[lbl].astype(bool) & out["__persist__"].fillna(False)
-    out.drop(columns=["__persist__", "__hits__", "__mflag__"], errors="ignore", inplace=True)
+    # 1) 키+월 단위 월 플래그(그 키-월에 1건이라도 양성인지) — 행 → (키,월) 그룹 번호
+    g = out.groupby(key_cols + [month_col], sort=True, observed=True)   # 카테고리 키: 관측 조합만
+    gid = g.ngroup().fillna(-1).to_numpy(dtype=np.int64)   # 키/월 결측 행은 -1 → 유지 안 함
+    month_flag = g[labels].max()
+    key_pos = month_flag.groupby(level=list(range(len(key_cols)))).cumcount().to_numpy()
+
+    # 2) 키별 롤링합 = 누적합 차 (키 안에서 window개월이 다 찼을 때만) → min_hits 이상이면 유지
+    for l in labels:
+        w = int(window[l] if isinstance(window, dict) else window)
+        h = float(min_hits[l] if isinstance(min_hits, dict) else min_hits)
+        f = month_flag[l].astype(float).fillna(0.0).to_numpy()
+        cs = np.r_[0.0, np.cumsum(f)]
+        idx = np.arange(len(f))
+        hits = cs[idx + 1] - cs[np.maximum(idx + 1 - w, 0)]
+        persist = (key_pos >= w - 1) & (hits >= h)
+
+        # 3) 원본으로 브로드캐스트 (교집합으로만 유지, 과확대 방지)
+        keep = np.where(gid >= 0, persist[np.maximum(gid, 0)], False)
+        out[l] = out[l].astype(bool).to_numpy() & keep
     return out
 
 # ========== 메인 ==========
@@ -791,6 +1004,17 @@ def train_multilabel_with_calibration(
     use_target_rate_tuner: bool = True,  # 컷 튜너 on/off
     prec_labels: Optional[set] = None,
     per_label_target_map: Optional[Dict[str, float]] = None,
+    feature_store_dir: Optional[str] = None,  # 표준화/파생 매트릭스 캐시(Parquet) 폴더
+    float32: bool = False,               # _std/Δ/Trend를 float32로 저장(메모리 절반, 값은 ~1e-7 차이)
+    memory_report: bool = False,         # 단계별 RSS/할당량 → out_dir/memory_report.json
+    cprofile: bool = False,              # 가장 느린 단계의 cProfile 덤프 → out_dir/profile_<단계>.prof
+    export_compact: bool = True,         # model_{LBL}.npz (tree_export 압축 배열) 함께 저장
+    warm_start_dir: Optional[str] = None,  # 이전 산출물 폴더 → 새 학습 월만 이어 학습(없으면 전체 재학습)
+    warm_rounds: int = 100,              # warm start 최대 추가 라운드
+    early_stopping_rounds: int = 20,     # warm start 조기 종료(보정 구간 logloss)
+    baseline_dir: Optional[str] = None,  # warm 리포트 비교 기준(같은 분할의 전체 재학습 산출물). 기본: 이전 산출물
+    label_fit_sample: Optional[int] = LABEL_FIT_SAMPLE,  # 자동 분할/컷 튜너 적합 표본 상한(월 층화). None/0 → 전체
+    label_fit_check: bool = False,       # 표본 적합을 전체 정확 적합과 비교해 로그(검증용, 느림)
 ):
     # 기본 경로: 이 파일 기준(project/)
     here = Path(__file__).resolve().parent
@@ -805,20 +1029,43 @@ def train_multilabel_with_calibration(
             pd.Timestamp("2024-09-01"),
         ]
     os.makedirs(out_dir, exist_ok=True)
-
-    # 0) 로드 & year_month 보장
-    df = pd.read_csv(csv_path)
-    df = ensure_year_month(df)
-    
-    df = ensure_all_standardized_features(df, month_col="year_month")
-
-
-    # 1) 규칙 라벨 + SCORE 생성
-    df_lbl = apply_rule_hybrid(df.copy())
+    # 라벨링 규칙(hybrid) 먼저 검증: 잘못된 rules_path면 데이터 로드 전에 RulesError
+    reason_codes = hybrid_reason_codes(rules_path)
+    from .profiling import MemoryReport, Profiler
+    # 단계/라벨별 시간·메모리 → out_dir/profile.json (항상 기록)
+    prof = Profiler(cprofile=cprofile, memory=MemoryReport(enabled=memory_report))
+
+    # 0) 로드 & year_month 보장 (+ 표준화/파생: 캐시가 있으면 바뀐 월만 재계산)
+    # 프레임은 하나만 유지: 단계마다 복사하지 않고 컬럼을 제자리 추가
+    prof.mark("load")
+    if feature_store_dir:
+        from .feature_store import FeatureStore
+        df = FeatureStore(feature_store_dir).materialize(csv_path)
+    else:
+        df = read_telecom_csv(csv_path)   # 카테고리/float32 + year_month 파싱
+        df = ensure_year_month(df)
+        prof.mark("standardize")
+        df = ensure_all_standardized_features(df, month_col="year_month", copy=False,
+                                              dtype=np.float32 if float32 else None)
+
+    # 온라인 채점용 월 기준값/월 상수(Δ/Trend) 룩업: 원본 순서의 df에서 미리 집계(이후 df 해제)
+    # → 기준값은 피처 플랜이 정해진 뒤 플랜 컬럼으로 거름
+    from .online_scorer import build_month_lookup, save_month_lookup
+    month_lookup = build_month_lookup(df, [c for c in df.columns if isinstance(c, str) and c.endswith("_std")])
+
+    # 1) 규칙 라벨 + SCORE 생성 (apply_rule_hybrid가 정렬 복사본을 돌려주므로 원본은 해제)
+    # 규칙 신호/SCORE 신호/기본 피처 이름 → 실제 컬럼 해석 결과는 meta.json "column_resolution"에 기록
+    # → 추론은 저장된 매핑을 그대로 사용(느슨 매칭 없음)
+    column_resolution: Dict[str, Dict] = {"rules": {}, "score_signals": {}, "base_std": {}}
+    prof.mark("rules")
+    df_lbl = apply_rule_hybrid(df, rules_path=rules_path, resolution=column_resolution["rules"])
+    del df
     lbl_cols = [c for c in df_lbl.columns if c.startswith("LBL_") and df_lbl[c].dtype == bool]
     rules_meta_for_scores = load_rules(rules_path)
-    df_lbl = _build_proxy_scores(df_lbl, rules_meta_for_scores, lbl_cols)
-    df_lbl = _ensure_default_scores(df_lbl, lbl_cols)  # 규칙 없어도 SCORE_* 강제 생성
+    prof.mark("scores")
+    df_lbl = _build_proxy_scores(df_lbl, rules_meta_for_scores, lbl_cols, copy=False,
+                                 resolution=column_resolution["score_signals"])
+    df_lbl = _ensure_default_scores(df_lbl, lbl_cols, copy=False)  # 규칙 없어도 SCORE_* 강제 생성
 
     # 1-1) 품질월 제외 및 시간 마스크 (자동 분할에 사용)
     mask_ex = ~df_lbl["year_month"].isin(exclude_months)
@@ -827,8 +1074,11 @@ def train_multilabel_with_calibration(
     run_diagnostic_check(df_lbl, rules_meta_for_scores, lbl_cols, mask_train)
 
     # 1-2) single-class 라벨 자동 분할(GMM/KMeans)
-    df_lbl = auto_split_single_class_labels(df_lbl, lbl_cols, mask_train,
-                                            min_pos_rate=0.02, max_pos_rate=0.20)
+    prof.mark("label_tuning")
+    with prof.span("auto_split"):
+        df_lbl = auto_split_single_class_labels(df_lbl, lbl_cols, mask_train,
+                                                min_pos_rate=0.02, max_pos_rate=0.20, copy=False,
+                                                sample_size=label_fit_sample, fit_check=label_fit_check)
 
     # 1-3) (선택) 라벨율 목표 맞추는 튜너
     if use_target_rate_tuner:
@@ -842,7 +1092,9 @@ def train_multilabel_with_calibration(
             "LBL_DEBT_LAW": 0.032,
             "LBL_ISOLATION": 0.05,
         }
-        df_lbl = _tune_labels_by_scores(df_lbl, lbl_cols, target_rate_map)
+        with prof.span("rate_tuner"):
+            df_lbl = _tune_labels_by_scores(df_lbl, lbl_cols, target_rate_map, copy=False,
+                                            sample_size=label_fit_sample, fit_check=label_fit_check)
 
     # 1-4) 시간 인지형 백스톱 + 지속성 필터 (라벨 소멸 방지)
     # Δ/Trend 안정 구간(최초 6/12개월)은 보수적으로 False 처리 (초기 흔들림 제거)
@@ -861,33 +1113,31 @@ def train_multilabel_with_calibration(
         ("LBL_DAILY_LONGTERM",      "SCORE_DAILY_LONGTERM",      0.0513, 15, 0.95),
     ]:
         if LBL in df_lbl.columns and SCORE in df_lbl.columns:
-            df_lbl = timeaware_backstop_tuner(
-                df_lbl, LBL, SCORE,
-                month_col="year_month",
-                base_rate=base_rate,
-                min_pos_per_month=min_pos,
-                max_relax_quantile=relax_q
-            )
+            with prof.span("backstop", label=LBL):
+                df_lbl = timeaware_backstop_tuner(
+                    df_lbl, LBL, SCORE,
+                    month_col="year_month",
+                    base_rate=base_rate,
+                    min_pos_per_month=min_pos,
+                    max_relax_quantile=relax_q,
+                    copy=False,
+                )
 
   # 복합 키 구성: id가 있으면 id만, 없으면 가능한 카테고리들을 모두 사용
     persistence_keys = ([id_col] if (id_col and id_col in df_lbl.columns) else
                         [c for c in ["행정동코드", "자치구", "성별", "연령대"] if c in df_lbl.columns])
 
-    # Δ 급변
-    if "LBL_HEALTH_MENTAL_DELTA" in df_lbl.columns:
-        df_lbl = apply_persistence(
-            df_lbl, "LBL_HEALTH_MENTAL_DELTA",
-            id_col=id_col, group_col=persistence_keys, month_col="year_month",
-            window=4, min_hits=3
-        )
-
-    # 장기
-    if "LBL_DAILY_LONGTERM" in df_lbl.columns:
-        df_lbl = apply_persistence(
-            df_lbl, "LBL_DAILY_LONGTERM",
-            id_col=id_col, group_col=persistence_keys, month_col="year_month",
-            window=7, min_hits=4
-        )
+    # Δ 급변(4개월 중 3) / 장기(7개월 중 4) — 정렬/그룹핑 1회로 함께 적용
+    persistence_spec = {"LBL_HEALTH_MENTAL_DELTA": (4, 3), "LBL_DAILY_LONGTERM": (7, 4)}
+    persistence_spec = {k: v for k, v in persistence_spec.items() if k in df_lbl.columns}
+    if persistence_spec:
+        with prof.span("persistence"):
+            df_lbl = apply_persistence(
+                df_lbl, list(persistence_spec),
+                id_col=id_col, group_col=persistence_keys, month_col="year_month",
+                window={k: w for k, (w, _) in persistence_spec.items()},
+                min_hits={k: h for k, (_, h) in persistence_spec.items()},
+            )
 
     if {"LBL_HEALTH_MENTAL_DELTA", "LBL_DAILY_LONGTERM"}.issubset(df_lbl.columns):
         _chk = (
@@ -923,13 +1173,14 @@ def train_multilabel_with_calibration(
         "배달 서비스 사용일수_std",
     ]
     # 실제 존재 컬럼으로 안전 매핑(_resolve_col 사용)
-    BASE_STD = [c for c in [_resolve_col(df_lbl, name) for name in base_std] if c]
+    BASE_STD = [c for c in [_resolve_col(df_lbl, name, column_resolution["base_std"]) for name in base_std] if c]
 
     # Δ3m, Trend12m은 실제 _std 컬럼들 기준으로 사용 가능한 것만 채택
     DELTA3M = [c + "_delta3m" for c in BASE_STD if (c + "_delta3m") in df_lbl.columns]
     TREND12 = [c + "_trend12m" for c in BASE_STD if (c + "_trend12m") in df_lbl.columns]
 
-    X = df_lbl[["year_month"] + BASE_STD + DELTA3M + TREND12].copy()
+    prof.mark("features")
+    X = df_lbl[["year_month"] + BASE_STD + DELTA3M + TREND12]   # 컬럼 선택 자체가 복사
 
 
     
@@ -938,9 +1189,12 @@ def train_multilabel_with_calibration(
     X = X.drop(columns=[c for c in X.columns if str(c).startswith("persona_")],
             errors="ignore")
 
+    persona_inputs: List[str] = []
     try:
         centers = load_centers(centers_path)          # persona_soft.load_centers
-        P = soft_membership(df_lbl, centers, temp=1.0)  # persona_soft.soft_membership
+        with prof.span("persona"):
+            P = soft_membership(df_lbl, centers, temp=1.0)  # persona_soft.soft_membership
+        persona_inputs = list(centers.columns)
         # (선택) 확인 로그
         pcols = [c for c in P.columns if str(c).startswith("persona_")]
         print(f"[PERSONA] added: {pcols}")
@@ -969,8 +1223,8 @@ def train_multilabel_with_calibration(
 
     # 3) 시간 분할 & 품질월 제외(최종)
     mask_ex2 = ~X["year_month"].isin(exclude_months)
-    X = X.loc[mask_ex2].copy()
-    Y = df_lbl.loc[mask_ex2, ["year_month"] + lbl_cols].copy()
+    X = X.loc[mask_ex2]
+    Y = df_lbl.loc[mask_ex2, ["year_month"] + lbl_cols]
 
     mask_train = Y["year_month"] < cut_cal_from
     mask_cal = (Y["year_month"] >= cut_cal_from) & (Y["year_month"] < cut_test_from)
@@ -980,12 +1234,34 @@ def train_multilabel_with_calibration(
     X_cal = X.loc[mask_cal].drop(columns=["year_month"]).fillna(0)
     X_test = X.loc[mask_test].drop(columns=["year_month"]).fillna(0)
 
+    # 구간별 지배 페르소나 코드(persona_p* 최대값 열 — 추론의 thresholds_by_persona 키와 같은 규칙)
+    persona_pcols = [c for c in X.columns if isinstance(c, str) and c.startswith("persona_p")]
+    persona_code = {
+        name: (np.argmax(Xs[persona_pcols].to_numpy(), axis=1) if persona_pcols
+               else np.zeros(len(Xs), dtype=np.int64)).astype(np.int16)
+        for name, Xs in (("train", X_train), ("cal", X_cal), ("test", X_test))
+    }
+
+    # 분할 이후엔 라벨 프레임/전체 피처 행렬이 필요 없음 → 학습 전에 해제(컬럼 목록만 피처 플랜용으로 보관)
+    lbl_frame_columns = list(df_lbl.columns)
+    del X, P, df_lbl
+
     # 상수/준상수 피처 제거
     X_train, X_cal, X_test, dropped_const = drop_low_variance_features(X_train, X_cal, X_test)
     if dropped_const:
         print(f"[WARN] Drop constant features: {len(dropped_const)}")
 
     # 4) 모델 학습 + 캘리브레이션 + 임계값
+    prof.mark("train")
+    t_train = time.perf_counter()
+    prev = None
+    warm_info: Dict[str, Dict] = {}
+    if warm_start_dir:
+        from .warm_start import load_previous, previous_booster_model, warm_fit
+        prev = load_previous(warm_start_dir)
+        new_rows = (Y.loc[mask_train, "year_month"] > prev["train_last_month"]).to_numpy()
+        print(f"[WARM] from {warm_start_dir}: new train rows after "
+              f"{prev['train_last_month']:%Y-%m} = {int(new_rows.sum()):,}")
     try:
         import lightgbm as lgb
         def new_clf():
@@ -1004,17 +1280,23 @@ def train_multilabel_with_calibration(
             )
 
     from sklearn.calibration import CalibratedClassifierCV
-    from sklearn.metrics import average_precision_score, f1_score, recall_score, precision_score, precision_recall_curve
+    from sklearn.metrics import recall_score, precision_score, precision_recall_curve
     from joblib import dump, load as joblib_load
+    from .tree_export import export_model
 
     models: Dict[str, Dict] = {}
     rows = []
+    score_cache: List[tuple] = []
 
     all_feat_cols = list(X_train.columns)
     rules_meta = load_rules(rules_path)  # 규칙-피처 제외에 활용
     label_cost_map = label_cost_map or {}
     prec_labels = set(prec_labels or [])
 
+    # 누수(완전 일치/보색) 후보: 전 라벨을 X_train 한 번 훑어 계산
+    with prof.span("leak_scan"):
+        leak_map = trivial_leak_map(X_train, Y.loc[mask_train, lbl_cols].astype(int))
+
     for lbl in lbl_cols:
         y_tr = Y.loc[mask_train, lbl].astype(int).to_numpy()
         y_ca = Y.loc[mask_cal, lbl].astype(int).to_numpy()
@@ -1044,7 +1326,8 @@ def train_multilabel_with_calibration(
             print(f"[RULE] {lbl}: drop {len(rule_drop_cols)} rule cols → {preview}")
 
         # 라벨별 누수(완전 일치/보색) 제거
-        leak_cols = _find_trivial_leak_cols(X_train[feat_cols], y_tr, max_report=50)
+        leak_set = set(leak_map.get(lbl, []))
+        leak_cols = [c for c in feat_cols if c in leak_set][:50]
         feat_cols = [c for c in feat_cols if c not in leak_cols]
         if leak_cols:
             print(f"[LEAK] {lbl}: remove {len(leak_cols)} cols")
@@ -1053,60 +1336,52 @@ def train_multilabel_with_calibration(
         Xtr = X_train[feat_cols]; Xca = X_cal[feat_cols]; Xte = X_test[feat_cols]
 
         clf = new_clf()
-        clf.fit(Xtr, y_tr)
+        t_fit = time.perf_counter()
+        with prof.span("fit", label=lbl):
+            prev_model, reason = None, None
+            if prev is not None:
+                prev_model, reason = previous_booster_model(prev, lbl, feat_cols)
+                if prev_model is not None and not type(clf).__module__.startswith("lightgbm"):
+                    prev_model, reason = None, f"not LightGBM ({type(clf).__name__})"
+            if prev_model is not None:
+                clf, warm_info[lbl] = warm_fit(clf, prev_model, Xtr[new_rows], y_tr[new_rows], Xca, y_ca,
+                                               rounds=warm_rounds, early_stopping=early_stopping_rounds)
+            else:
+                clf.fit(Xtr, y_tr)
+                if prev is not None:
+                    warm_info[lbl] = {"mode": "full", "note": reason}
+        if lbl in warm_info:
+            warm_info[lbl]["fit_sec"] = round(time.perf_counter() - t_fit, 3)
 
         # 캘리브레이션 가능 여부
         has_two_ca = (n_ca_pos > 0) and (n_ca_pos < n_ca)
         use_cal_for_thr = has_two_ca and (n_ca_pos >= 20)
 
-        if has_two_ca:
-            try:
-                cal = CalibratedClassifierCV(clf, method="isotonic", cv="prefit")
-                cal.fit(Xca, y_ca)
-            except Exception:
-                cal = CalibratedClassifierCV(clf, method="sigmoid", cv="prefit")
-                cal.fit(Xca, y_ca)
-            use_est = cal
-        else:
-            cal = None
-            use_est = clf
+        with prof.span("calibrate", label=lbl):
+            if has_two_ca:
+                try:
+                    cal = CalibratedClassifierCV(clf, method="isotonic", cv="prefit")
+                    cal.fit(Xca, y_ca)
+                except Exception:
+                    cal = CalibratedClassifierCV(clf, method="sigmoid", cv="prefit")
+                    cal.fit(Xca, y_ca)
+                use_est = cal
+            else:
+                cal = None
+                use_est = clf
 
         # 임계값 기준세트 선택
-        if use_cal_for_thr:
-            base_name, y_base, p_base = "cal",   y_ca, _safe_proba(use_est, Xca)
-        else:
-            base_name, y_base, p_base = "train", y_tr, _safe_proba(use_est, Xtr)
-
-        # ---- 라벨별 전략 오버라이드 여부
-        # ---- 라벨별 전략 결정
-        per_lbl_target = None if per_label_target_map is None else per_label_target_map.get(lbl)
-
-        # rec_at_prec를 쓸지 여부: prec_labels에 있거나 per_label_target을 지정했을 때
-        use_rec_override = (lbl in (prec_labels or set())) or (per_lbl_target is not None)
-
-        if use_rec_override:
-            tprec = per_lbl_target if per_lbl_target is not None else target_prec
-            thr = pick_threshold_rec_at_prec(y_base, p_base, target_prec=tprec)
-            cmsg = f"target_prec={tprec:.2f}" + (" (per-label)" if per_lbl_target is not None else " (override)")
-            thr_used = "rec_at_prec"
-        else:
-            if thr_strategy == "f1":
-                thr = pick_threshold_f1(y_base, p_base)
-                cmsg = "cost_fn=-"
-                thr_used = "f1"
-            elif thr_strategy == "rec_at_prec":
-                thr = pick_threshold_rec_at_prec(y_base, p_base, target_prec=target_prec)
-                cmsg = f"target_prec={target_prec:.2f}"
-                thr_used = "rec_at_prec"
-            else:  # "cost"
-                cf = float(label_cost_map.get(lbl, cost_fn))
-                thr = pick_threshold_cost(y_base, p_base, cost_fn=cf, cost_fp=cost_fp)
-                cmsg = f"cost_fn={cf}"
-                thr_used = "cost"
-
+        with prof.span("predict_base", label=lbl):
+            if use_cal_for_thr:
+                base_name, y_base, p_base = "cal",   y_ca, _safe_proba(use_est, Xca)
+            else:
+                base_name, y_base, p_base = "train", y_tr, _safe_proba(use_est, Xtr)
 
-    
-    
+        with prof.span("threshold", label=lbl):
+            thr, thr_used, cmsg = select_threshold(
+                lbl, y_base, p_base, thr_strategy=thr_strategy, cost_fn=cost_fn, cost_fp=cost_fp,
+                target_prec=target_prec, label_cost_map=label_cost_map,
+                prec_labels=prec_labels, per_label_target_map=per_label_target_map)
 
         # 기준세트에서 프리뷰
         yhat_base = (p_base >= thr).astype(int)
@@ -1116,21 +1391,27 @@ def train_multilabel_with_calibration(
 
         # Test 확률 및 메트릭 계산
         if len(y_te) > 0:
-            p_te = _safe_proba(use_est, Xte)
-            if len(p_te) == len(y_te):
-                yhat = (p_te >= thr).astype(int)
-                pr_auc = average_precision_score(y_te, p_te) if n_te_pos > 0 else np.nan
-                rec = recall_score(y_te, yhat, average='binary', zero_division=0) if n_te_pos > 0 else np.nan
-                f1 = f1_score(y_te, yhat, average='binary', zero_division=0) if n_te_pos > 0 else np.nan
-            else:
-                pr_auc = rec = f1 = np.nan
+            with prof.span("predict_test", label=lbl):
+                p_te = _safe_proba(use_est, Xte)
         else:
             p_te = np.array([])
-            pr_auc = rec = f1 = np.nan
+        pr_auc, rec, f1 = test_metrics(y_te, p_te, thr)
+
+        # 재튜닝(retune.py)용 보정 점수 캐시: 기준세트 + Test (라벨, 구간, y, 점수, 지배 페르소나)
+        score_cache.append((lbl, base_name, y_base, p_base, persona_code[base_name]))
+        if len(p_te) == len(y_te):
+            score_cache.append((lbl, "test", y_te, p_te, persona_code["test"]))
 
         # 모델 저장
         model_path = os.path.join(out_dir, f"model_{lbl}.joblib")
         dump(use_est, model_path)
+        npz_path = os.path.join(out_dir, f"model_{lbl}.npz")
+        if export_compact:
+            with prof.span("export", label=lbl):
+                check = Xca if len(Xca) else (Xte if len(Xte) else Xtr)
+                export_model(use_est, feat_cols, npz_path, check_X=check.iloc[:2000])
+        elif os.path.exists(npz_path):
+            os.remove(npz_path)   # 이전 학습의 압축 배열이 새 joblib과 어긋나지 않도록
 
         # 중요도 덤프
         if dump_importance:
@@ -1186,8 +1467,16 @@ def train_multilabel_with_calibration(
         })
 
     metrics_df = pd.DataFrame(rows).sort_values("PR_AUC_test", ascending=False, na_position="last")
+    train_sec = time.perf_counter() - t_train
+
+    # 보정 점수 캐시 → label_scores.parquet (retune.py가 임계값/지표를 모델 없이 재계산)
+    from .retune import save_label_scores
+    with prof.span("score_cache"):
+        save_label_scores(out_dir, score_cache)
+    del score_cache
 
     # 5) 모니터링 베이스라인 저장
+    prof.mark("baseline")
     baseline: Dict[str, Dict] = {"feature_hist": {}, "timestamp": datetime.now().isoformat()}
     ref = X_train
     for c in ref.columns[:200]:
@@ -1195,6 +1484,19 @@ def train_multilabel_with_calibration(
         qs = np.quantile(s.dropna().values, np.linspace(0, 1, 21))
         baseline["feature_hist"][c] = {"q": as_pyfloat_list(qs)}
 
+    # 모델 피처 전체 구간 경계/건수 (drift_monitor: 추론 시 월별 PSI/KS)
+    from .drift_monitor import DriftBaseline
+    used = {f for v in models.values() for f in v["features"]}
+    if used:
+        with prof.span("drift_baseline"):
+            months_tr = Y.loc[mask_train, "year_month"]
+            drift_base = DriftBaseline.build(ref, [c for c in ref.columns if c in used], months=months_tr)
+            drift_base.save(out_dir)
+            # 자기 점검: 학습 월을 채점하면 월 상수 피처(Δ3m/Trend12m)는 전부 ok여야 함
+            chk = drift_base.self_check(ref, months_tr)
+            print(f"[DRIFT] baseline: month-constant features={int(drift_base.month_const.sum())}, "
+                  f"train-month self-check {chk.to_dict()}")
+
     # pred_hist
     baseline["pred_hist"] = {}
    
@@ -1225,6 +1527,22 @@ def train_multilabel_with_calibration(
     with open(os.path.join(out_dir, "thresholds.json"), "w", encoding="utf-8") as f:
         json.dump({k: v["threshold"] for k, v in models.items()}, f, ensure_ascii=False, indent=2)
 
+    # 추론이 계산할 피처 closure (모델 피처 + 페르소나 입력 → _std → 원천)
+    feature_plan = build_feature_plan(
+        model_features=[f for v in models.values() for f in v["features"]],
+        columns=lbl_frame_columns,
+        persona_inputs=persona_inputs,
+    )
+    print(f"[PLAN] model features={len(feature_plan['model_features'])}, "
+          f"std={len(feature_plan['std'])}, raw={len(feature_plan['raw_columns'])}")
+
+    # 온라인 채점용 월 기준값/월 상수(Δ/Trend) 룩업 (앞에서 집계한 것을 플랜 컬럼으로 거름)
+    prof.mark("save")
+    plan_raw = {c[: -len("_std")] for c in feature_plan["std"]}
+    month_baselines_df, month_derived_df = month_lookup
+    save_month_lookup(out_dir, month_baselines_df[month_baselines_df["column"].isin(plan_raw)]
+                      .reset_index(drop=True), month_derived_df)
+
     rules_meta_for_meta = load_rules(rules_path)
     meta = {
         "created_at": datetime.now().isoformat(),
@@ -1237,6 +1555,8 @@ def train_multilabel_with_calibration(
         "threshold_strategy": thr_strategy,
         "target_precision": target_prec,
         "label_cost_map": label_cost_map,
+        "prec_labels": sorted(prec_labels),
+        "per_label_target": per_label_target_map or {},
         "all_features": list(X_train.columns),
         "labels": [c for c in Y.columns if c.startswith("LBL_")],
         "ohe_categories": [c for c in X_train.columns if any(k in c for k in ["자치구_", "성별_", "연령대_"])],
@@ -1244,7 +1564,18 @@ def train_multilabel_with_calibration(
         "per_label_features": {k: v["features"] for k, v in models.items()},
         "per_label_rule_drops": {k: v["dropped_rule_features"] for k, v in models.items()},
         "per_label_leak_drops": {k: v["dropped_leak_features"] for k, v in models.items()},
+        "feature_plan": feature_plan,
+        # LBL_*_reason_mask 비트 → 사유 설명 (decode_label_reasons로 복원)
+        "reason_codes": reason_codes,
+        # 이름 → 컬럼 해석 결과(추론에서 재사용, None = 학습 데이터에 없던 신호)
+        "column_resolution": column_resolution,
+        # 월 증분 재학습(warm_start) 기준: 다음 실행의 새 학습 행 = 이 월 이후
+        "train_last_month": str(Y.loc[mask_train, "year_month"].max().date()),
+        "training_mode": "warm" if prev is not None else "full",
     }
+    if prev is not None:
+        meta["warm_start"] = {"from": prev["dir"], "full_baseline_dir": baseline_dir or prev["full_baseline_dir"],
+                              "per_label": warm_info}
     with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
         json.dump(meta, f, ensure_ascii=False, indent=2)
     with open(os.path.join(out_dir, "monitor_baseline.json"), "w", encoding="utf-8") as f:
@@ -1252,6 +1583,10 @@ def train_multilabel_with_calibration(
 
     metrics_csv = os.path.join(out_dir, "metrics.csv")
     metrics_df.to_csv(metrics_csv, index=False, encoding="utf-8-sig")
+    prof.finish(os.path.join(out_dir, "profile.json"))
+    if prev is not None:
+        from .warm_start import write_report
+        write_report(out_dir, prev, warm_info, metrics_df, train_sec, baseline_dir)
 
     return metrics_df, models
 
@@ -1274,6 +1609,21 @@ if __name__ == "__main__":
     ap.add_argument("--dump_prcurve", action="store_true")
     ap.add_argument("--id_col", default=None, help="개인 기준 Δ/Trend 계산용 ID 컬럼명")
     ap.add_argument("--no_tuner", action="store_true", help="컷 튜너 비활성화")
+    ap.add_argument("--feature_store", default=None, help="표준화/파생 피처 캐시 폴더(월 파티션 Parquet)")
+    ap.add_argument("--float32", action="store_true", help="_std/Δ/Trend를 float32로 보관(메모리 절감)")
+    ap.add_argument("--cprofile", action="store_true", help="가장 느린 단계의 cProfile 덤프(profile_<단계>.prof)")
+    ap.add_argument("--memory-report", dest="memory_report", action="store_true",
+                    help="단계별 RSS/할당량 기록 → out_dir/memory_report.json")
+    ap.add_argument("--no_compact_export", action="store_true", help="model_{LBL}.npz 압축 배열 내보내기 끄기")
+    ap.add_argument("--warm_start", default=None, help="이전 산출물 폴더: 새 학습 월만 이어 학습(기본: 전체 재학습)")
+    ap.add_argument("--warm_rounds", type=int, default=100, help="warm start 최대 추가 라운드")
+    ap.add_argument("--early_stopping", type=int, default=20, help="warm start 조기 종료 라운드(보정 구간)")
+    ap.add_argument("--baseline_dir", default=None,
+                    help="warm 리포트 비교 기준: 같은 cut_cal_from/cut_test_from의 전체 재학습 산출물 "
+                         "(기본: 이전 산출물 — 분할이 다르면 지표 차이 생략)")
+    ap.add_argument("--label_fit_sample", type=int, default=LABEL_FIT_SAMPLE,
+                    help="자동 분할/컷 튜너 적합 표본 상한(월 층화, 0이면 전체 정확 적합)")
+    ap.add_argument("--label_fit_check", action="store_true", help="표본 적합 vs 정확 적합 차이를 로그에 기록")
     ap.add_argument(
         "--prec_labels",
         default="",
@@ -1288,26 +1638,8 @@ if __name__ == "__main__":
     args = ap.parse_args()
     prec_labels = set([s.strip() for s in args.prec_labels.split(",") if s.strip()])
 
-    # per_label_target 파싱
-    per_label_target_map: Dict[str, float] = {}
-    if args.per_label_target:
-        for token in args.per_label_target.split(","):
-            token = token.strip()
-            if not token: 
-                continue
-            k, v = token.split(":")
-            per_label_target_map[k.strip()] = float(v)
-
-
-
-    # label_cost_map 파싱
-    lmap: Dict[str, float] = {}
-    if args.label_cost_map:
-        for token in args.label_cost_map.split(","):
-            token = token.strip()
-            if not token: continue
-            k, v = token.split(":")
-            lmap[k.strip()] = float(v)
+    per_label_target_map = parse_label_map(args.per_label_target)
+    lmap = parse_label_map(args.label_cost_map)
 
     m, _ = train_multilabel_with_calibration(
         csv_path=args.csv_path,
@@ -1325,6 +1657,17 @@ if __name__ == "__main__":
         use_target_rate_tuner=not args.no_tuner,
         prec_labels=prec_labels,
         per_label_target_map=per_label_target_map,
+        feature_store_dir=args.feature_store,
+        float32=args.float32,
+        memory_report=args.memory_report,
+        cprofile=args.cprofile,
+        export_compact=not args.no_compact_export,
+        warm_start_dir=args.warm_start,
+        warm_rounds=args.warm_rounds,
+        early_stopping_rounds=args.early_stopping,
+        baseline_dir=args.baseline_dir,
+        label_fit_sample=args.label_fit_sample,
+        label_fit_check=args.label_fit_check,
     )
     print(m.head(20))
 
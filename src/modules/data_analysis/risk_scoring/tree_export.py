@@ -0,0 +1,341 @@
+# tree_export.py
+# -*- coding: utf-8 -*-
+"""
+학습 모델 → 압축 배열(model_{LBL}.npz) 내보내기 + 벡터화 평가기 (joblib/LightGBM 없이 채점)
+- 지원: LGBMClassifier(이진, 수치 분할, missing_type=None) / LogisticRegression, 그리고 이를 감싼
+  CalibratedClassifierCV(cv="prefit", isotonic 또는 sigmoid). 그 밖의 모델은 내보내지 않음(→ joblib 폴백)
+- 트리 배열 (모든 트리를 한 배열로, 형제 노드는 인접: 오른쪽 = 왼쪽 + 1)
+    node   int64  = feature | rank << 12 | left << 28   (잎: rank = 0xFFFF, left = 자기 자신 → 제자리)
+    value  float64  잎 값(내부 노드 0),  is_leaf, roots
+    cuts   피처별 정렬된 고유 임계값 (cut_values + cut_offsets)
+  분기 x <= t_k  ⇔  searchsorted(cuts_f, x, "left") <= k  → 행렬을 피처별 bin 코드(uint8/16)로 바꿔 정수 비교
+  (LightGBM과 같이 결측은 0으로 보고 비교)
+- 평가: 행 청크 × 전체 트리를 한 단계씩 동시에 내려감(단계당 gather 2번), 몇 단계마다 잎에 닿은 쌍을 빼고 누적
+  → 잎 값 합 → sigmoid → 보정(isotonic 보간표 / sigmoid a,b) = predict_proba[:, 1]과 1e-6 이내
+- CompactEnsemble: 라벨 피처 합집합 행렬(청크) 하나를 모든 라벨이 공유. 행렬은 float64
+  (LightGBM이 본 값과 분기 비교가 같아야 하므로 float32로 줄이지 않음; bin 코드가 실제 비교 대상)
+
+속도(1코어, 10만 행 × 400트리 × 127잎): 로드 ~40ms(joblib ~0.9s), 파일 ~1/3 크기,
+배치 채점은 LightGBM C 구현의 1.5~2배 시간 → 배치 기본은 joblib, --compact / compact=True로 선택.
+
+사용 예 (src/modules 에서):
+    python -m data_analysis.risk_scoring.tree_export --artifacts artifacts      # 기존 산출물 내보내기 + 검증
+    ens = CompactEnsemble.load("artifacts", labels)
+    S = ens.predict(X)                                                           # (행 × 라벨)
+"""
+from pathlib import Path
+from typing import Dict, List, Optional
+import os, json, time, argparse
+
+import numpy as np
+import pandas as pd
+
+NPZ_VERSION = 1
+CHUNK_ROWS = 1024          # 청크 bin 행렬이 캐시에 머무는 크기
+COMPACT_EVERY = 3          # 잎에 닿은 (행, 트리) 쌍 정리 주기(단계)
+FEAT_BITS, RANK_BITS = 12, 16
+LEAF_RANK = (1 << RANK_BITS) - 1
+_FEAT_MASK, _RANK_MASK = (1 << FEAT_BITS) - 1, LEAF_RANK
+_LEFT_SHIFT = FEAT_BITS + RANK_BITS
+
+
+# ---------------------------
+# 내보내기
+# ---------------------------
+def _flatten_lgbm(clf) -> Optional[Dict[str, np.ndarray]]:
+    """LGBMClassifier → 압축 트리 배열. 범주 분할/결측 방향 분할/다중 클래스면 None."""
+    dump = clf.booster_.dump_model()
+    if dump.get("num_class", 1) != 1 or not str(dump.get("objective", "")).startswith("binary"):
+        return None
+    sigmoid = 1.0
+    for tok in str(dump["objective"]).split():
+        if tok.startswith("sigmoid:"):
+            sigmoid = float(tok.split(":", 1)[1])
+    trees = dump["tree_info"]
+    best = getattr(clf, "best_iteration_", None)
+    if best:
+        trees = trees[:best]
+    scale = 1.0 / max(1, len(trees)) if dump.get("average_output") else 1.0
+    n_feat = int(dump["max_feature_idx"]) + 1
+    if n_feat > _FEAT_MASK + 1:
+        return None
+
+    # 1) 형제 인접 배치(트리별 BFS): slots[i] = 원 노드 dict, left_of[i] = 왼쪽 자식 슬롯
+    slots, left_of, roots = [], [], []
+    for t in trees:
+        roots.append(len(slots))
+        slots.append(t["tree_structure"]); left_of.append(-1)
+        q = [roots[-1]]
+        while q:
+            i = q.pop()
+            nd = slots[i]
+            if "leaf_value" in nd:
+                continue
+            if nd["decision_type"] != "<=" or nd["missing_type"] != "None":
+                return None
+            left_of[i] = len(slots)
+            slots += [nd["left_child"], nd["right_child"]]; left_of += [-1, -1]
+            q += [left_of[i], left_of[i] + 1]
+    if len(slots) >= 1 << (63 - _LEFT_SHIFT):
+        return None
+
+    # 2) 피처별 고유 임계값 + 노드 임계값 순위
+    n = len(slots)
+    is_leaf = np.array(["leaf_value" in nd for nd in slots])
+    feat = np.array([0 if lf else int(nd["split_feature"]) for nd, lf in zip(slots, is_leaf)], dtype=np.int64)
+    thr = np.array([0.0 if lf else float(nd["threshold"]) for nd, lf in zip(slots, is_leaf)])
+    value = np.array([float(nd["leaf_value"]) * scale if lf else 0.0 for nd, lf in zip(slots, is_leaf)])
+    cuts = [np.unique(thr[~is_leaf & (feat == f)]) for f in range(n_feat)]
+    if max((len(c) for c in cuts), default=0) >= LEAF_RANK:
+        return None
+    rank = np.zeros(n, dtype=np.int64)
+    for f in range(n_feat):
+        m = ~is_leaf & (feat == f)
+        rank[m] = np.searchsorted(cuts[f], thr[m])
+    left = np.asarray(left_of, dtype=np.int64)
+    ids = np.arange(n, dtype=np.int64)
+    node = np.where(is_leaf, LEAF_RANK << FEAT_BITS | ids << _LEFT_SHIFT,
+                    feat | rank << FEAT_BITS | left << _LEFT_SHIFT)
+    return {
+        "kind": np.array("tree"),
+        "node": node, "value": value, "is_leaf": is_leaf,
+        "roots": np.asarray(roots, dtype=np.int64),
+        "cut_values": np.concatenate(cuts) if cuts else np.empty(0),
+        "cut_offsets": np.cumsum([0] + [len(c) for c in cuts]).astype(np.int64),
+        "sigmoid": np.array(sigmoid),
+    }
+
+
+def _flatten_linear(clf) -> Optional[Dict[str, np.ndarray]]:
+    coef = np.asarray(clf.coef_, dtype=np.float64)
+    if coef.shape[0] != 1:
+        return None
+    return {"kind": np.array("linear"), "coef": coef[0],
+            "intercept": np.array(float(np.ravel(clf.intercept_)[0]))}
+
+
+def export_estimator(est, features: List[str]) -> Optional[Dict[str, np.ndarray]]:
+    """학습된 추정기 → npz에 쓸 배열 dict. 지원하지 않는 형태면 None."""
+    cal = None
+    if type(est).__name__ == "CalibratedClassifierCV":
+        ccs = getattr(est, "calibrated_classifiers_", [])
+        if len(ccs) != 1 or len(ccs[0].calibrators) != 1:
+            return None
+        cal, base = ccs[0].calibrators[0], ccs[0].estimator
+    else:
+        base = est
+    name = type(base).__name__
+    if name == "LGBMClassifier":
+        arrays = _flatten_lgbm(base)
+    elif name == "LogisticRegression":
+        arrays = _flatten_linear(base)
+    else:
+        return None
+    if arrays is None or len(getattr(base, "classes_", [])) != 2:
+        return None
+
+    # 보정기 입력: decision_function이 있으면 원점수, 없으면 predict_proba[:, 1] (sklearn 규칙)
+    arrays["cal_input"] = np.array("raw" if hasattr(base, "decision_function") else "proba")
+    if cal is None:
+        arrays["cal"] = np.array("none")
+    elif type(cal).__name__ == "IsotonicRegression":
+        arrays.update(cal=np.array("isotonic"), cal_x=np.asarray(cal.X_thresholds_, dtype=np.float64),
+                      cal_y=np.asarray(cal.y_thresholds_, dtype=np.float64))
+    elif hasattr(cal, "a_") and hasattr(cal, "b_"):
+        arrays.update(cal=np.array("sigmoid"), cal_a=np.array(float(cal.a_)), cal_b=np.array(float(cal.b_)))
+    else:
+        return None
+    arrays["features"] = np.asarray(list(features), dtype=str)
+    arrays["version"] = np.array(NPZ_VERSION)
+    return arrays
+
+
+def export_model(est, features: List[str], path: str, check_X: pd.DataFrame = None,
+                 atol: float = 1e-6) -> bool:
+    """
+    est → path(npz). check_X가 있으면 원 모델 predict_proba와 비교해 atol 초과 시 저장하지 않음.
+    returns: 저장 여부
+    """
+    arrays = export_estimator(est, features)
+    if arrays is None:
+        print(f"[EXPORT] {Path(path).name}: unsupported estimator ({type(est).__name__}) → joblib only")
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    if check_X is not None and len(check_X):
+        from .train_pipeline import _safe_proba
+        Xc = check_X.reindex(columns=list(features), fill_value=0)
+        diff = float(np.max(np.abs(CompactModel(arrays).predict(_as_matrix(Xc)) - _safe_proba(est, Xc))))
+        if not diff <= atol:
+            print(f"[EXPORT][WARN] {Path(path).name}: max diff {diff:.2e} > {atol:g} → skip")
+            if os.path.exists(path):
+                os.remove(path)
+            return False
+    np.savez(path, **arrays)
+    return True
+
+
+# ---------------------------
+# 평가
+# ---------------------------
+def _as_matrix(X: pd.DataFrame) -> np.ndarray:
+    """DataFrame(숫자/불리언) → float64 C 배열 (LightGBM 판다스 변환과 같은 값)."""
+    return np.ascontiguousarray(X.to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+class CompactModel:
+    """npz 배열 하나(라벨 하나)의 평가기. cols: 공유 행렬에서 이 모델 피처의 열 번호(없으면 0..)."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray], cols: np.ndarray = None):
+        a = {k: (v.item() if v.ndim == 0 else v) for k, v in arrays.items()}
+        self.kind, self.cal, self.cal_input = str(a["kind"]), str(a["cal"]), str(a["cal_input"])
+        self.features = [str(f) for f in a["features"]]
+        self.cols = np.arange(len(self.features)) if cols is None else np.asarray(cols, dtype=np.intp)
+        if self.kind == "tree":
+            self.node, self.value, self.is_leaf = a["node"], a["value"], a["is_leaf"]
+            self.roots, self.sigmoid = a["roots"], float(a["sigmoid"])
+            off = a["cut_offsets"]
+            self.cuts = [a["cut_values"][off[f]:off[f + 1]] for f in range(len(off) - 1)]
+            self.bin_dtype = np.uint8 if max((len(c) for c in self.cuts), default=0) < 255 else np.uint16
+        else:
+            self.coef, self.intercept = a["coef"], float(a["intercept"])
+        self.cal_x, self.cal_y = a.get("cal_x"), a.get("cal_y")
+        self.cal_a, self.cal_b = a.get("cal_a"), a.get("cal_b")
+
+    @classmethod
+    def load(cls, path: str, cols: np.ndarray = None) -> "CompactModel":
+        with np.load(path, allow_pickle=False) as z:
+            return cls({k: z[k] for k in z.files}, cols)
+
+    def _bins(self, M: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """공유 행렬 → 이 모델 피처의 bin 코드 (n × 모델 피처), 결측은 0으로."""
+        B = np.zeros((len(M), len(self.cuts)), dtype=self.bin_dtype)
+        for f, c in enumerate(self.cuts):
+            if len(c):
+                B[:, f] = np.searchsorted(c, np.nan_to_num(M[:, cols[f]], nan=0.0), side="left")
+        return B
+
+    def _tree_raw(self, M: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """M: (행 × 공유 열) → 트리 합 원점수."""
+        n, T = len(M), len(self.roots)
+        F = len(self.cuts)
+        B = self._bins(M, cols).ravel()
+        node = np.tile(self.roots, n)
+        row = np.repeat(np.arange(n, dtype=np.intp), T)
+        acc = np.zeros(n)
+        step = 0
+        while node.size:
+            rec = self.node[node]
+            xb = B[row * F + (rec & _FEAT_MASK)]
+            node = (rec >> _LEFT_SHIFT) + (xb > ((rec >> FEAT_BITS) & _RANK_MASK))
+            step += 1
+            if step % COMPACT_EVERY == 0:
+                done = self.is_leaf[node]
+                if done.any():
+                    acc += np.bincount(row[done], weights=self.value[node[done]], minlength=n)
+                    keep = ~done
+                    node, row = node[keep], row[keep]
+        return acc
+
+    def predict(self, M: np.ndarray, cols: np.ndarray = None) -> np.ndarray:
+        """공유 행렬 M → predict_proba[:, 1] 과 같은 값. cols: M에서 이 모델 피처의 열 번호(기본 self.cols)."""
+        cols = self.cols if cols is None else cols
+        if self.kind == "tree":
+            raw = np.concatenate([self._tree_raw(M[a:a + CHUNK_ROWS], cols)
+                                  for a in range(0, len(M), CHUNK_ROWS)] or [np.empty(0)])
+            proba = 1.0 / (1.0 + np.exp(-self.sigmoid * raw))
+        else:
+            raw = M[:, cols] @ self.coef + self.intercept
+            proba = 1.0 / (1.0 + np.exp(-raw))
+        if self.cal == "none":
+            return proba
+        t = raw if self.cal_input == "raw" else proba
+        if self.cal == "isotonic":
+            p = np.interp(t, self.cal_x, self.cal_y)
+        else:
+            p = 1.0 / (1.0 + np.exp(self.cal_a * t + self.cal_b))
+        p[(1.0 < p) & (p <= 1.0 + 1e-5)] = 1.0
+        return p
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        """sklearn 호환(_safe_proba 경로): X 열 = self.features."""
+        M = _as_matrix(X.reindex(columns=self.features, fill_value=0))
+        p = self.predict(M, cols=np.arange(len(self.features)))
+        return np.column_stack([1.0 - p, p])
+
+
+class CompactEnsemble:
+    """라벨별 CompactModel + 피처 합집합. predict(X)는 청크마다 공유 행렬 하나로 전 라벨 채점."""
+
+    def __init__(self, models: Dict[str, CompactModel], features: List[str]):
+        self.models, self.features = models, features
+
+    @classmethod
+    def load(cls, artifacts_dir: str, labels: List[str]) -> Optional["CompactEnsemble"]:
+        """모든 라벨의 model_{LBL}.npz가 있으면 로드, 하나라도 없으면 None."""
+        art = Path(artifacts_dir)
+        paths = {lbl: art / f"model_{lbl}.npz" for lbl in labels}
+        if not labels or not all(p.exists() for p in paths.values()):
+            return None
+        raw = {}
+        for lbl, p in paths.items():
+            with np.load(p, allow_pickle=False) as z:
+                raw[lbl] = {k: z[k] for k in z.files}
+        features = list(dict.fromkeys(str(f) for a in raw.values() for f in a["features"]))
+        pos = {f: i for i, f in enumerate(features)}
+        models = {lbl: CompactModel(a, np.array([pos[str(f)] for f in a["features"]], dtype=np.intp))
+                  for lbl, a in raw.items()}
+        return cls(models, features)
+
+    def predict(self, X: pd.DataFrame, labels: List[str] = None, chunk_rows: int = 64 * CHUNK_ROWS,
+                timings: dict = None) -> np.ndarray:
+        """X → (행 × 라벨) 확률. 없는 피처는 0 (predict_persona._force_schema와 같음)."""
+        labels = list(self.models) if labels is None else labels
+        S = np.empty((len(X), len(labels)))
+        for a in range(0, len(X), chunk_rows):
+            M = _as_matrix(X.iloc[a:a + chunk_rows].reindex(columns=self.features, fill_value=0))
+            for j, lbl in enumerate(labels):
+                t0 = time.perf_counter()
+                S[a:a + len(M), j] = self.models[lbl].predict(M)
+                if timings is not None:
+                    timings[lbl] = timings.get(lbl, 0.0) + time.perf_counter() - t0
+        return S
+
+
+# ---------------------------
+# CLI: 기존 산출물 내보내기
+# ---------------------------
+def export_artifacts(artifacts_dir: str, check_rows: int = 2000, seed: int = 0) -> Dict[str, bool]:
+    """
+    model_{LBL}.joblib → model_{LBL}.npz. 검증 행렬: 피처별 N(0, 2) + 불리언/원핫은 0/1
+    (표준화 피처 범위를 넓게 덮어 분기 양쪽을 두루 지나도록).
+    """
+    from joblib import load as joblib_load
+    art = Path(artifacts_dir)
+    with open(art / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    rng = np.random.default_rng(seed)
+    out = {}
+    for lbl, feats in sorted(meta.get("per_label_features", {}).items()):
+        path = art / f"model_{lbl}.joblib"
+        if not feats or not path.exists():
+            continue
+        est = joblib_load(path)
+        binary = [c for c in feats if c.startswith(("LBL_", "자치구_", "성별_", "연령대_"))]
+        check = pd.DataFrame(rng.normal(0.0, 2.0, (check_rows, len(feats))), columns=feats)
+        check[binary] = rng.integers(0, 2, (check_rows, len(binary))).astype(float)
+        out[lbl] = export_model(est, feats, str(art / f"model_{lbl}.npz"), check_X=check)
+        print(f"[EXPORT] {lbl}: {'ok' if out[lbl] else 'skip'}")
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--artifacts", required=True, help="학습 산출물 폴더(model_*.joblib, meta.json)")
+    ap.add_argument("--check_rows", type=int, default=2000, help="검증용 난수 행 수")
+    args = ap.parse_args()
+    export_artifacts(args.artifacts, args.check_rows)
+
+
+if __name__ == "__main__":
+    main()
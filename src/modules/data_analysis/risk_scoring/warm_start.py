@@ -0,0 +1,165 @@
+# warm_start.py
+# -*- coding: utf-8 -*-
+"""
+월 증분 재학습(warm start): 이전 산출물의 LightGBM 부스터에 새 달 학습 행만으로 트리를 이어 붙임
+- 새 학습 행 = 이번 학습 구간(year_month < cut_cal_from) 중 이전 학습의 마지막 학습 월 이후
+  (월 롤포워드: 새 달이 들어오면 --cut_cal_from/--cut_test_from을 한 달씩 옮겨 실행)
+- 이어 붙이기: init_model=이전 부스터, 최대 warm_rounds 라운드, 보정 구간(cal) logloss 조기 종료,
+  잎 출력 상한(max_delta_step). 보정 구간 logloss가 이전 부스터보다 좋아지지 않으면 이전 부스터 유지
+  → 보정(isotonic/sigmoid)과 임계값만 새로 맞춤 (train_pipeline의 기존 경로 그대로)
+- 라벨별 폴백(전체 재학습): 이전 모델 없음 / LightGBM 아님 / 피처 목록이 달라짐
+- 새 학습 행이 없거나 단일 클래스면 이전 부스터 그대로(트리 0개 추가) 재보정만
+- 리포트: warm_start_report.json — 라벨별 모드/추가 트리/학습 시간 + 전체 재학습 기준 산출물
+  (기본: 이전 산출물, 이전도 warm이면 그 기준을 이어받음) 대비 지표(metrics.csv)·시간(profile.json) 차이
+  지표 차이는 기준이 전체 재학습이고 분할(cut_cal_from/cut_test_from)이 같을 때만 계산
+  (롤포워드한 이전 산출물은 Test 구간이 달라 비교 불가 → --baseline_dir로 같은 분할의 전체 재학습 지정)
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import json
+
+import numpy as np
+import pandas as pd
+
+REPORT_FILE = "warm_start_report.json"
+METRIC_COLS = ("PR_AUC_test", "Recall@thr", "F1@thr", "thr")
+SPLIT_KEYS = ("cut_cal_from", "cut_test_from")
+
+
+def load_previous(prev_dir: str) -> Dict:
+    """이전 산출물 메타 + 새 학습 행 기준 월 + 전체 재학습 기준 폴더."""
+    with open(Path(prev_dir) / "meta.json", "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    # 이전 학습의 마지막 학습 월(없으면 이전 cut_cal_from 직전까지가 학습 구간)
+    last = meta.get("train_last_month")
+    train_last = pd.Timestamp(last) if last else pd.Timestamp(meta["cut_cal_from"]) - pd.offsets.MonthBegin(1)
+    ws = meta.get("warm_start") or {}
+    full_dir = ws.get("full_baseline_dir") if meta.get("training_mode") == "warm" else None
+    return {"dir": str(prev_dir), "meta": meta, "train_last_month": train_last,
+            "full_baseline_dir": full_dir or str(prev_dir)}
+
+
+def previous_booster_model(prev: Dict, lbl: str, feat_cols: list):
+    """
+    이어 붙일 이전 LGBMClassifier. returns (model 또는 None, 폴백 사유).
+    CalibratedClassifierCV(prefit)면 안쪽 추정기.
+    """
+    from joblib import load as joblib_load
+    path = Path(prev["dir"]) / f"model_{lbl}.joblib"
+    if not path.exists():
+        return None, "no previous model"
+    if list(prev["meta"].get("per_label_features", {}).get(lbl, [])) != list(feat_cols):
+        return None, "feature set changed"
+    est = joblib_load(path)
+    ccs = getattr(est, "calibrated_classifiers_", None)
+    base = ccs[0].estimator if ccs else est
+    if not hasattr(base, "booster_"):
+        return None, f"not LightGBM ({type(base).__name__})"
+    return base, None
+
+
+def warm_fit(clf, prev_model, X_new: pd.DataFrame, y_new: np.ndarray,
+             X_eval: pd.DataFrame, y_eval: np.ndarray,
+             rounds: int = 100, early_stopping: int = 20,
+             max_delta_step: float = 1.0) -> Tuple[object, Dict]:
+    """clf(새 LGBMClassifier 설정)로 prev_model 부스터에서 이어 학습. returns (모델, 정보)."""
+    import lightgbm as lgb
+    n_prev = int(prev_model.booster_.current_iteration())
+    info = {"mode": "warm", "new_rows": int(len(y_new)), "new_pos": int(np.sum(y_new)),
+            "trees_prev": n_prev, "trees_added": 0}
+    if len(y_new) == 0 or np.min(y_new) == np.max(y_new):
+        info["note"] = "no two-class new rows → previous booster kept"
+        return prev_model, info
+    # 이전 부스터가 포화(raw ±20)된 행은 hessian≈0 → 새 트리 잎값이 폭주하므로 잎 출력 상한
+    clf.set_params(n_estimators=rounds, max_delta_step=max_delta_step)
+    clf.fit(X_new, y_new, init_model=prev_model.booster_,
+            eval_set=[(X_eval, y_eval)],
+            callbacks=[lgb.early_stopping(early_stopping, first_metric_only=True, verbose=False)])
+    total = int(clf.best_iteration_ or clf.booster_.current_iteration())
+    info.update(trees_added=total - n_prev, best_iteration=total)
+
+    # 조기 종료는 최소 1라운드를 고르므로, 보정 구간 logloss가 이전 부스터보다 나빠지면 이전 것 유지
+    if len(y_eval) and np.min(y_eval) != np.max(y_eval):
+        from sklearn.metrics import log_loss
+        ll_prev = log_loss(y_eval, prev_model.predict_proba(X_eval)[:, 1], labels=[0, 1])
+        ll_new = log_loss(y_eval, clf.predict_proba(X_eval)[:, 1], labels=[0, 1])
+        info.update(eval_logloss_prev=round(float(ll_prev), 6), eval_logloss=round(float(ll_new), 6))
+        if ll_new >= ll_prev:
+            info.update(trees_added=0, best_iteration=n_prev, note="no eval improvement → previous booster kept")
+            return prev_model, info
+    return clf, info
+
+
+def _load_json(path: Path) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def baseline_mismatch(cur_meta: Dict, base_meta: Dict) -> Optional[str]:
+    """기준 산출물이 같은 분할의 전체 재학습이 아니면 사유(지표 차이 비교 불가), 맞으면 None."""
+    if not base_meta:
+        return "baseline meta.json not found"
+    if base_meta.get("training_mode") == "warm":
+        return "baseline is a warm-start run, not a full retrain"
+    diff = {k: (base_meta.get(k), cur_meta.get(k)) for k in SPLIT_KEYS if base_meta.get(k) != cur_meta.get(k)}
+    if diff:
+        return "splits differ (baseline → current): " + ", ".join(f"{k} {b} → {c}" for k, (b, c) in diff.items())
+    return None
+
+
+def write_report(out_dir: str, prev: Dict, label_info: Dict[str, Dict], metrics_df: pd.DataFrame,
+                 train_sec: float, baseline_dir: Optional[str] = None) -> Dict:
+    """
+    라벨별 warm 정보 + 기준(전체 재학습) 대비 지표/시간 차이 → warm_start_report.json.
+    기준이 같은 분할의 전체 재학습이 아니면 지표 차이는 생략(comparable=false + 사유).
+    """
+    base_dir = Path(baseline_dir or prev["full_baseline_dir"])
+    mismatch = baseline_mismatch(_load_json(Path(out_dir) / "meta.json"), _load_json(base_dir / "meta.json"))
+    base_metrics = pd.DataFrame()
+    if mismatch is None and (base_dir / "metrics.csv").exists():
+        base_metrics = pd.read_csv(base_dir / "metrics.csv", encoding="utf-8-sig")
+    base_prof = _load_json(base_dir / "profile.json")
+    base_stages = {s["name"]: s["wall_sec"] for s in base_prof.get("stages", [])}
+    base_fit = {lbl: v.get("fit") for lbl, v in base_prof.get("per_label", {}).items()}
+
+    cur = metrics_df.set_index("label") if "label" in metrics_df else pd.DataFrame()
+    ref = base_metrics.set_index("label") if "label" in base_metrics else pd.DataFrame()
+    labels = {}
+    for lbl, info in label_info.items():
+        rec = dict(info, baseline_fit_sec=base_fit.get(lbl))
+        deltas = {}
+        for m in METRIC_COLS:
+            c = cur[m].get(lbl) if m in cur else None
+            b = ref[m].get(lbl) if m in ref else None
+            if c is not None and b is not None and pd.notna(c) and pd.notna(b):
+                deltas[m] = {"base": float(b), "cur": float(c), "delta": round(float(c) - float(b), 6)}
+        rec["metrics"] = deltas
+        labels[lbl] = rec
+
+    base_train = base_stages.get("train")
+    report = {
+        "warm_start_from": prev["dir"],
+        "baseline_dir": str(base_dir),
+        "comparable": mismatch is None,
+        "not_comparable_reason": mismatch,
+        "new_rows_after": str(prev["train_last_month"].date()),
+        "train_sec": round(train_sec, 2),
+        "baseline_train_sec": base_train,
+        "speedup": round(base_train / train_sec, 2) if base_train and train_sec > 0 else None,
+        "labels": labels,
+    }
+    with open(Path(out_dir) / REPORT_FILE, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"[WARM] train {train_sec:.1f}s vs baseline {base_train}s ({base_dir})")
+    if mismatch:
+        print(f"[WARN] 지표 차이 생략: {mismatch} — 같은 분할의 전체 재학습 산출물을 --baseline_dir로 지정")
+    for lbl, rec in labels.items():
+        d = rec["metrics"].get("PR_AUC_test", {})
+        print(f"[WARM] {lbl}: {rec['mode']} +{rec.get('trees_added', '-')} trees, "
+              f"fit {rec.get('fit_sec', float('nan')):.2f}s (base {rec['baseline_fit_sec']}), "
+              f"ΔPR_AUC={d.get('delta')}")
+    return report